@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import User
+from .models import ClaimCheck, DeadLetter, EmailDelivery, User
 from django.contrib.auth.admin import UserAdmin
 
 
@@ -43,3 +43,26 @@ class UserAdminConfig(UserAdmin):
     
 
 admin.site.register(User, UserAdminConfig)
+
+
+@admin.register(EmailDelivery)
+class EmailDeliveryAdmin(admin.ModelAdmin):
+    list_display = ("recipient", "job_id", "status", "attempts", "next_attempt_at", "updated_at")
+    list_filter = ("status",)
+    search_fields = ("recipient", "job_id")
+    readonly_fields = ("created_at", "updated_at")
+
+
+@admin.register(ClaimCheck)
+class ClaimCheckAdmin(admin.ModelAdmin):
+    list_display = ("id", "created_at", "expires_at")
+    readonly_fields = ("id", "data", "created_at", "expires_at")
+
+
+@admin.register(DeadLetter)
+class DeadLetterAdmin(admin.ModelAdmin):
+    list_display = ("recipient", "reason", "attempts", "created_at", "replayed_at")
+    list_filter = ("replayed_at",)
+    search_fields = ("recipient", "message__job_id")
+    list_select_related = ("message",)
+    readonly_fields = ("created_at",)
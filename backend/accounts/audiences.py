@@ -0,0 +1,88 @@
+"""Named recipient filters for admin notifications.
+
+Instead of posting every email address, the admin panel can name an
+audience. The worker resolves it straight from the database, in primary-key
+ranges, so neither the request nor the Celery messages grow with the number
+of recipients.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from tasks.models import Task
+
+User = get_user_model()
+
+
+def all_active():
+    return User.objects.filter(is_active=True)
+
+
+def active_with_open_tasks():
+    open_tasks = Task.objects.filter(
+        user=OuterRef('pk'),
+        status__in=[Task.Status.TODO, Task.Status.DOING],
+    )
+    return all_active().filter(Exists(open_tasks))
+
+
+def overdue_high_priority():
+    overdue = Task.objects.filter(
+        user=OuterRef('pk'),
+        priority=Task.Priority.HIGH,
+        due_date__lt=timezone.localdate(),
+    ).exclude(status=Task.Status.DONE)
+    return all_active().filter(Exists(overdue))
+
+
+AUDIENCES = {
+    'all_active': all_active,
+    'active_with_open_tasks': active_with_open_tasks,
+    'overdue_high_priority': overdue_high_priority,
+}
+
+
+def get_audience(name):
+    """Return the User queryset for an audience name.
+
+    Raises:
+        KeyError: if the audience does not exist
+    """
+    return AUDIENCES[name]()
+
+
+def pk_ranges(name, size):
+    """Split an audience into (after_pk, upto_pk) ranges of about ``size`` users.
+
+    Returns (ranges, total).
+    """
+    return queryset_pk_ranges(get_audience(name), size)
+
+
+def queryset_pk_ranges(queryset, size):
+    """Split a queryset into (after_pk, upto_pk) ranges of about ``size`` rows.
+
+    Streams primary keys with ``iterator()`` so the whole set is never
+    held in memory. Returns (ranges, total).
+    """
+    ranges = []
+    total = 0
+    after = 0
+    last = None
+    pks = queryset.order_by('pk').values_list('pk', flat=True)
+    for pk in pks.iterator(chunk_size=2000):
+        total += 1
+        last = pk
+        if total % size == 0:
+            ranges.append((after, pk))
+            after = pk
+    if last is not None and last != after:
+        ranges.append((after, last))
+    return ranges, total
+
+
+def resolve_emails(name, after_pk, upto_pk):
+    """Return the emails of an audience within a primary-key range."""
+    users = get_audience(name).filter(pk__gt=after_pk, pk__lte=upto_pk).order_by('pk')
+    return list(users.values_list('email', flat=True).iterator(chunk_size=2000))
@@ -0,0 +1,68 @@
+"""Claim checks for large Celery task arguments and results.
+
+Values whose JSON is bigger than ``CLAIM_CHECK_THRESHOLD`` bytes are stored
+once in a ``ClaimCheck`` row, and only a small ``{"$claim": "<id>"}``
+reference travels through the Redis broker and result backend. Smaller
+values are passed through unchanged, so callers can wrap every argument
+without checking its size. Stored values expire after ``CLAIM_CHECK_TTL``
+seconds and are deleted by the ``purge_claim_checks`` beat task.
+"""
+
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .models import ClaimCheck
+
+CLAIM_KEY = '$claim'
+
+
+class ClaimCheckMissing(LookupError):
+    """The referenced value expired or was never stored."""
+
+
+def is_claim(value):
+    return isinstance(value, dict) and set(value) == {CLAIM_KEY}
+
+
+def store(data, ttl=None):
+    """Store ``data`` and return a reference to it."""
+    ttl = settings.CLAIM_CHECK_TTL if ttl is None else ttl
+    check = ClaimCheck.objects.create(
+        data=data,
+        expires_at=timezone.now() + timedelta(seconds=ttl),
+    )
+    return {CLAIM_KEY: str(check.pk)}
+
+
+def wrap(data, threshold=None):
+    """Return ``data`` itself if it is small, otherwise a stored reference."""
+    threshold = settings.CLAIM_CHECK_THRESHOLD if threshold is None else threshold
+    if len(json.dumps(data, cls=DjangoJSONEncoder)) <= threshold:
+        return data
+    return store(data)
+
+
+def unwrap(value):
+    """Return the value behind a reference; anything else is returned as is.
+
+    Raises:
+        ClaimCheckMissing: if the reference expired or does not exist
+    """
+    if not is_claim(value):
+        return value
+    data = ClaimCheck.objects.filter(
+        pk=value[CLAIM_KEY], expires_at__gt=timezone.now()
+    ).values_list('data', flat=True).first()
+    if data is None:
+        raise ClaimCheckMissing(f"Claim check {value[CLAIM_KEY]} expired or does not exist")
+    return data
+
+
+def purge_expired():
+    """Delete expired values; returns how many were removed."""
+    deleted, _ = ClaimCheck.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
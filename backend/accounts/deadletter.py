@@ -0,0 +1,103 @@
+"""Dead-letter store for notification deliveries that could not be made.
+
+``send_email_task`` records every recipient that failed permanently, ran
+out of attempts, or was abandoned when the task itself gave up. The
+subject and body are stored once per job and each recipient gets a small
+row with the reason and attempt count.
+
+``replay`` queues dead letters again as new notification jobs through the
+transactional outbox. Batches are spaced ``interval`` seconds apart, so
+recovering from a provider outage resends only the affected recipients,
+a little at a time.
+"""
+
+import uuid
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import claimcheck, outbox
+from .models import DeadLetter, DeadLetterMessage
+
+
+def record(job_id, subject, body, failures):
+    """Store failed deliveries of a job.
+
+    Args:
+        failures: (recipient, attempts, reason) tuples
+    """
+    if not failures:
+        return
+    message, _ = DeadLetterMessage.objects.get_or_create(
+        job_id=str(job_id),
+        defaults={'subject': subject[:255], 'body': body},
+    )
+    DeadLetter.objects.bulk_create(
+        [
+            DeadLetter(message=message, recipient=recipient, attempts=attempts, reason=reason[:500])
+            for recipient, attempts, reason in failures
+        ],
+        ignore_conflicts=True,
+        batch_size=1000,
+    )
+
+
+def pending(job_id=None):
+    """Return dead letters that have not been replayed yet."""
+    letters = DeadLetter.objects.filter(replayed_at__isnull=True)
+    if job_id:
+        letters = letters.filter(message__job_id=str(job_id))
+    return letters
+
+
+def replay(job_id=None, limit=None, batch_size=None, interval=None):
+    """Queue unreplayed dead letters for delivery again.
+
+    Letters are grouped by their original message into batches of
+    ``batch_size`` recipients. Every batch becomes its own notification job,
+    and the N-th batch is published ``N * interval`` seconds after the
+    first. The letters are selected with ``SKIP LOCKED`` and marked as
+    replayed in the same transaction, so concurrent replays never queue the
+    same letter twice.
+
+    Returns:
+        List of dicts with the new ``job_id``, ``replay_of`` and ``recipients``
+    """
+    batch_size = batch_size or settings.DEAD_LETTER_REPLAY_BATCH_SIZE
+    interval = settings.DEAD_LETTER_REPLAY_INTERVAL if interval is None else interval
+
+    # Imported here: tasks imports this module
+    from .tasks import dispatch_recipients_task
+
+    jobs = []
+    with transaction.atomic():
+        # Concurrent replays (endpoint and command) skip letters another one holds
+        letters = (
+            pending(job_id).select_related('message').select_for_update(skip_locked=True, of=('self',))
+            .order_by('message_id', 'id')
+        )
+        if limit:
+            letters = letters[:limit]
+
+        batches = []
+        for letter in letters:
+            if not batches or batches[-1][0] != letter.message or len(batches[-1][1]) >= batch_size:
+                batches.append((letter.message, []))
+            batches[-1][1].append(letter)
+
+        for i, (message, batch) in enumerate(batches):
+            new_job_id = str(uuid.uuid4())
+            recipients = [letter.recipient for letter in batch]
+            outbox.enqueue(
+                dispatch_recipients_task,
+                [claimcheck.wrap(recipients), message.subject, claimcheck.wrap(message.body), new_job_id],
+                key=new_job_id,
+                delay=i * interval,
+            )
+            DeadLetter.objects.filter(pk__in=[letter.pk for letter in batch]).update(
+                replayed_at=timezone.now(),
+                replay_job_id=new_job_id,
+            )
+            jobs.append({'job_id': new_job_id, 'replay_of': message.job_id, 'recipients': len(recipients)})
+    return jobs
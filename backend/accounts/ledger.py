@@ -0,0 +1,120 @@
+"""Per-recipient delivery ledger for notification jobs.
+
+A rerun of ``send_email_task`` (Celery retry, redelivery after a worker
+crash, manual replay) consults the ledger and only sends to recipients that
+are still pending and due, so reruns are idempotent and each recipient backs
+off on its own schedule.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Min
+from django.utils import timezone
+
+from .mail import is_permanent_failure
+from .models import EmailDelivery
+
+Status = EmailDelivery.Status
+
+
+class DeliveryLedger:
+    """Ledger rows for the recipients of one ``send_email_task`` run."""
+
+    def __init__(self, job_id, recipients):
+        self.job_id = str(job_id)
+        self.recipients = list(dict.fromkeys(recipients))
+        self._attempts = {}
+        self._sent = []
+        # (recipient, attempts, reason) of final failures, for the dead-letter store
+        self.dead = []
+        EmailDelivery.objects.bulk_create(
+            [EmailDelivery(job_id=self.job_id, recipient=r) for r in self.recipients],
+            ignore_conflicts=True,
+            batch_size=1000,
+        )
+
+    def _rows(self):
+        return EmailDelivery.objects.filter(job_id=self.job_id, recipient__in=self.recipients)
+
+    def due(self):
+        """Return recipients that still need a delivery attempt now."""
+        now = timezone.now()
+        rows = self._rows().filter(status__in=[Status.PENDING, Status.RETRY]).exclude(
+            next_attempt_at__gt=now
+        ).values_list('recipient', 'attempts')
+        self._attempts = dict(rows)
+        return [r for r in self.recipients if r in self._attempts]
+
+    def sent(self, recipient):
+        """Record a delivery; written to the database on ``flush``."""
+        self._sent.append(recipient)
+        if len(self._sent) >= settings.EMAIL_PROGRESS_EVERY:
+            self.flush()
+
+    def failed(self, recipient, error):
+        """Record a failed attempt.
+
+        Returns True if the failure is final (permanent error or attempts
+        exhausted), False if the recipient was scheduled for another try.
+        """
+        attempts = self._attempts.get(recipient, 0) + 1
+        final = is_permanent_failure(error) or attempts >= settings.EMAIL_MAX_ATTEMPTS
+        update = {
+            'attempts': attempts,
+            'last_error': str(error)[:1000],
+            'updated_at': timezone.now(),
+        }
+        if final:
+            update.update(status=Status.FAILED, next_attempt_at=None)
+            self.dead.append((recipient, attempts, update['last_error']))
+        else:
+            delay = settings.EMAIL_RETRY_BACKOFF * 2 ** (attempts - 1)
+            update.update(status=Status.RETRY, next_attempt_at=timezone.now() + timedelta(seconds=delay))
+        EmailDelivery.objects.filter(job_id=self.job_id, recipient=recipient).update(**update)
+        return final
+
+    def flush(self):
+        if not self._sent:
+            return
+        EmailDelivery.objects.filter(job_id=self.job_id, recipient__in=self._sent).update(
+            status=Status.SENT,
+            attempts=F('attempts') + 1,
+            last_error='',
+            next_attempt_at=None,
+            updated_at=timezone.now(),
+        )
+        self._sent = []
+
+    def abandon(self, error):
+        """Give up on every recipient not delivered yet, marking them failed.
+
+        Used when the task itself runs out of retries. The abandoned
+        recipients are added to ``dead``.
+        """
+        self.flush()
+        reason = str(error)[:1000]
+        rows = list(
+            self._rows().filter(status__in=[Status.PENDING, Status.RETRY]).values_list('recipient', 'attempts')
+        )
+        self._rows().filter(recipient__in=[recipient for recipient, _ in rows]).update(
+            status=Status.FAILED,
+            last_error=reason,
+            next_attempt_at=None,
+            updated_at=timezone.now(),
+        )
+        self.dead.extend((recipient, attempts, reason) for recipient, attempts in rows)
+
+    def next_retry_in(self):
+        """Seconds until the earliest scheduled retry, or None if nothing is left."""
+        next_at = self._rows().filter(status=Status.RETRY).aggregate(Min('next_attempt_at'))['next_attempt_at__min']
+        if next_at is None:
+            return None
+        return max(0, (next_at - timezone.now()).total_seconds())
+
+    def summary(self):
+        """Return (sent_count, failed_emails) over all runs for these recipients."""
+        statuses = dict(self._rows().values_list('recipient', 'status'))
+        sent_count = sum(1 for status in statuses.values() if status == Status.SENT)
+        failed_emails = [r for r in self.recipients if statuses.get(r) == Status.FAILED]
+        return sent_count, failed_emails
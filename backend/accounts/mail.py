@@ -0,0 +1,174 @@
+"""Helpers for sending many emails over as few SMTP connections as possible."""
+
+import logging
+import smtplib
+import socket
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.mail.message import SafeMIMEMultipart, SafeMIMEText
+
+logger = logging.getLogger(__name__)
+
+# Errors after which the connection is unusable and must be reopened.
+# Anything else (e.g. a refused recipient) only fails the current message.
+RECONNECT_ERRORS = (
+    smtplib.SMTPServerDisconnected,
+    smtplib.SMTPConnectError,
+    ConnectionError,
+    socket.timeout,
+)
+
+# "Service not available, closing transmission channel"
+SMTP_SERVICE_CLOSING = 421
+
+
+def needs_reconnect(error):
+    """Return True if ``error`` means the SMTP session must be reopened."""
+    if isinstance(error, RECONNECT_ERRORS):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code == SMTP_SERVICE_CLOSING
+
+
+def is_permanent_failure(error):
+    """Return True if retrying ``error`` for the same recipient is pointless.
+
+    That is a 5xx reply, or a message that could not be built at all, such
+    as one to a malformed address (``ValueError`` from Django).
+    """
+    if isinstance(error, ValueError):
+        return True
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+
+def encode_part(content, subtype):
+    """Encode one text/* body part; the result can be shared by many messages."""
+    return SafeMIMEText(content, subtype, settings.DEFAULT_CHARSET)
+
+
+class PreparedEmailMessage(EmailMessage):
+    """multipart/alternative message built from already encoded parts.
+
+    ``parts`` (see ``encode_part``) are attached as they are, so messages
+    that share them skip encoding the body again. ``body`` is kept only for
+    inspection, e.g. by the locmem backend in tests.
+    """
+
+    def __init__(self, parts, **kwargs):
+        super().__init__(**kwargs)
+        self.parts = parts
+
+    def message(self):
+        # Let Django set the headers without encoding the body a second time
+        body, self.body = self.body, ''
+        try:
+            return super().message()
+        finally:
+            self.body = body
+
+    def _create_message(self, msg):
+        alternative = SafeMIMEMultipart(_subtype='alternative', encoding=self.encoding or settings.DEFAULT_CHARSET)
+        for part in self.parts:
+            alternative.attach(part)
+        return alternative
+
+
+class BatchMailer:
+    """Send messages over a single reused connection.
+
+    The connection is opened lazily and recycled every ``batch_size``
+    messages, since providers usually cap messages per session. If the
+    server drops the connection the message is retried on a fresh one, up
+    to ``max_reconnects`` times.
+
+    Usage::
+
+        with BatchMailer() as mailer:
+            for recipient in recipients:
+                mailer.send(mailer.build(recipient, subject, body))
+    """
+
+    def __init__(self, batch_size=None, max_reconnects=None, connection=None):
+        self.batch_size = batch_size or settings.EMAIL_BATCH_SIZE
+        if max_reconnects is None:
+            max_reconnects = settings.EMAIL_MAX_RECONNECTS
+        self.max_reconnects = max_reconnects
+        self.connection = connection or get_connection(fail_silently=False)
+        self.connections_opened = 0
+        self._is_open = False
+        self._sent_on_connection = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def build(self, recipient, subject, body):
+        """Build a single-recipient message bound to the shared connection."""
+        return EmailMessage(
+            subject=subject,
+            body=body,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[recipient],
+            connection=self.connection,
+        )
+
+    def send(self, message):
+        """Send one message, reconnecting if the server drops the session.
+
+        Raises the last error if the message could not be delivered.
+        """
+        if self._is_open and self._sent_on_connection >= self.batch_size:
+            self.close()
+
+        for attempt in range(self.max_reconnects + 1):
+            try:
+                self._open()
+                self.connection.send_messages([message])
+                self._sent_on_connection += 1
+                return
+            except Exception as e:
+                if not needs_reconnect(e):
+                    raise
+                self.close()
+                if attempt == self.max_reconnects:
+                    raise
+                logger.warning(f"SMTP connection lost ({str(e)}), reconnecting")
+
+    def send_many(self, messages):
+        """Send messages in order.
+
+        Returns a list with, for each message, None if it was sent or the
+        exception it failed with.
+        """
+        errors = []
+        for message in messages:
+            try:
+                self.send(message)
+                errors.append(None)
+            except Exception as e:
+                errors.append(e)
+        return errors
+
+    def close(self):
+        if not self._is_open:
+            return
+        try:
+            self.connection.close()
+        except Exception as e:
+            logger.warning(f"Error closing SMTP connection: {str(e)}")
+        self._is_open = False
+        self._sent_on_connection = 0
+
+    def _open(self):
+        if self._is_open:
+            return
+        self.connection.open()
+        self._is_open = True
+        self._sent_on_connection = 0
+        self.connections_opened += 1
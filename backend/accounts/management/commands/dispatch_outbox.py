@@ -0,0 +1,69 @@
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from accounts import outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Publish transactional outbox messages to Celery. "
+        "Runs until stopped; several dispatchers can run concurrently."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.OUTBOX_BATCH_SIZE)
+        parser.add_argument(
+            '--interval', type=float, default=settings.OUTBOX_POLL_INTERVAL,
+            help="Seconds to wait when the outbox is empty",
+        )
+        parser.add_argument(
+            '--report-every', type=float, default=60,
+            help="Seconds between throughput reports",
+        )
+        parser.add_argument('--once', action='store_true', help="Drain the outbox once and exit")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        self.stopping = False
+        if not options['once']:
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+
+        published_total = 0
+        window_published = 0
+        window_failed = 0
+        window_start = time.monotonic()
+
+        while not self.stopping:
+            published, failed = outbox.dispatch_batch(batch_size)
+            published_total += published
+            window_published += published
+            window_failed += failed
+
+            elapsed = time.monotonic() - window_start
+            if elapsed >= options['report_every']:
+                self.report(window_published, window_failed, elapsed)
+                window_published = window_failed = 0
+                window_start = time.monotonic()
+
+            # A full batch means there is probably more waiting
+            if published + failed < batch_size:
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+
+        self.stdout.write(f"Outbox dispatcher stopped after publishing {published_total} messages")
+
+    def report(self, published, failed, elapsed):
+        backlog = outbox.stats()
+        self.stdout.write(
+            f"Outbox: published {published} ({published / elapsed:.1f}/s), "
+            f"failed {failed}, pending {backlog['pending']}, "
+            f"oldest {backlog['oldest_age_seconds']}s"
+        )
+
+    def stop(self, signum, frame):
+        self.stopping = True
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from accounts import deadletter
+
+
+class Command(BaseCommand):
+    help = (
+        "Queue dead-lettered notification deliveries again, in batches "
+        "published a fixed interval apart by the outbox dispatcher."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--job-id', help="Only replay letters of this notification job")
+        parser.add_argument('--limit', type=int, help="Replay at most this many letters")
+        parser.add_argument('--batch-size', type=int, help="Recipients per replayed job")
+        parser.add_argument('--interval', type=int, help="Seconds between replayed jobs")
+        parser.add_argument('--dry-run', action='store_true', help="Only show what would be replayed")
+
+    def handle(self, *args, **options):
+        letters = deadletter.pending(options['job_id'])
+        if options['dry_run']:
+            by_job = letters.values('message__job_id', 'message__subject').annotate(count=Count('id'))
+            for row in by_job.order_by('message__job_id'):
+                self.stdout.write(f"{row['message__job_id']}: {row['count']} ({row['message__subject']})")
+            self.stdout.write(f"{letters.count()} dead letters would be replayed")
+            return
+
+        jobs = deadletter.replay(
+            job_id=options['job_id'],
+            limit=options['limit'],
+            batch_size=options['batch_size'],
+            interval=options['interval'],
+        )
+        for job in jobs:
+            self.stdout.write(f"{job['job_id']}: {job['recipients']} recipients from {job['replay_of']}")
+        total = sum(job['recipients'] for job in jobs)
+        self.stdout.write(self.style.SUCCESS(f"Queued {total} dead letters in {len(jobs)} jobs"))
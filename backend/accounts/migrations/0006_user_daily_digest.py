@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_deadletters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='daily_digest',
+            field=models.BooleanField(default=False, help_text='Receive a daily summary of open, overdue and completed tasks'),
+        ),
+    ]
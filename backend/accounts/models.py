@@ -1,9 +1,12 @@
+import uuid
+
 from django.dispatch import receiver
 from django.db.models.signals import post_save
 from django.contrib.auth.base_user import BaseUserManager
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.db import models
+from django.utils import timezone
 
 
 
@@ -46,6 +49,10 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_staff = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
     is_verified = models.BooleanField(default=False)
+    daily_digest = models.BooleanField(
+        default=False,
+        help_text=_("Receive a daily summary of open, overdue and completed tasks"),
+    )
     created_date = models.DateTimeField(auto_now_add=True)
     updated_date = models.DateTimeField(auto_now=True)
 
@@ -56,3 +63,138 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     def __str__(self):
         return self.email
+
+
+class EmailDelivery(models.Model):
+    """Delivery ledger: one row per recipient of a notification job.
+
+    Lets a retried ``send_email_task`` skip recipients that were already
+    delivered and back off per recipient instead of per job.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        RETRY = 'RETRY', 'Waiting to retry'
+        SENT = 'SENT', 'Sent'
+        FAILED = 'FAILED', 'Failed'
+
+    job_id = models.CharField(max_length=64)
+    recipient = models.EmailField()
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # Also serves lookups by job_id
+            models.UniqueConstraint(fields=['job_id', 'recipient'], name='delivery_job_recipient_uniq'),
+        ]
+        verbose_name = "Email delivery"
+        verbose_name_plural = "Email deliveries"
+
+    def __str__(self):
+        return f"{self.recipient} ({self.status})"
+
+
+class ClaimCheck(models.Model):
+    """Large task payload or result stored once in the database.
+
+    Celery messages and results carry only a reference to the row (see
+    ``accounts.claimcheck``) instead of the data itself. Rows are purged
+    after ``expires_at``.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    data = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        verbose_name = "Claim check"
+        verbose_name_plural = "Claim checks"
+
+    def __str__(self):
+        return str(self.id)
+
+
+class OutboxMessage(models.Model):
+    """Celery task call written in the same transaction as the change behind it.
+
+    Rows are published to the broker by ``accounts.outbox.dispatch_batch``
+    only once that transaction has committed, and deleted when published.
+    """
+
+    task_name = models.CharField(max_length=200)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    key = models.CharField(
+        max_length=64,
+        blank=True,
+        db_index=True,
+        help_text="Correlation key, e.g. the notification job id",
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['available_at', 'id'], name='outbox_available_idx'),
+        ]
+        verbose_name = "Outbox message"
+        verbose_name_plural = "Outbox messages"
+
+    def __str__(self):
+        return f"{self.task_name} ({self.key or self.pk})"
+
+
+class DeadLetterMessage(models.Model):
+    """Subject and body of a notification job with dead letters, stored once."""
+
+    job_id = models.CharField(max_length=64, unique=True)
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Dead letter message"
+        verbose_name_plural = "Dead letter messages"
+
+    def __str__(self):
+        return f"{self.subject} ({self.job_id})"
+
+
+class DeadLetter(models.Model):
+    """A delivery that failed permanently or ran out of attempts.
+
+    Kept for inspection and replay (see ``accounts.deadletter``).
+    """
+
+    message = models.ForeignKey(DeadLetterMessage, on_delete=models.CASCADE, related_name='letters')
+    recipient = models.EmailField()
+    reason = models.CharField(max_length=500)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    replayed_at = models.DateTimeField(null=True, blank=True)
+    replay_job_id = models.CharField(max_length=64, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['message', 'recipient'], name='deadletter_message_recipient_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['replayed_at', 'id'], name='deadletter_replay_idx'),
+        ]
+        verbose_name = "Dead letter"
+        verbose_name_plural = "Dead letters"
+
+    def __str__(self):
+        return f"{self.recipient}: {self.reason}"
@@ -0,0 +1,140 @@
+"""Transactional outbox for Celery tasks.
+
+Request handlers call ``enqueue`` inside the transaction that makes the
+domain change, so the task call is stored if and only if the change
+commits, and the request never talks to the broker. The ``dispatch_outbox``
+management command drains the table into Celery in batches. Rows are
+claimed with ``SELECT ... FOR UPDATE SKIP LOCKED``, so several dispatchers
+can run side by side without publishing a row twice.
+"""
+
+import logging
+import time
+from contextlib import nullcontext
+from datetime import timedelta
+
+from celery import current_app
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from config.redis_client import get_redis
+
+from .models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+PUBLISHED_COUNTER_KEY = 'outbox:published:m:{minute}'
+MAX_RETRY_DELAY = 300
+
+
+def enqueue(task, args=(), kwargs=None, key='', delay=0):
+    """Record a task call to be published once the current transaction commits.
+
+    Args:
+        task: Celery task or registered task name
+        args: Positional task arguments (JSON-serializable)
+        kwargs: Keyword task arguments (JSON-serializable)
+        key: Correlation key to look the message up by, e.g. a job id
+        delay: Seconds to hold the message back before publishing it
+    """
+    return OutboxMessage.objects.create(
+        task_name=getattr(task, 'name', task),
+        args=list(args),
+        kwargs=kwargs or {},
+        key=str(key),
+        available_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def _producer():
+    # Eager tasks run in-process and never reach the broker
+    if current_app.conf.task_always_eager:
+        return nullcontext(None)
+    return current_app.producer_or_acquire()
+
+
+def _record_published(count):
+    if not count:
+        return
+    try:
+        key = PUBLISHED_COUNTER_KEY.format(minute=int(time.time() // 60))
+        pipe = get_redis().pipeline()
+        pipe.incrby(key, count)
+        pipe.expire(key, 7200)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Could not record outbox throughput: {str(e)}")
+
+
+def dispatch_batch(batch_size=None):
+    """Publish one batch of due outbox messages over a single broker connection.
+
+    Published rows are deleted in the same transaction that locked them.
+    Rows that fail to publish stay in the outbox and are retried with
+    exponential backoff.
+
+    Returns:
+        Tuple of (published count, failed count)
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    published = []
+    failed = 0
+
+    with transaction.atomic():
+        rows = list(
+            OutboxMessage.objects.select_for_update(skip_locked=True)
+            .filter(available_at__lte=timezone.now())
+            .order_by('available_at', 'id')[:batch_size]
+        )
+        if not rows:
+            return 0, 0
+
+        with _producer() as producer:
+            for row in rows:
+                try:
+                    task = current_app.tasks[row.task_name]
+                    task.apply_async(row.args, row.kwargs, producer=producer, retry=False)
+                    published.append(row.pk)
+                except Exception as e:
+                    failed += 1
+                    logger.error(f"Failed to publish outbox message {row.pk} ({row.task_name}): {str(e)}")
+                    row.attempts += 1
+                    row.last_error = str(e)[:1000]
+                    delay = min(settings.OUTBOX_RETRY_BACKOFF * 2 ** (row.attempts - 1), MAX_RETRY_DELAY)
+                    row.available_at = timezone.now() + timedelta(seconds=delay)
+                    row.save(update_fields=['attempts', 'last_error', 'available_at'])
+
+        OutboxMessage.objects.filter(pk__in=published).delete()
+
+    _record_published(len(published))
+    return len(published), failed
+
+
+def is_pending(key):
+    """Return True if a message with this correlation key is still unpublished."""
+    return OutboxMessage.objects.filter(key=str(key)).exists()
+
+
+def stats():
+    """Return the outbox backlog and the cluster-wide publish throughput."""
+    backlog = OutboxMessage.objects.aggregate(oldest=Min('created_at'))
+    pending = OutboxMessage.objects.count()
+    oldest = backlog['oldest']
+
+    minute = int(time.time() // 60)
+    try:
+        counts = get_redis().mget([PUBLISHED_COUNTER_KEY.format(minute=minute - i) for i in range(61)])
+        counts = [int(v) if v else 0 for v in counts]
+    except Exception as e:
+        logger.warning(f"Could not read outbox throughput: {str(e)}")
+        counts = None
+
+    return {
+        'pending': pending,
+        'oldest_age_seconds': round((timezone.now() - oldest).total_seconds(), 1) if oldest else None,
+        # The current minute is still filling, so rates use the previous one
+        'published_per_second': round(counts[1] / 60, 2) if counts else None,
+        'published_last_hour': sum(counts[1:]) if counts else None,
+    }
@@ -0,0 +1,171 @@
+"""Live progress of notification jobs, kept in a small Redis hash per job.
+
+Every ``send_email_task`` working on a job adds its counts to the same hash
+with HINCRBY, so chunks running in parallel on different workers report into
+one place. The status endpoint reads the hash directly instead of going
+through the Celery result backend.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+
+from config.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_FORMAT = 'notify:job:{job_id}'
+
+
+def _key(job_id):
+    return KEY_FORMAT.format(job_id=job_id)
+
+
+def start_job(job_id, total=None):
+    """Register a queued job with its recipient count.
+
+    ``total`` may be left out while the recipients are still being resolved
+    and set later with ``set_total``. Counters of a job that is already
+    registered are kept, so a redelivered dispatch does not reset progress
+    that running chunks have reported.
+    """
+    try:
+        key = _key(job_id)
+        pipe = get_redis().pipeline()
+        for field, value in (('sent', 0), ('failed', 0), ('version', 0), ('queued_at', time.time())):
+            pipe.hsetnx(key, field, value)
+        if total is not None:
+            pipe.hset(key, 'total', total)
+        pipe.expire(key, settings.NOTIFY_JOB_TTL)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Could not record progress for job {job_id}: {str(e)}")
+
+
+def set_total(job_id, total):
+    """Set the recipient count of a registered job, leaving its counters alone."""
+    try:
+        key = _key(job_id)
+        pipe = get_redis().pipeline()
+        pipe.hset(key, 'total', total)
+        pipe.expire(key, settings.NOTIFY_JOB_TTL)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Could not record progress for job {job_id}: {str(e)}")
+
+
+def record_progress(job_id, sent=0, failed=0):
+    """Add delivered/failed counts to a job."""
+    if not job_id or not (sent or failed):
+        return
+    try:
+        key = _key(job_id)
+        now = time.time()
+        pipe = get_redis().pipeline()
+        pipe.hsetnx(key, 'started_at', now)
+        pipe.hincrby(key, 'sent', sent)
+        pipe.hincrby(key, 'failed', failed)
+        pipe.hincrby(key, 'version', 1)
+        pipe.hset(key, 'updated_at', now)
+        pipe.expire(key, settings.NOTIFY_JOB_TTL)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Could not record progress for job {job_id}: {str(e)}")
+
+
+def get_progress(job_id):
+    """Return the progress of a job as a dict, or None if it is unknown."""
+    raw = get_redis().hgetall(_key(job_id))
+    if not raw:
+        return None
+    data = {k.decode(): v.decode() for k, v in raw.items()}
+
+    sent = int(data['sent'])
+    failed = int(data['failed'])
+    processed = sent + failed
+    started_at = float(data['started_at']) if 'started_at' in data else None
+    updated_at = float(data['updated_at']) if 'updated_at' in data else None
+
+    if 'total' not in data:
+        # Audience still being resolved by the worker
+        return {
+            'job_id': str(job_id),
+            'status': 'resolving',
+            'total': None,
+            'queued': None,
+            'sent': sent,
+            'failed': failed,
+            'rate_per_second': None,
+            'eta_seconds': None,
+            'version': int(data['version']),
+        }
+
+    total = int(data['total'])
+    if processed >= total:
+        job_status = 'completed'
+    elif started_at is None:
+        job_status = 'queued'
+    else:
+        job_status = 'sending'
+
+    rate = None
+    eta_seconds = None
+    if started_at is not None and processed:
+        end = updated_at if job_status == 'completed' else time.time()
+        elapsed = max(end - started_at, 0.001)
+        rate = round(processed / elapsed, 2)
+        if job_status != 'completed':
+            eta_seconds = round((total - processed) / rate, 1)
+
+    return {
+        'job_id': str(job_id),
+        'status': job_status,
+        'total': total,
+        'queued': total - processed,
+        'sent': sent,
+        'failed': failed,
+        'rate_per_second': rate,
+        'eta_seconds': eta_seconds,
+        'version': int(data['version']),
+    }
+
+
+def wait_for_progress(job_id, since_version, timeout):
+    """Long-poll: return progress once its version moves past ``since_version``.
+
+    Returns whatever is current when ``timeout`` seconds pass, or as soon as
+    the job completes.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        progress = get_progress(job_id)
+        if (
+            progress is None
+            or progress['version'] != since_version
+            or progress['status'] == 'completed'
+            or time.monotonic() >= deadline
+        ):
+            return progress
+        time.sleep(settings.NOTIFY_STATUS_POLL_INTERVAL)
+
+
+class ProgressReporter:
+    """Buffer per-message results and flush them to Redis every ``every`` messages."""
+
+    def __init__(self, job_id, every=None):
+        self.job_id = job_id
+        self.every = every or settings.EMAIL_PROGRESS_EVERY
+        self.sent = 0
+        self.failed = 0
+
+    def add(self, sent=0, failed=0):
+        self.sent += sent
+        self.failed += failed
+        if self.sent + self.failed >= self.every:
+            self.flush()
+
+    def flush(self):
+        record_progress(self.job_id, sent=self.sent, failed=self.failed)
+        self.sent = 0
+        self.failed = 0
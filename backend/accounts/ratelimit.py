@@ -0,0 +1,157 @@
+"""Cluster-wide SMTP send rate limiting.
+
+Every email task, on every worker process and container, takes a token from
+the same Redis token buckets before sending, so the combined send rate stays
+under the provider's messages-per-second and messages-per-hour limits.
+Successful sends are also counted per second and per minute so the current
+send rate can be reported.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+
+from config.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+BUCKET_KEY = 'smtp:bucket:{name}'
+SECOND_COUNTER_KEY = 'smtp:sent:s:{second}'
+MINUTE_COUNTER_KEY = 'smtp:sent:m:{minute}'
+
+# KEYS[1..n]     = bucket keys
+# KEYS[n+1..n+2] = per-second and per-minute send counters
+# ARGV[2i-1], ARGV[2i] = capacity and refill rate (tokens per ms) of bucket i
+# Takes one token from every bucket, or none if any bucket is empty.
+# Returns {granted, wait_ms}.
+TOKEN_BUCKET_SCRIPT = """
+local n = #KEYS - 2
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+local tokens = {}
+local wait = 0
+for i = 1, n do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    local state = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+    local available = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    available = math.min(capacity, available + math.max(0, now - ts) * rate)
+    tokens[i] = available
+    if available < 1 then
+        wait = math.max(wait, (1 - available) / rate)
+    end
+end
+
+local granted = 0
+if wait == 0 then
+    granted = 1
+end
+
+for i = 1, n do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    redis.call('HSET', KEYS[i], 'tokens', tostring(tokens[i] - granted), 'ts', now)
+    redis.call('PEXPIRE', KEYS[i], math.ceil(capacity / rate) + 1000)
+end
+
+if granted == 1 then
+    redis.call('INCR', KEYS[n + 1])
+    redis.call('EXPIRE', KEYS[n + 1], 120)
+    redis.call('INCR', KEYS[n + 2])
+    redis.call('EXPIRE', KEYS[n + 2], 7200)
+    return {1, 0}
+end
+return {0, math.ceil(wait)}
+"""
+
+_script = None
+
+
+def _token_bucket():
+    global _script
+    if _script is None:
+        _script = get_redis().register_script(TOKEN_BUCKET_SCRIPT)
+    return _script
+
+
+def configured_limits():
+    """Return the configured limits as (name, count, period in seconds) tuples."""
+    limits = []
+    if settings.EMAIL_RATE_PER_SECOND:
+        limits.append(('second', settings.EMAIL_RATE_PER_SECOND, 1))
+    if settings.EMAIL_RATE_PER_HOUR:
+        limits.append(('hour', settings.EMAIL_RATE_PER_HOUR, 3600))
+    return limits
+
+
+def try_acquire():
+    """Take one send token.
+
+    Returns 0 if the message may be sent now, otherwise the number of
+    seconds until a token becomes available. Fails open if Redis is down.
+    """
+    limits = configured_limits()
+    if not limits:
+        return 0
+
+    now = time.time()
+    keys = [BUCKET_KEY.format(name=name) for name, _, _ in limits]
+    keys.append(SECOND_COUNTER_KEY.format(second=int(now)))
+    keys.append(MINUTE_COUNTER_KEY.format(minute=int(now // 60)))
+    args = []
+    for _, count, period in limits:
+        # Rates below one per period still need room for a whole token
+        args.extend([max(1, count), count / (period * 1000)])
+
+    try:
+        granted, wait_ms = _token_bucket()(keys=keys, args=args, client=get_redis())
+    except Exception as e:
+        logger.warning(f"SMTP rate limiter skipped, Redis unavailable: {str(e)}")
+        return 0
+    if granted:
+        return 0
+    return int(wait_ms) / 1000
+
+
+def acquire(max_sleep=None):
+    """Take one send token, sleeping through short waits.
+
+    Waits of up to ``max_sleep`` seconds (default ``EMAIL_RATE_MAX_SLEEP``)
+    are slept off in-process. Returns 0 once a token is taken, or the wait in
+    seconds if it is longer than that, in which case the caller should
+    reschedule instead of blocking the worker.
+    """
+    if max_sleep is None:
+        max_sleep = settings.EMAIL_RATE_MAX_SLEEP
+    while True:
+        wait = try_acquire()
+        if not wait:
+            return 0
+        if wait > max_sleep:
+            return wait
+        time.sleep(wait)
+
+
+def current_rate():
+    """Return the cluster-wide send rate from the per-second/minute counters."""
+    now = time.time()
+    second = int(now)
+    minute = int(now // 60)
+    window = 10
+    client = get_redis()
+    # Skip the current, still-filling second
+    recent = client.mget([SECOND_COUNTER_KEY.format(second=second - i) for i in range(1, window + 1)])
+    hourly = client.mget([MINUTE_COUNTER_KEY.format(minute=minute - i) for i in range(60)])
+    last_seconds = sum(int(v) for v in recent if v)
+
+    return {
+        'per_second': round(last_seconds / window, 2),
+        'last_hour': sum(int(v) for v in hourly if v),
+        'limits': {
+            'per_second': settings.EMAIL_RATE_PER_SECOND,
+            'per_hour': settings.EMAIL_RATE_PER_HOUR,
+        },
+    }
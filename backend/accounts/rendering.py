@@ -0,0 +1,152 @@
+"""Rendering of admin notification messages.
+
+The Markdown body is rendered to sanitized HTML once per job and cached in
+Redis by content hash, so every chunk of a fanned-out job reuses it. The
+text and HTML parts are encoded once per task and shared by every message
+unless the notification uses per-recipient variables such as
+``{{ username }}``, in which case only the precompiled substitution and
+encoding run per recipient.
+"""
+
+import hashlib
+import logging
+import re
+
+import markdown
+import nh3
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.template.loader import render_to_string
+from django.utils.html import escape
+
+from config.metrics import record_cache
+from config.redis_client import get_redis
+
+from .mail import PreparedEmailMessage, encode_part
+
+logger = logging.getLogger(__name__)
+
+HTML_CACHE_KEY = 'notify:html:{digest}'
+HTML_TEMPLATE = 'accounts/email/notification.html'
+MARKDOWN_EXTENSIONS = ['extra', 'sane_lists', 'nl2br']
+
+ALLOWED_TAGS = {
+    'a', 'b', 'blockquote', 'br', 'code', 'del', 'em', 'h1', 'h2', 'h3',
+    'h4', 'h5', 'h6', 'hr', 'i', 'li', 'ol', 'p', 'pre', 'strong', 'table',
+    'tbody', 'td', 'th', 'thead', 'tr', 'ul',
+}
+ALLOWED_ATTRIBUTES = {'a': {'href', 'title'}}
+
+# Per-recipient variables available in subject and body
+VARIABLES = ('email', 'username')
+VARIABLE_RE = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+
+class CompiledTemplate:
+    """Text split once into literal chunks and ``{{ variable }}`` slots.
+
+    Unknown names are left in the text unchanged.
+    """
+
+    def __init__(self, source):
+        self.chunks = []
+        self.variables = set()
+        position = 0
+        for match in VARIABLE_RE.finditer(source):
+            name = match.group(1)
+            if name not in VARIABLES:
+                continue
+            self.chunks.append(source[position:match.start()])
+            self.chunks.append(name)
+            self.variables.add(name)
+            position = match.end()
+        self.chunks.append(source[position:])
+
+    def render(self, context, escape_values=False):
+        if not self.variables:
+            return self.chunks[0]
+        out = []
+        for i, chunk in enumerate(self.chunks):
+            if i % 2:
+                value = str(context.get(chunk, ''))
+                chunk = escape(value) if escape_values else value
+            out.append(chunk)
+        return ''.join(out)
+
+
+def markdown_to_html(source):
+    """Render Markdown to HTML stripped of anything but basic formatting."""
+    html = markdown.markdown(source, extensions=MARKDOWN_EXTENSIONS)
+    return nh3.clean(
+        html,
+        tags=ALLOWED_TAGS,
+        attributes=ALLOWED_ATTRIBUTES,
+        url_schemes={'http', 'https', 'mailto'},
+    )
+
+
+def render_html(subject, body):
+    """Return the full HTML email for a notification, cached by content hash."""
+    digest = hashlib.sha256(f'{subject}\0{body}'.encode()).hexdigest()
+    key = HTML_CACHE_KEY.format(digest=digest)
+    try:
+        cached = get_redis().get(key)
+        record_cache('email_html', cached is not None)
+        if cached is not None:
+            return cached.decode()
+    except Exception as e:
+        logger.warning(f"Rendered email cache unavailable: {str(e)}")
+
+    html = render_to_string(HTML_TEMPLATE, {'subject': subject, 'content': markdown_to_html(body)})
+    try:
+        get_redis().set(key, html, ex=settings.NOTIFY_JOB_TTL)
+    except Exception as e:
+        logger.warning(f"Could not cache rendered email: {str(e)}")
+    return html
+
+
+def recipient_context(emails):
+    """Return {email: variables} for the given recipients in one query."""
+    users = get_user_model().objects.filter(email__in=emails).values_list('email', 'username')
+    context = {email: {'email': email, 'username': ''} for email in emails}
+    for email, username in users:
+        context[email]['username'] = username
+    return context
+
+
+class NotificationTemplate:
+    """A notification rendered once and turned into one message per recipient.
+
+    Usage::
+
+        template = NotificationTemplate(subject, body)
+        contexts = recipient_context(recipients) if template.variables else {}
+        for recipient in recipients:
+            message = template.build(recipient, contexts.get(recipient))
+    """
+
+    def __init__(self, subject, body):
+        self.subject = CompiledTemplate(subject)
+        self.text = CompiledTemplate(body)
+        self.html = CompiledTemplate(render_html(subject, body))
+        self.variables = self.subject.variables | self.text.variables | self.html.variables
+        self._shared_parts = None
+        if not self.variables:
+            self._shared_parts = self._encode(body, self.html.render({}))
+
+    def _encode(self, text, html):
+        return [encode_part(text, 'plain'), encode_part(html, 'html')]
+
+    def build(self, recipient, context=None, connection=None):
+        """Build the message for one recipient."""
+        context = context or {'email': recipient}
+        text = self.text.render(context)
+        parts = self._shared_parts or self._encode(text, self.html.render(context, escape_values=True))
+        return PreparedEmailMessage(
+            parts,
+            subject=self.subject.render(context),
+            body=text,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[recipient],
+            connection=connection,
+        )
@@ -9,7 +9,7 @@ class UserSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = User
-        fields = ('id', 'email', 'username', 'is_active', 'is_staff', 'is_superuser')
+        fields = ('id', 'email', 'username', 'is_active', 'is_staff', 'is_superuser', 'daily_digest')
         read_only_fields = ('id', 'is_active', 'is_staff', 'is_superuser')
 
 
@@ -0,0 +1,207 @@
+"""Concurrent SMTP delivery from inside a Celery worker process.
+
+Sending mail is almost entirely waiting on the network, so instead of one
+blocking connection per worker process, ``AsyncSMTPPool`` keeps up to
+``EMAIL_SMTP_CONCURRENCY`` aiosmtplib connections open on a per-process
+event loop. Each connection takes the next message from a shared queue as
+soon as it is done with the previous one, so all of them stay busy.
+
+Messages are built and serialized before entering the event loop, and
+results come back to synchronous code, so the database is never touched
+from async context. Errors are translated to their ``smtplib``
+equivalents, which lets ``accounts.mail.needs_reconnect`` and
+``is_permanent_failure`` classify them the same way for both engines.
+"""
+
+import asyncio
+import logging
+import os
+import smtplib
+
+import aiosmtplib
+from django.conf import settings
+from django.core.mail.message import sanitize_address
+
+from .mail import BatchMailer, needs_reconnect
+
+logger = logging.getLogger(__name__)
+
+SMTP_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+
+_loop = None
+_loop_pid = None
+
+
+def get_event_loop():
+    """Return this process's event loop, creating one after a fork."""
+    global _loop, _loop_pid
+    if _loop is None or _loop_pid != os.getpid():
+        _loop = asyncio.new_event_loop()
+        _loop_pid = os.getpid()
+    return _loop
+
+
+def as_smtplib_error(error):
+    """Translate an aiosmtplib exception into the matching smtplib one."""
+    if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        return smtplib.SMTPRecipientsRefused({r.recipient: (r.code, r.message) for r in error.recipients})
+    if isinstance(error, aiosmtplib.SMTPRecipientRefused):
+        return smtplib.SMTPRecipientsRefused({error.recipient: (error.code, error.message)})
+    if isinstance(error, aiosmtplib.SMTPResponseException):
+        return smtplib.SMTPResponseException(error.code, error.message)
+    if isinstance(error, (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPTimeoutError)):
+        return smtplib.SMTPServerDisconnected(str(error))
+    if isinstance(error, aiosmtplib.SMTPConnectError):
+        return smtplib.SMTPConnectError(421, str(error))
+    return error
+
+
+class _Connection:
+    def __init__(self, client):
+        self.client = client
+        self.sent = 0
+
+
+class AsyncSMTPPool:
+    """Deliver messages over up to ``size`` concurrent SMTP connections.
+
+    Has the same interface as ``BatchMailer``: every connection is
+    recycled after ``batch_size`` messages, and a message whose connection
+    drops is retried on a fresh one up to ``max_reconnects`` times.
+    Connections stay open between ``send_many`` calls until ``close``.
+
+    Usage::
+
+        with AsyncSMTPPool() as mailer:
+            errors = mailer.send_many(messages)
+    """
+
+    def __init__(self, size=None, batch_size=None, max_reconnects=None):
+        self.size = size or settings.EMAIL_SMTP_CONCURRENCY
+        self.batch_size = batch_size or settings.EMAIL_BATCH_SIZE
+        if max_reconnects is None:
+            max_reconnects = settings.EMAIL_MAX_RECONNECTS
+        self.max_reconnects = max_reconnects
+        self.connections_opened = 0
+        self._idle = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def send(self, message):
+        """Send one message; raises its error if it could not be delivered."""
+        error = self.send_many([message])[0]
+        if error is not None:
+            raise error
+
+    def send_many(self, messages):
+        """Send messages concurrently.
+
+        Returns a list with, for each message, None if it was sent or the
+        (smtplib) exception it failed with. A message that cannot be
+        serialized, e.g. for a malformed address, fails on its own like it
+        does with ``BatchMailer``.
+        """
+        results = [None] * len(messages)
+        envelopes = []
+        for index, message in enumerate(messages):
+            try:
+                envelopes.append((index, self._envelope(message)))
+            except Exception as e:
+                results[index] = e
+        if envelopes:
+            get_event_loop().run_until_complete(self._send_all(envelopes, results))
+        return results
+
+    @staticmethod
+    def _envelope(message):
+        encoding = message.encoding or settings.DEFAULT_CHARSET
+        return (
+            sanitize_address(message.from_email, encoding),
+            [sanitize_address(addr, encoding) for addr in message.recipients()],
+            message.message().as_bytes(linesep='\r\n'),
+        )
+
+    def close(self):
+        if self._idle:
+            get_event_loop().run_until_complete(self._close_all())
+
+    async def _send_all(self, envelopes, results):
+        queue = asyncio.Queue()
+        for item in envelopes:
+            queue.put_nowait(item)
+        workers = min(self.size, len(envelopes))
+        await asyncio.gather(*(self._worker(queue, results) for _ in range(workers)))
+
+    async def _worker(self, queue, results):
+        connection = self._idle.pop() if self._idle else None
+        try:
+            while not queue.empty():
+                index, envelope = queue.get_nowait()
+                connection, results[index] = await self._deliver(connection, envelope)
+        finally:
+            if connection is not None:
+                self._idle.append(connection)
+
+    async def _deliver(self, connection, envelope):
+        """Send one envelope; returns the connection to keep using and the error."""
+        for attempt in range(self.max_reconnects + 1):
+            try:
+                if connection is not None and connection.sent >= self.batch_size:
+                    await self._quit(connection)
+                    connection = None
+                if connection is None:
+                    connection = await self._connect()
+                await connection.client.sendmail(*envelope)
+                connection.sent += 1
+                return connection, None
+            except Exception as e:
+                error = as_smtplib_error(e)
+                if not needs_reconnect(error):
+                    return connection, error
+                if connection is not None:
+                    await self._quit(connection)
+                    connection = None
+                if attempt == self.max_reconnects:
+                    return None, error
+                logger.warning(f"SMTP connection lost ({str(error)}), reconnecting")
+
+    async def _connect(self):
+        client = aiosmtplib.SMTP(
+            hostname=settings.EMAIL_HOST,
+            port=settings.EMAIL_PORT,
+            username=settings.EMAIL_HOST_USER or None,
+            password=settings.EMAIL_HOST_PASSWORD or None,
+            use_tls=settings.EMAIL_USE_SSL,
+            start_tls=settings.EMAIL_USE_TLS,
+            timeout=settings.EMAIL_TIMEOUT,
+        )
+        await client.connect()
+        self.connections_opened += 1
+        return _Connection(client)
+
+    async def _quit(self, connection):
+        try:
+            await connection.client.quit()
+        except Exception as e:
+            connection.client.close()
+            logger.debug(f"Error closing SMTP connection: {str(e)}")
+
+    async def _close_all(self):
+        idle, self._idle = self._idle, []
+        await asyncio.gather(*(self._quit(connection) for connection in idle))
+
+
+def open_mailer():
+    """Return the delivery engine for the configured email backend.
+
+    The async pool speaks SMTP itself, so it is only used with Django's SMTP
+    backend and ``EMAIL_SMTP_CONCURRENCY`` above 1. Other backends (console,
+    locmem in tests) go through ``BatchMailer``.
+    """
+    if settings.EMAIL_BACKEND == SMTP_BACKEND and settings.EMAIL_SMTP_CONCURRENCY > 1:
+        return AsyncSMTPPool()
+    return BatchMailer()
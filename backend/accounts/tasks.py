@@ -1,53 +1,288 @@
-from celery import shared_task
-from django.core.mail import send_mail
+from celery import chord, shared_task
 from django.conf import settings
 import logging
 
+from .audiences import pk_ranges, resolve_emails
+from . import claimcheck, deadletter
+from .ledger import DeliveryLedger
+from . import ratelimit
+from .progress import ProgressReporter, set_total, start_job
+from .rendering import NotificationTemplate, recipient_context
+from .smtp_pool import open_mailer
+
 logger = logging.getLogger(__name__)
 
 
 @shared_task(bind=True, max_retries=3)
-def send_email_task(self, recipients, subject, message):
+def send_email_task(self, recipients, subject, message, job_id=None, audience=None, reschedules=0):
     """
     Celery task for sending emails asynchronously.
+
+    Messages go out over up to ``EMAIL_SMTP_CONCURRENCY`` concurrent SMTP
+    connections (see ``accounts.smtp_pool``), each recycled every
+    ``EMAIL_BATCH_SIZE`` messages and reopened if the server drops it.
+
+    The Markdown body is sent as multipart/alternative text and sanitized
+    HTML, rendered once for the whole job (see ``accounts.rendering``).
+    ``{{ email }}`` and ``{{ username }}`` in the subject or body are
+    replaced per recipient.
+
+    When run through Celery, every recipient is tracked in the
+    ``EmailDelivery`` ledger. Transient failures are retried per recipient
+    with exponential backoff, and any rerun only sends to recipients that
+    are still pending, never to ones already delivered.
+
+    Sends are paced by the cluster-wide SMTP rate limiter. Short waits are
+    slept off; when the limit is exhausted for longer, the task reschedules
+    itself and the remaining recipients are picked up from the ledger.
+    Reschedules do not use up the task's error retries; after
+    ``EMAIL_MAX_RESCHEDULES`` of them the remaining recipients are abandoned.
+
+    Recipients that fail for good, including those left over when the task
+    runs out of retries or reschedules, go to the dead-letter store (``accounts.deadletter``)
+    for later replay.
+
+    Large ``recipients`` and ``message`` values may be passed as claim-check
+    references (see ``accounts.claimcheck``); a large ``failed_emails``
+    list in the result is returned as one too.
     
     Args:
-        recipients: List of email addresses
+        recipients: List of email addresses, or a claim-check reference
         subject: Email subject
-        message: Email body (can be Markdown)
+        message: Email body (can be Markdown), or a claim-check reference
+        job_id: Notification job to report progress to; defaults to the task id
+        audience: Instead of ``recipients``, a dict with an audience ``name``
+            and the ``after``/``upto`` primary keys of the range to send to
+        reschedules: Times the task has rescheduled itself; set by ``reschedule``
     """
+    job_id = job_id or self.request.id
+    ledger = None
+    retry_in = None
+    rate_limited_for = None
+
     try:
-        logger.info(f"Sending email to {len(recipients)} recipients")
+        recipients = claimcheck.unwrap(recipients)
+        message = claimcheck.unwrap(message)
+        if recipients is None:
+            recipients = resolve_emails(audience['name'], audience['after'], audience['upto'])
+        ledger = DeliveryLedger(job_id, recipients) if job_id else None
+        pending = ledger.due() if ledger else recipients
+        logger.info(f"Sending email to {len(pending)} of {len(recipients)} recipients")
         
         sent_count = 0
         failed_emails = []
         
-        for recipient in recipients:
-            try:
-                send_mail(
-                    subject=subject,
-                    message=message,
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[recipient],
-                    fail_silently=False,
-                )
-                sent_count += 1
-                logger.info(f"Email sent successfully to {recipient}")
-            except Exception as e:
-                logger.error(f"Failed to send email to {recipient}: {str(e)}")
-                failed_emails.append(recipient)
+        progress = ProgressReporter(job_id)
+        template = NotificationTemplate(subject, message)
+        contexts = recipient_context(pending) if template.variables else {}
         
-        result = {
-            'sent_count': sent_count,
-            'failed_count': len(failed_emails),
-            'failed_emails': failed_emails,
-            'total': len(recipients)
-        }
-        
-        logger.info(f"Email task completed: {result}")
-        return result
+        with open_mailer() as mailer:
+            for window in chunked(pending, settings.EMAIL_PROGRESS_EVERY):
+                batch = []
+                for recipient in window:
+                    # Without a ledger there is nothing to resume from, so wait it out
+                    wait = ratelimit.acquire(max_sleep=None if ledger else float('inf'))
+                    if wait:
+                        rate_limited_for = wait
+                        break
+                    batch.append(recipient)
+
+                messages = [template.build(recipient, contexts.get(recipient)) for recipient in batch]
+                for recipient, error in zip(batch, mailer.send_many(messages)):
+                    if error is None:
+                        sent_count += 1
+                        progress.add(sent=1)
+                        if ledger:
+                            ledger.sent(recipient)
+                        logger.debug(f"Email sent successfully to {recipient}")
+                        continue
+                    logger.error(f"Failed to send email to {recipient}: {str(error)}")
+                    # Only final failures count; the rest are retried below
+                    if ledger is None or ledger.failed(recipient, error):
+                        failed_emails.append(recipient)
+                        progress.add(failed=1)
+
+                if rate_limited_for is not None:
+                    break
+        progress.flush()
+
+        if ledger:
+            ledger.flush()
+            deadletter.record(job_id, subject, message, ledger.dead)
+            retry_in = ledger.next_retry_in()
+            if rate_limited_for is not None:
+                retry_in = rate_limited_for if retry_in is None else min(retry_in, rate_limited_for)
+            sent_count, failed_emails = ledger.summary()
         
     except Exception as exc:
         logger.error(f"Email task failed: {str(exc)}")
-        # Retry after 60 seconds
-        raise self.retry(exc=exc, countdown=60)
+        if ledger is not None:
+            try:
+                if error_retries(self, reschedules) >= self.max_retries:
+                    # Out of retries: nobody left in the ledger will be sent to
+                    ledger.abandon(exc)
+                deadletter.record(job_id, subject, message, ledger.dead)
+            except Exception as e:
+                logger.error(f"Could not record dead letters for job {job_id}: {str(e)}")
+        # Retry after 60 seconds; the ledger keeps delivered recipients from being re-sent
+        raise retry_after_error(self, exc, reschedules, countdown=60)
+
+    if retry_in is not None:
+        if reschedules < settings.EMAIL_MAX_RESCHEDULES:
+            if rate_limited_for is not None:
+                logger.info(f"SMTP rate limit reached, rescheduling in {retry_in:.1f}s")
+            raise reschedule(self, retry_in, reschedules)
+        logger.error(f"Email job {job_id} still has undelivered recipients after {reschedules} reschedules")
+        ledger.abandon(f'Undelivered after {reschedules} reschedules')
+        deadletter.record(job_id, subject, message, ledger.dead)
+        sent_count, failed_emails = ledger.summary()
+
+    result = {
+        'sent_count': sent_count,
+        'failed_count': len(failed_emails),
+        'failed_emails': claimcheck.wrap(failed_emails),
+        'total': len(recipients)
+    }
+    
+    logger.info(f"Email task completed: {sent_count}/{len(recipients)} sent, {len(failed_emails)} failed")
+    return result
+
+
+@shared_task
+def aggregate_email_results(results, job_id=None):
+    """
+    Chord callback combining the results of all chunks of a notification job.
+
+    Returns the same schema as ``send_email_task`` so callers do not need to
+    know whether a job was split. Chunk ``failed_emails`` stored as claim
+    checks are read back, and the combined list is stored again if large.
+    """
+    failed_emails = []
+    sent_count = 0
+    total = 0
+    for chunk_result in results:
+        sent_count += chunk_result['sent_count']
+        total += chunk_result['total']
+        failed_emails.extend(claimcheck.unwrap(chunk_result['failed_emails']))
+
+    result = {
+        'sent_count': sent_count,
+        'failed_count': len(failed_emails),
+        'failed_emails': claimcheck.wrap(failed_emails),
+        'total': total,
+        'chunks': len(results),
+    }
+    logger.info(f"Email job {job_id} completed: {sent_count}/{total} sent in {len(results)} chunks")
+    return result
+
+
+def error_retries(task, reschedules):
+    """Number of times ``task`` was retried after an error, not counting reschedules."""
+    return task.request.retries - reschedules
+
+
+def retry_after_error(task, exc, reschedules, countdown):
+    """Retry ``task`` after ``exc``, allowing ``max_retries`` error retries on top of its reschedules."""
+    return task.retry(exc=exc, countdown=countdown, max_retries=task.max_retries + reschedules)
+
+
+def reschedule(task, countdown, reschedules):
+    """
+    Run ``task`` again in ``countdown`` seconds to pick up recipients still due.
+
+    Waits for ledger backoff or the rate limiter are not errors, so they are
+    counted in the task's ``reschedules`` keyword argument instead of using
+    up its ``max_retries``. Callers bound them with ``EMAIL_MAX_RESCHEDULES``.
+    """
+    kwargs = dict(task.request.kwargs or {}, reschedules=reschedules + 1)
+    return task.retry(countdown=countdown, kwargs=kwargs, max_retries=task.request.retries + 1)
+
+
+def chunked(items, size):
+    """Split a list into consecutive lists of at most ``size`` items."""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _run_chunks(header, job_id):
+    """Run chunk signatures under ``job_id``: directly if one, as a chord if more."""
+    if len(header) == 1:
+        return header[0].apply_async(task_id=job_id)
+    callback = aggregate_email_results.s(job_id=job_id).set(task_id=job_id)
+    return chord(header)(callback)
+
+
+def dispatch_email_job(recipients, subject, message, job_id, chunk_size=None):
+    """
+    Queue a notification job, fanning large recipient lists out over workers.
+
+    Lists that fit in one chunk are sent by a single ``send_email_task``.
+    Larger lists become a chord: one ``send_email_task`` per chunk, run in
+    parallel by all worker processes, followed by ``aggregate_email_results``.
+    Either way the final result is stored under ``job_id`` and live progress
+    is reported to ``accounts.progress``.
+
+    Large chunks and message bodies go through the broker as claim-check
+    references; the body is stored once and shared by every chunk.
+
+    Returns:
+        Tuple of (AsyncResult for the job, number of chunks)
+    """
+    chunks = chunked(recipients, chunk_size or settings.EMAIL_FANOUT_CHUNK_SIZE)
+    start_job(job_id, len(recipients))
+
+    message = claimcheck.wrap(message)
+    header = [
+        send_email_task.s(claimcheck.wrap(chunk), subject, message, job_id=job_id)
+        for chunk in chunks
+    ]
+    return _run_chunks(header, job_id), len(chunks)
+
+
+@shared_task
+def dispatch_recipients_task(recipients, subject, message, job_id):
+    """
+    Queue a notification job for an explicit recipient list.
+
+    Published from the transactional outbox; ``recipients`` is usually a
+    claim-check reference written in the same transaction.
+    """
+    recipients = claimcheck.unwrap(recipients)
+    _, chunks = dispatch_email_job(recipients, subject, message, job_id)
+    return {'chunks': chunks, 'total': len(recipients)}
+
+
+@shared_task
+def dispatch_audience_task(audience, subject, message, job_id):
+    """
+    Resolve a named audience into primary-key ranges and fan them out.
+
+    Each chunk task receives only the audience name and its pk range and
+    looks the emails up itself, so broker messages stay the same size
+    however many users the audience matches.
+    """
+    start_job(job_id)
+    ranges, total = pk_ranges(audience, settings.EMAIL_FANOUT_CHUNK_SIZE)
+    set_total(job_id, total)
+    logger.info(f"Audience '{audience}' resolved to {total} recipients in {len(ranges)} chunks")
+
+    if not ranges:
+        return {'sent_count': 0, 'failed_count': 0, 'failed_emails': [], 'total': 0}
+
+    header = [
+        send_email_task.s(
+            None, subject, message,
+            job_id=job_id,
+            audience={'name': audience, 'after': after, 'upto': upto},
+        )
+        for after, upto in ranges
+    ]
+    _run_chunks(header, job_id)
+    return {'chunks': len(ranges), 'total': total}
+
+
+@shared_task
+def purge_claim_checks():
+    """Periodic task deleting expired claim-check payloads and results."""
+    deleted = claimcheck.purge_expired()
+    logger.info(f"Purged {deleted} expired claim checks")
+    return deleted
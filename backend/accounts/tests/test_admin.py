@@ -1,8 +1,11 @@
+import smtplib
 import uuid
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
+from accounts import outbox
+from accounts.models import OutboxMessage
 from tasks.models import Task
 from unittest.mock import patch
 
@@ -133,7 +136,7 @@ class AdminNotifyTests(TestCase):
         })
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
-    @patch('accounts.views.send_email_task.apply_async')
+    @patch('accounts.tasks.send_email_task.apply_async')
     def test_notify_success(self, mock_task):
         """Test successful email notification queueing."""
         mock_task.return_value.id = 'test-task-id'
@@ -151,9 +154,32 @@ class AdminNotifyTests(TestCase):
         self.assertIn('job_id', response.data)
         self.assertIn('task_id', response.data)
         self.assertEqual(response.data['status'], 'queued')
-        
-        # Verify task was called
+
+        # Queued in the outbox, published by the dispatcher
+        self.assertTrue(OutboxMessage.objects.filter(key=response.data['job_id']).exists())
+        mock_task.assert_not_called()
+        self.assertEqual(outbox.dispatch_batch(), (1, 0))
         mock_task.assert_called_once()
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    @patch('accounts.tasks.chord')
+    def test_notify_fans_out_large_lists(self, mock_chord):
+        """Test that large recipient lists are split into a chord of chunks."""
+        mock_chord.return_value.return_value.id = 'chord-id'
+        recipients = [f'user{i}@example.com' for i in range(5)]
+
+        self.client.force_authenticate(user=self.admin)
+        with self.settings(EMAIL_FANOUT_CHUNK_SIZE=2):
+            response = self.client.post('/api/accounts/admin/notify/', {
+                'recipients': recipients,
+                'message': 'Test message'
+            }, format='json')
+            outbox.dispatch_batch()
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['chunks'], 3)
+        header = mock_chord.call_args[0][0]
+        self.assertEqual([sig.args[0] for sig in header], [recipients[:2], recipients[2:4], recipients[4:]])
 
     def test_notify_requires_recipients(self):
         """Test that recipients are required."""
@@ -190,9 +216,9 @@ class AdminNotifyTests(TestCase):
 class CeleryTaskTests(TestCase):
     """Tests for Celery email tasks."""
 
-    @patch('accounts.tasks.send_mail')
-    def test_send_email_task_success(self, mock_send_mail):
+    def test_send_email_task_success(self):
         """Test successful email sending task."""
+        from django.core import mail
         from accounts.tasks import send_email_task
         
         uid1 = uuid.uuid4().hex[:8]
@@ -206,15 +232,16 @@ class CeleryTaskTests(TestCase):
         self.assertEqual(result['sent_count'], 2)
         self.assertEqual(result['failed_count'], 0)
         self.assertEqual(result['total'], 2)
-        self.assertEqual(mock_send_mail.call_count, 2)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[0].to, [recipients[0]])
 
-    @patch('accounts.tasks.send_mail')
-    def test_send_email_task_partial_failure(self, mock_send_mail):
+    @patch('accounts.mail.BatchMailer.send')
+    def test_send_email_task_partial_failure(self, mock_send):
         """Test email task with partial failures."""
         from accounts.tasks import send_email_task
         
         # First call succeeds, second fails
-        mock_send_mail.side_effect = [None, Exception('Email failed')]
+        mock_send.side_effect = [None, Exception('Email failed')]
         
         uid1 = uuid.uuid4().hex[:8]
         uid2 = uuid.uuid4().hex[:8]
@@ -227,3 +254,134 @@ class CeleryTaskTests(TestCase):
         self.assertEqual(result['sent_count'], 1)
         self.assertEqual(result['failed_count'], 1)
         self.assertIn(f'fail_{uid2}@example.com', result['failed_emails'])
+
+    def test_fanned_out_job_aggregates_results(self):
+        """Test that the chord callback sums the results of every chunk."""
+        from accounts.tasks import dispatch_email_job
+
+        recipients = [f'user{i}@example.com' for i in range(5)]
+        job_id = str(uuid.uuid4())
+
+        refused = smtplib.SMTPRecipientsRefused({'user3@example.com': (550, b'No such user')})
+        with patch('accounts.mail.BatchMailer.send', side_effect=[None, None, None, refused, None]):
+            async_result, chunks = dispatch_email_job(recipients, 'Subject', 'Body', job_id, chunk_size=2)
+
+        result = async_result.get()
+        self.assertEqual(chunks, 3)
+        self.assertEqual(result['sent_count'], 4)
+        self.assertEqual(result['failed_emails'], ['user3@example.com'])
+        self.assertEqual(result['total'], 5)
+        self.assertEqual(result['chunks'], 3)
+
+
+class AdminNotifyStatusTests(TestCase):
+    """Tests for the notification job status endpoint."""
+
+    def setUp(self):
+        self.client = APIClient()
+        uid = uuid.uuid4().hex[:8]
+        self.admin = User.objects.create_superuser(
+            email=f'admin_{uid}@example.com',
+            username=f'admin_{uid}',
+            password='AdminPass123!'
+        )
+        self.client.force_authenticate(user=self.admin)
+
+    def status_url(self, job_id):
+        return f'/api/accounts/admin/notify/{job_id}/'
+
+    def test_status_requires_admin(self):
+        """Test that regular users cannot read job status."""
+        uid = uuid.uuid4().hex[:8]
+        user = User.objects.create_user(
+            email=f'user_{uid}@example.com',
+            username=f'user_{uid}',
+            password='UserPass123!'
+        )
+        self.client.force_authenticate(user=user)
+        response = self.client.get(self.status_url(uuid.uuid4()))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_unknown_job_returns_404(self):
+        """Test that an unknown job id is reported as not found."""
+        response = self.client.get(self.status_url(uuid.uuid4()))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_status_after_completed_job(self):
+        """Test that a finished job reports its final counts."""
+        response = self.client.post('/api/accounts/admin/notify/', {
+            'recipients': ['a@example.com', 'b@example.com', 'c@example.com'],
+            'message': 'Test message'
+        }, format='json')
+        job_id = response.data['job_id']
+
+        pending = self.client.get(self.status_url(job_id))
+        outbox.dispatch_batch()
+        response = self.client.get(self.status_url(job_id))
+
+        self.assertEqual(pending.data['status'], 'pending')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'completed')
+        self.assertEqual(response.data['total'], 3)
+        self.assertEqual(response.data['sent'], 3)
+        self.assertEqual(response.data['queued'], 0)
+        self.assertIsNone(response.data['eta_seconds'])
+
+    def test_status_without_redis(self):
+        """Test that a Redis outage gives pending jobs from the outbox and a 503 otherwise."""
+        response = self.client.post('/api/accounts/admin/notify/', {
+            'recipients': ['a@example.com'],
+            'message': 'Test message'
+        }, format='json')
+
+        with patch('accounts.progress.get_redis', side_effect=ConnectionError('Connection refused')):
+            pending = self.client.get(self.status_url(response.data['job_id']))
+            unknown = self.client.get(self.status_url(uuid.uuid4()))
+
+        self.assertEqual(pending.status_code, status.HTTP_200_OK)
+        self.assertEqual(pending.data['status'], 'pending')
+        self.assertEqual(unknown.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    def test_status_while_sending(self):
+        """Test that a running job reports rate and ETA."""
+        from accounts.progress import record_progress, start_job
+
+        job_id = str(uuid.uuid4())
+        start_job(job_id, 10)
+        queued = self.client.get(self.status_url(job_id)).data
+        record_progress(job_id, sent=3, failed=1)
+        sending = self.client.get(self.status_url(job_id)).data
+
+        self.assertEqual(queued['status'], 'queued')
+        self.assertEqual(sending['status'], 'sending')
+        self.assertEqual(sending['queued'], 6)
+        self.assertEqual(sending['failed'], 1)
+        self.assertIsNotNone(sending['rate_per_second'])
+        self.assertIsNotNone(sending['eta_seconds'])
+
+    @patch('accounts.progress.time.sleep')
+    def test_long_poll_waits_for_new_version(self, mock_sleep):
+        """Test that long-polling returns once the progress version changes."""
+        from accounts.progress import record_progress, start_job
+
+        job_id = str(uuid.uuid4())
+        start_job(job_id, 10)
+        # Progress arrives while the request is waiting
+        mock_sleep.side_effect = lambda _: record_progress(job_id, sent=2)
+
+        response = self.client.get(self.status_url(job_id), {'wait': 10, 'version': 0})
+
+        self.assertEqual(response.data['version'], 1)
+        self.assertEqual(response.data['sent'], 2)
+        mock_sleep.assert_called_once()
+
+    def test_invalid_wait_rejected(self):
+        """Test that non-numeric polling parameters are rejected."""
+        response = self.client.get(self.status_url(uuid.uuid4()), {'wait': 'soon'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_non_finite_wait_rejected(self):
+        """Test that NaN and infinite waits are rejected instead of polling forever."""
+        for wait in ('nan', 'inf', '-inf'):
+            response = self.client.get(self.status_url(uuid.uuid4()), {'wait': wait})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, wait)
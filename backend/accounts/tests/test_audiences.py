@@ -0,0 +1,150 @@
+"""Tests for server-side audience selection in admin notifications."""
+
+import uuid
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from accounts import outbox
+from accounts.audiences import get_audience, pk_ranges, resolve_emails
+from accounts.progress import get_progress, record_progress
+from accounts.tasks import dispatch_audience_task
+from tasks.models import Task
+
+User = get_user_model()
+
+
+class AudienceTestCase(TestCase):
+    """Creates users with different task situations."""
+
+    def setUp(self):
+        uid = uuid.uuid4().hex[:8]
+        self.admin = User.objects.create_superuser(
+            email=f'admin_{uid}@example.com',
+            username=f'admin_{uid}',
+            password='AdminPass123!'
+        )
+        self.idle = self.make_user('idle')
+        self.busy = self.make_user('busy')
+        self.late = self.make_user('late')
+        self.inactive = self.make_user('inactive', is_active=False)
+
+        yesterday = timezone.localdate() - timedelta(days=1)
+        Task.objects.create(user=self.idle, title='Done', status=Task.Status.DONE)
+        Task.objects.create(user=self.busy, title='Open', status=Task.Status.DOING)
+        Task.objects.create(
+            user=self.late, title='Late', status=Task.Status.TODO,
+            priority=Task.Priority.HIGH, due_date=yesterday
+        )
+        Task.objects.create(
+            user=self.inactive, title='Late', status=Task.Status.TODO,
+            priority=Task.Priority.HIGH, due_date=yesterday
+        )
+
+    def make_user(self, name, **extra):
+        uid = uuid.uuid4().hex[:8]
+        return User.objects.create_user(
+            email=f'{name}_{uid}@example.com',
+            username=f'{name}_{uid}',
+            password='UserPass123!',
+            **extra
+        )
+
+
+class AudienceQueryTests(AudienceTestCase):
+    """Tests for the audience querysets and range splitting."""
+
+    def test_active_with_open_tasks(self):
+        """Test that only active users with TODO/DOING tasks are selected."""
+        users = set(get_audience('active_with_open_tasks'))
+        self.assertEqual(users, {self.busy, self.late})
+
+    def test_overdue_high_priority(self):
+        """Test that only active users with overdue HIGH tasks are selected."""
+        users = list(get_audience('overdue_high_priority'))
+        self.assertEqual(users, [self.late])
+
+    def test_pk_ranges_cover_audience(self):
+        """Test that ranges split the audience into chunks without gaps."""
+        ranges, total = pk_ranges('all_active', 2)
+
+        self.assertEqual(total, 4)
+        self.assertEqual(len(ranges), 2)
+        emails = [email for after, upto in ranges for email in resolve_emails('all_active', after, upto)]
+        self.assertEqual(emails, list(get_audience('all_active').order_by('pk').values_list('email', flat=True)))
+
+    def test_empty_audience(self):
+        """Test that an audience without users yields no ranges."""
+        Task.objects.all().delete()
+        self.assertEqual(pk_ranges('overdue_high_priority', 10), ([], 0))
+
+
+class AudienceNotifyTests(AudienceTestCase):
+    """Tests for notifying an audience through the admin endpoint."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def test_notify_audience_sends_to_matching_users(self):
+        """Test that an audience job reaches exactly the matching users."""
+        response = self.client.post('/api/accounts/admin/notify/', {
+            'audience': 'active_with_open_tasks',
+            'message': 'You have open tasks'
+        }, format='json')
+        outbox.dispatch_batch()
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['audience'], 'active_with_open_tasks')
+        self.assertEqual({m.to[0] for m in mail.outbox}, {self.busy.email, self.late.email})
+
+        progress = self.client.get(f"/api/accounts/admin/notify/{response.data['job_id']}/").data
+        self.assertEqual(progress['status'], 'completed')
+        self.assertEqual(progress['sent'], 2)
+
+    @patch('accounts.tasks.chord')
+    def test_chunk_messages_carry_no_recipient_lists(self, mock_chord):
+        """Test that chunk tasks get an audience range instead of emails."""
+        with self.settings(EMAIL_FANOUT_CHUNK_SIZE=2):
+            self.client.post('/api/accounts/admin/notify/', {
+                'audience': 'all_active',
+                'message': 'Hello'
+            }, format='json')
+            outbox.dispatch_batch()
+
+        header = mock_chord.call_args[0][0]
+        self.assertEqual(len(header), 2)
+        for signature in header:
+            self.assertIsNone(signature.args[0])
+            self.assertEqual(signature.kwargs['audience']['name'], 'all_active')
+
+    @patch('accounts.tasks._run_chunks')
+    def test_redelivered_dispatch_keeps_progress(self, mock_run_chunks):
+        """Test that dispatching an audience job twice does not reset its counters."""
+        job_id = str(uuid.uuid4())
+        dispatch_audience_task('all_active', 'Subject', 'Hello', job_id)
+        record_progress(job_id, sent=2)
+
+        dispatch_audience_task('all_active', 'Subject', 'Hello', job_id)
+
+        progress = get_progress(job_id)
+        self.assertEqual(progress['sent'], 2)
+        self.assertEqual(progress['total'], 4)
+        self.assertEqual(progress['status'], 'sending')
+
+    def test_unknown_audience_rejected(self):
+        """Test that unknown audience names are rejected."""
+        response = self.client.post('/api/accounts/admin/notify/', {
+            'audience': 'everyone_ever',
+            'message': 'Hello'
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('error', response.data)
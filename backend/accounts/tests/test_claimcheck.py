@@ -0,0 +1,113 @@
+"""Tests for claim-check storage of large Celery arguments and results."""
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from accounts import claimcheck
+from accounts.models import ClaimCheck
+from accounts.tasks import (
+    aggregate_email_results,
+    dispatch_email_job,
+    purge_claim_checks,
+    send_email_task,
+)
+
+
+class ClaimCheckTests(TestCase):
+    """Tests for storing and reading back claim checks."""
+
+    def test_small_values_pass_through(self):
+        """Test that values under the threshold are not stored."""
+        self.assertEqual(claimcheck.wrap(['a@example.com'], threshold=100), ['a@example.com'])
+        self.assertEqual(ClaimCheck.objects.count(), 0)
+
+    def test_large_values_stored_once(self):
+        """Test that large values become a reference that reads back intact."""
+        recipients = [f'user{i}@example.com' for i in range(50)]
+
+        ref = claimcheck.wrap(recipients, threshold=100)
+
+        self.assertTrue(claimcheck.is_claim(ref))
+        self.assertEqual(ClaimCheck.objects.count(), 1)
+        self.assertEqual(claimcheck.unwrap(ref), recipients)
+        self.assertEqual(claimcheck.unwrap('plain body'), 'plain body')
+
+    def test_expired_reference_raises(self):
+        """Test that expired values can no longer be read."""
+        ref = claimcheck.store(['a@example.com'], ttl=60)
+        ClaimCheck.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        with self.assertRaises(claimcheck.ClaimCheckMissing):
+            claimcheck.unwrap(ref)
+
+    def test_purge_removes_only_expired(self):
+        """Test that the periodic purge deletes expired rows only."""
+        claimcheck.store(['old@example.com'])
+        ClaimCheck.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        kept = claimcheck.store(['new@example.com'])
+
+        self.assertEqual(purge_claim_checks(), 1)
+        self.assertEqual(claimcheck.unwrap(kept), ['new@example.com'])
+
+
+@override_settings(CLAIM_CHECK_THRESHOLD=200)
+class EmailTaskClaimCheckTests(TestCase):
+    """Tests for passing large email jobs through Celery by reference."""
+
+    def setUp(self):
+        self.recipients = [f'user{i}@example.com' for i in range(20)]
+
+    def test_send_email_task_reads_references(self):
+        """Test that recipients and body stored as claim checks are sent."""
+        body = 'Hello ' * 100
+
+        result = send_email_task(
+            claimcheck.wrap(self.recipients), 'Subject', claimcheck.wrap(body)
+        )
+
+        self.assertEqual(result['sent_count'], 20)
+        self.assertEqual(len(mail.outbox), 20)
+        self.assertEqual(mail.outbox[0].body, body)
+
+    def test_large_failed_list_returned_by_reference(self):
+        """Test that a large failed_emails list is stored instead of returned."""
+        with patch('accounts.mail.BatchMailer.send', side_effect=ConnectionError('down')):
+            result = send_email_task(self.recipients, 'Subject', 'Body')
+
+        self.assertEqual(result['failed_count'], 20)
+        self.assertTrue(claimcheck.is_claim(result['failed_emails']))
+        self.assertEqual(claimcheck.unwrap(result['failed_emails']), self.recipients)
+
+    def test_aggregate_reads_chunk_references(self):
+        """Test that the chord callback combines stored chunk results."""
+        chunks = [
+            {'sent_count': 0, 'failed_count': 10, 'total': 10,
+             'failed_emails': claimcheck.store(self.recipients[:10])},
+            {'sent_count': 9, 'failed_count': 1, 'total': 10,
+             'failed_emails': [self.recipients[10]]},
+        ]
+
+        result = aggregate_email_results(chunks)
+
+        self.assertEqual(result['failed_count'], 11)
+        self.assertEqual(result['sent_count'], 9)
+        self.assertEqual(claimcheck.unwrap(result['failed_emails']), self.recipients[:11])
+
+    @patch('accounts.tasks.chord')
+    def test_dispatch_passes_references(self, mock_chord):
+        """Test that fanned-out chunks share one stored message body."""
+        body = 'Important notice. ' * 50
+
+        dispatch_email_job(self.recipients, 'Subject', body, 'job-1', chunk_size=10)
+
+        header = mock_chord.call_args[0][0]
+        self.assertEqual(len(header), 2)
+        self.assertTrue(all(claimcheck.is_claim(sig.args[0]) for sig in header))
+        self.assertEqual(header[0].args[2], header[1].args[2])
+        self.assertEqual(claimcheck.unwrap(header[1].args[0]), self.recipients[10:])
+        # Two recipient chunks plus one shared body
+        self.assertEqual(ClaimCheck.objects.count(), 3)
@@ -0,0 +1,222 @@
+"""Tests for the dead-letter store and replaying failed deliveries."""
+
+import smtplib
+import threading
+import uuid
+from io import StringIO
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from accounts import deadletter, outbox
+from accounts.models import DeadLetter, DeadLetterMessage, EmailDelivery, OutboxMessage
+from accounts.tasks import send_email_task
+from accounts.tests.test_ledger import FlakyMailer
+
+User = get_user_model()
+
+
+class DeadLetterRecordingTests(TestCase):
+    """Tests for send_email_task writing dead letters."""
+
+    def setUp(self):
+        self.job_id = str(uuid.uuid4())
+        self.recipients = ['a@example.com', 'b@example.com', 'c@example.com']
+        # Eager retries only run when errors are not propagated
+        conf = send_email_task.app.conf
+        conf.CELERY_TASK_EAGER_PROPAGATES = False
+        self.addCleanup(setattr, conf, 'CELERY_TASK_EAGER_PROPAGATES', True)
+
+    def run_task(self, mailer, **options):
+        with patch('accounts.mail.BatchMailer.send', side_effect=mailer):
+            return send_email_task.apply(
+                args=[self.recipients, 'Subject', 'Body'],
+                kwargs={'job_id': self.job_id},
+                **options
+            )
+
+    def test_permanent_failure_recorded(self):
+        """Test that a 5xx rejection is dead-lettered with its reason."""
+        refused = smtplib.SMTPRecipientsRefused({'b@example.com': (550, b'No such user')})
+
+        self.run_task(FlakyMailer(failures={'b@example.com': 1}, error=refused))
+
+        letter = DeadLetter.objects.get()
+        self.assertEqual(letter.recipient, 'b@example.com')
+        self.assertEqual(letter.message.job_id, self.job_id)
+        self.assertEqual(letter.message.body, 'Body')
+        self.assertEqual(letter.attempts, 1)
+        self.assertIn('No such user', letter.reason)
+
+    @override_settings(EMAIL_MAX_ATTEMPTS=2)
+    def test_exhausted_attempts_recorded_once_per_job(self):
+        """Test that recipients out of attempts share one stored message."""
+        self.run_task(FlakyMailer(failures={'a@example.com': 10, 'c@example.com': 10}))
+
+        self.assertEqual(DeadLetterMessage.objects.count(), 1)
+        self.assertEqual(
+            sorted(DeadLetter.objects.values_list('recipient', 'attempts')),
+            [('a@example.com', 2), ('c@example.com', 2)]
+        )
+
+    def test_task_out_of_retries_abandons_remaining(self):
+        """Test that recipients left when the task gives up are dead-lettered."""
+        with patch('accounts.tasks.NotificationTemplate', side_effect=RuntimeError('template store down')):
+            result = self.run_task(FlakyMailer(), retries=send_email_task.max_retries)
+
+        self.assertTrue(result.failed())
+        self.assertEqual(DeadLetter.objects.count(), 3)
+        self.assertEqual(set(DeadLetter.objects.values_list('reason', flat=True)), {'template store down'})
+        self.assertEqual(
+            EmailDelivery.objects.filter(job_id=self.job_id, status=EmailDelivery.Status.FAILED).count(), 3
+        )
+
+    @override_settings(EMAIL_MAX_ATTEMPTS=6, EMAIL_MAX_RESCHEDULES=2)
+    def test_task_out_of_reschedules_records_remaining(self):
+        """Test that recipients still waiting when reschedules run out are dead-lettered."""
+        result = self.run_task(FlakyMailer(failures={'b@example.com': 10}))
+
+        self.assertEqual(result.get()['failed_emails'], ['b@example.com'])
+        letter = DeadLetter.objects.get()
+        self.assertEqual(letter.recipient, 'b@example.com')
+        self.assertEqual(letter.attempts, 3)
+        self.assertIn('after 2 reschedules', letter.reason)
+
+
+class DeadLetterReplayTests(TestCase):
+    """Tests for replaying dead letters."""
+
+    def setUp(self):
+        deadletter.record('job-1', 'Outage', 'Sorry', [
+            (f'user{i}@example.com', 4, 'Connection reset') for i in range(5)
+        ])
+        deadletter.record('job-2', 'Other', 'Body', [('other@example.com', 1, '550 No such user')])
+
+    def test_replay_batches_are_spaced_out(self):
+        """Test that replayed batches are held back by the interval."""
+        jobs = deadletter.replay(job_id='job-1', batch_size=2, interval=30)
+
+        self.assertEqual([job['recipients'] for job in jobs], [2, 2, 1])
+        self.assertEqual({job['replay_of'] for job in jobs}, {'job-1'})
+        delays = [
+            round((message.available_at - timezone.now()).total_seconds())
+            for message in OutboxMessage.objects.order_by('available_at')
+        ]
+        self.assertEqual(delays, [0, 30, 60])
+        self.assertEqual(deadletter.pending('job-1').count(), 0)
+        self.assertEqual(deadletter.pending().count(), 1)
+
+    def test_replay_sends_only_dead_letters(self):
+        """Test that a replay delivers to the failed recipients only."""
+        deadletter.replay(job_id='job-1', interval=0)
+        outbox.dispatch_batch()
+
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), [f'user{i}@example.com' for i in range(5)])
+        self.assertEqual(mail.outbox[0].subject, 'Outage')
+
+    def test_replay_is_not_repeated(self):
+        """Test that replayed letters are not queued a second time."""
+        first = deadletter.replay()
+        second = deadletter.replay()
+
+        self.assertEqual(sum(job['recipients'] for job in first), 6)
+        self.assertEqual(second, [])
+
+    def test_command_dry_run_and_replay(self):
+        """Test the replay_dead_letters management command."""
+        out = StringIO()
+        call_command('replay_dead_letters', '--dry-run', stdout=out)
+        self.assertIn('6 dead letters would be replayed', out.getvalue())
+        self.assertFalse(OutboxMessage.objects.exists())
+
+        out = StringIO()
+        call_command('replay_dead_letters', '--limit', '3', '--batch-size', '2', stdout=out)
+        self.assertIn('Queued 3 dead letters in 2 jobs', out.getvalue())
+        self.assertEqual(deadletter.pending().count(), 3)
+
+
+@skipUnless(connection.features.has_select_for_update_skip_locked, 'needs SKIP LOCKED')
+class ConcurrentReplayTests(TransactionTestCase):
+    """Tests for several replays of the same dead letters at once."""
+
+    def test_concurrent_replays_queue_each_letter_once(self):
+        """Test that parallel replays never queue the same letter twice."""
+        deadletter.record('job-1', 'Outage', 'Sorry', [
+            (f'user{i}@example.com', 4, 'Connection reset') for i in range(100)
+        ])
+        queued = []
+        lock = threading.Lock()
+
+        def replayer():
+            try:
+                while jobs := deadletter.replay(limit=10, batch_size=5, interval=0):
+                    with lock:
+                        queued.extend(job['recipients'] for job in jobs)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=replayer) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sum(queued), 100)
+        self.assertEqual(OutboxMessage.objects.count(), len(queued))
+        self.assertEqual(deadletter.pending().count(), 0)
+
+
+class AdminDeadLetterTests(TestCase):
+    """Tests for the dead-letter admin endpoints."""
+
+    def setUp(self):
+        uid = uuid.uuid4().hex[:8]
+        self.admin = User.objects.create_superuser(
+            email=f'admin_{uid}@example.com',
+            username=f'admin_{uid}',
+            password='AdminPass123!'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+        deadletter.record('job-1', 'Outage', 'Sorry', [('a@example.com', 4, 'Connection reset')])
+
+    def test_list_dead_letters(self):
+        """Test that staff can see dead letters per job."""
+        response = self.client.get('/api/accounts/admin/dead-letters/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total'], 1)
+        self.assertEqual(response.data['jobs'][0]['job_id'], 'job-1')
+        self.assertEqual(response.data['recent'][0]['reason'], 'Connection reset')
+
+    def test_replay_endpoint(self):
+        """Test that staff can queue a replay, and nothing is left afterwards."""
+        response = self.client.post('/api/accounts/admin/dead-letters/replay/', {'job_id': 'job-1'}, format='json')
+        again = self.client.post('/api/accounts/admin/dead-letters/replay/', {}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['recipients'], 1)
+        self.assertTrue(outbox.is_pending(response.data['jobs'][0]['job_id']))
+        self.assertEqual(again.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_requires_admin(self):
+        """Test that regular users cannot replay dead letters."""
+        uid = uuid.uuid4().hex[:8]
+        user = User.objects.create_user(
+            email=f'user_{uid}@example.com',
+            username=f'user_{uid}',
+            password='UserPass123!'
+        )
+        self.client.force_authenticate(user=user)
+
+        response = self.client.post('/api/accounts/admin/dead-letters/replay/', {}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
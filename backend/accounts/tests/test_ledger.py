@@ -0,0 +1,163 @@
+"""Tests for the per-recipient delivery ledger."""
+
+import smtplib
+import uuid
+from collections import Counter
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from accounts.ledger import DeliveryLedger
+from accounts.models import EmailDelivery
+from accounts.tasks import send_email_task
+
+
+class FlakyMailer:
+    """Stand-in for BatchMailer.send that fails given recipients N times."""
+
+    def __init__(self, failures=None, error=None):
+        self.failures = dict(failures or {})
+        self.error = error or ConnectionError('Connection reset')
+        self.calls = Counter()
+
+    def __call__(self, message):
+        recipient = message.to[0]
+        self.calls[recipient] += 1
+        if self.failures.get(recipient, 0) > 0:
+            self.failures[recipient] -= 1
+            raise self.error
+
+
+class SendEmailLedgerTests(TestCase):
+    """Tests for retries driven by the ledger in send_email_task."""
+
+    def setUp(self):
+        self.job_id = str(uuid.uuid4())
+        self.recipients = ['a@example.com', 'b@example.com', 'c@example.com']
+        # Eager retries only run when errors are not propagated
+        conf = send_email_task.app.conf
+        conf.CELERY_TASK_EAGER_PROPAGATES = False
+        self.addCleanup(setattr, conf, 'CELERY_TASK_EAGER_PROPAGATES', True)
+
+    def run_task(self, mailer):
+        with patch('accounts.mail.BatchMailer.send', side_effect=mailer):
+            return send_email_task.apply(
+                args=[self.recipients, 'Subject', 'Body'],
+                kwargs={'job_id': self.job_id},
+            ).get()
+
+    def test_retry_only_resends_failed_recipients(self):
+        """Test that a retry does not re-send to delivered recipients."""
+        mailer = FlakyMailer(failures={'b@example.com': 1})
+
+        result = self.run_task(mailer)
+
+        self.assertEqual(result['sent_count'], 3)
+        self.assertEqual(result['failed_emails'], [])
+        self.assertEqual(mailer.calls, Counter({'a@example.com': 1, 'b@example.com': 2, 'c@example.com': 1}))
+        delivery = EmailDelivery.objects.get(job_id=self.job_id, recipient='b@example.com')
+        self.assertEqual(delivery.status, EmailDelivery.Status.SENT)
+        self.assertEqual(delivery.attempts, 2)
+
+    @override_settings(EMAIL_MAX_ATTEMPTS=3)
+    def test_gives_up_after_max_attempts(self):
+        """Test that a recipient is marked failed once attempts run out."""
+        mailer = FlakyMailer(failures={'b@example.com': 10})
+
+        result = self.run_task(mailer)
+
+        self.assertEqual(result['sent_count'], 2)
+        self.assertEqual(result['failed_emails'], ['b@example.com'])
+        self.assertEqual(mailer.calls['b@example.com'], 3)
+        delivery = EmailDelivery.objects.get(job_id=self.job_id, recipient='b@example.com')
+        self.assertEqual(delivery.status, EmailDelivery.Status.FAILED)
+        self.assertIn('Connection reset', delivery.last_error)
+
+    @override_settings(EMAIL_MAX_ATTEMPTS=6)
+    def test_reschedules_do_not_use_up_task_retries(self):
+        """Test that backoff reschedules beyond max_retries still finish every recipient."""
+        mailer = FlakyMailer(failures={'b@example.com': 4, 'c@example.com': 10})
+
+        result = self.run_task(mailer)
+
+        self.assertEqual(result['sent_count'], 2)
+        self.assertEqual(result['failed_emails'], ['c@example.com'])
+        self.assertEqual(mailer.calls, Counter({'a@example.com': 1, 'b@example.com': 5, 'c@example.com': 6}))
+        self.assertEqual(
+            dict(EmailDelivery.objects.filter(job_id=self.job_id).values_list('recipient', 'status')),
+            {
+                'a@example.com': EmailDelivery.Status.SENT,
+                'b@example.com': EmailDelivery.Status.SENT,
+                'c@example.com': EmailDelivery.Status.FAILED,
+            }
+        )
+
+    @override_settings(EMAIL_MAX_ATTEMPTS=6, EMAIL_MAX_RESCHEDULES=2)
+    def test_abandons_recipients_after_max_reschedules(self):
+        """Test that recipients still waiting when reschedules run out are failed."""
+        mailer = FlakyMailer(failures={'b@example.com': 10})
+
+        result = self.run_task(mailer)
+
+        self.assertEqual(result['failed_emails'], ['b@example.com'])
+        self.assertEqual(mailer.calls['b@example.com'], 3)
+        delivery = EmailDelivery.objects.get(job_id=self.job_id, recipient='b@example.com')
+        self.assertEqual(delivery.status, EmailDelivery.Status.FAILED)
+        self.assertIn('after 2 reschedules', delivery.last_error)
+
+    def test_permanent_failure_not_retried(self):
+        """Test that a 5xx rejection fails the recipient without retrying."""
+        refused = smtplib.SMTPRecipientsRefused({'b@example.com': (550, b'No such user')})
+        mailer = FlakyMailer(failures={'b@example.com': 10}, error=refused)
+
+        result = self.run_task(mailer)
+
+        self.assertEqual(result['failed_emails'], ['b@example.com'])
+        self.assertEqual(mailer.calls['b@example.com'], 1)
+
+    def test_rerun_is_idempotent(self):
+        """Test that running a finished job again sends nothing."""
+        first = self.run_task(FlakyMailer())
+        mailer = FlakyMailer()
+
+        second = self.run_task(mailer)
+
+        self.assertEqual(sum(mailer.calls.values()), 0)
+        self.assertEqual(second, first)
+        self.assertEqual(EmailDelivery.objects.filter(job_id=self.job_id).count(), 3)
+
+
+class DeliveryLedgerTests(TestCase):
+    """Tests for backoff scheduling in DeliveryLedger."""
+
+    @override_settings(EMAIL_RETRY_BACKOFF=60, EMAIL_MAX_ATTEMPTS=5)
+    def test_backoff_doubles_per_attempt(self):
+        """Test that each failed attempt doubles the recipient's delay."""
+        ledger = DeliveryLedger('job', ['a@example.com'])
+        delays = []
+        for _ in range(3):
+            # Pretend the scheduled retry is due now
+            EmailDelivery.objects.update(next_attempt_at=None)
+            self.assertEqual(ledger.due(), ['a@example.com'])
+            self.assertFalse(ledger.failed('a@example.com', ConnectionError('reset')))
+            delivery = EmailDelivery.objects.get()
+            delays.append(round((delivery.next_attempt_at - timezone.now()).total_seconds()))
+
+        self.assertEqual(delays, [60, 120, 240])
+
+    @override_settings(EMAIL_RETRY_BACKOFF=60)
+    def test_recipients_not_due_are_skipped(self):
+        """Test that a recipient waiting on backoff is not attempted early."""
+        ledger = DeliveryLedger('job', ['a@example.com', 'b@example.com'])
+        ledger.due()
+        ledger.failed('a@example.com', ConnectionError('reset'))
+
+        self.assertEqual(ledger.due(), ['b@example.com'])
+        self.assertAlmostEqual(ledger.next_retry_in(), 60, delta=2)
+
+        EmailDelivery.objects.filter(recipient='a@example.com').update(
+            next_attempt_at=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertEqual(ledger.due(), ['a@example.com', 'b@example.com'])
@@ -0,0 +1,220 @@
+"""Tests for batched email sending against a local SMTP server."""
+
+import asyncio
+import socket
+import time
+import uuid
+
+from aiosmtpd.controller import Controller
+from django.test import TestCase, override_settings
+
+from accounts.mail import BatchMailer
+from accounts.models import EmailDelivery
+from accounts.smtp_pool import AsyncSMTPPool
+from accounts.tasks import send_email_task
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class RecordingHandler:
+    """aiosmtpd handler that records messages and the sessions they came in on.
+
+    ``fail_first`` makes the first N DATA commands answer 421 so that the
+    client has to reconnect. Addresses in ``refuse`` are rejected with 550,
+    and ``delay`` simulates a slow server, tracking how many messages were
+    in flight at once in ``peak``.
+    """
+
+    def __init__(self, fail_first=0, refuse=(), delay=0):
+        self.fail_first = fail_first
+        self.refuse = set(refuse)
+        self.delay = delay
+        self.messages = []
+        self.sessions = set()
+        self.in_flight = 0
+        self.peak = 0
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address in self.refuse:
+            return '550 No such user'
+        envelope.rcpt_tos.append(address)
+        return '250 OK'
+
+    async def handle_DATA(self, server, session, envelope):
+        self.sessions.add(id(session))
+        if self.fail_first:
+            self.fail_first -= 1
+            return '421 Service not available, closing channel'
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        self.messages.append(envelope.rcpt_tos)
+        return '250 Message accepted for delivery'
+
+
+class SMTPServerTestCase(TestCase):
+    """Starts an aiosmtpd server and points the SMTP email backend at it."""
+
+    handler_kwargs = {}
+    # One blocking connection (BatchMailer) unless a test class asks for the pool
+    concurrency = 1
+
+    def setUp(self):
+        self.handler = RecordingHandler(**self.handler_kwargs)
+        port = free_port()
+        self.controller = Controller(self.handler, hostname='127.0.0.1', port=port)
+        self.controller.start()
+        self.addCleanup(self.controller.stop)
+
+        settings_override = override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST='127.0.0.1',
+            EMAIL_PORT=port,
+            EMAIL_USE_TLS=False,
+            EMAIL_HOST_USER='',
+            EMAIL_HOST_PASSWORD='',
+            EMAIL_TIMEOUT=5,
+            EMAIL_SMTP_CONCURRENCY=self.concurrency,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+class BatchSendingTests(SMTPServerTestCase):
+    """Tests for connection reuse in send_email_task."""
+
+    def test_reuses_connection_within_batch(self):
+        """Test that one connection carries a whole batch."""
+        recipients = [f'user{i}@example.com' for i in range(5)]
+
+        with override_settings(EMAIL_BATCH_SIZE=10):
+            result = send_email_task(recipients, 'Subject', 'Body')
+
+        self.assertEqual(result['sent_count'], 5)
+        self.assertEqual(len(self.handler.messages), 5)
+        self.assertEqual(len(self.handler.sessions), 1)
+
+    def test_recycles_connection_per_batch(self):
+        """Test that the connection is reopened every batch_size messages."""
+        recipients = [f'user{i}@example.com' for i in range(5)]
+
+        with override_settings(EMAIL_BATCH_SIZE=2):
+            result = send_email_task(recipients, 'Subject', 'Body')
+
+        self.assertEqual(result['sent_count'], 5)
+        self.assertEqual(len(self.handler.sessions), 3)
+        self.assertEqual([m[0] for m in self.handler.messages], recipients)
+
+
+class ReconnectTests(SMTPServerTestCase):
+    """Tests for reconnecting after the server closes the session."""
+
+    handler_kwargs = {'fail_first': 1}
+
+    def test_reconnects_and_resends_on_421(self):
+        """Test that a 421 reply triggers a reconnect and a resend."""
+        with BatchMailer(batch_size=10) as mailer:
+            mailer.send(mailer.build('user@example.com', 'Subject', 'Body'))
+            mailer.send(mailer.build('other@example.com', 'Subject', 'Body'))
+
+        self.assertEqual(self.handler.messages, [['user@example.com'], ['other@example.com']])
+        self.assertEqual(mailer.connections_opened, 2)
+
+    def test_gives_up_after_max_reconnects(self):
+        """Test that the error surfaces once reconnects are exhausted."""
+        self.handler.fail_first = 5
+        with override_settings(EMAIL_MAX_RECONNECTS=1):
+            result = send_email_task(['user@example.com'], 'Subject', 'Body')
+
+        self.assertEqual(result['failed_emails'], ['user@example.com'])
+        self.assertEqual(len(self.handler.sessions), 2)
+
+
+class AsyncPoolTests(SMTPServerTestCase):
+    """Tests for concurrent delivery through the asyncio SMTP pool."""
+
+    concurrency = 4
+    handler_kwargs = {'delay': 0.05}
+
+    def test_sends_over_concurrent_connections(self):
+        """Test that messages are spread over parallel connections."""
+        recipients = [f'user{i}@example.com' for i in range(20)]
+
+        started = time.monotonic()
+        result = send_email_task(recipients, 'Subject', 'Body')
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(result['sent_count'], 20)
+        self.assertEqual(result['failed_emails'], [])
+        self.assertEqual(sorted(m[0] for m in self.handler.messages), sorted(recipients))
+        self.assertEqual(len(self.handler.sessions), 4)
+        self.assertEqual(self.handler.peak, 4)
+        # 20 messages x 50ms one at a time would take a full second
+        self.assertLess(elapsed, 0.8)
+
+    def test_refused_recipient_fails_permanently(self):
+        """Test that a 550 is reported per message without affecting others."""
+        self.handler.refuse = {'ghost@example.com'}
+
+        result = send_email_task(['a@example.com', 'ghost@example.com', 'b@example.com'], 'Subject', 'Body')
+
+        self.assertEqual(result['sent_count'], 2)
+        self.assertEqual(result['failed_emails'], ['ghost@example.com'])
+
+    def test_malformed_address_fails_only_its_message(self):
+        """Test that an unserializable message is reported without failing the batch."""
+        with AsyncSMTPPool(size=2) as pool:
+            errors = pool.send_many([
+                BatchMailer().build('ok@example.com', 'S', 'B'),
+                BatchMailer().build('x@', 'S', 'B'),
+                BatchMailer().build('fine@example.com', 'S', 'B'),
+            ])
+
+        self.assertIsNone(errors[0])
+        self.assertIsInstance(errors[1], ValueError)
+        self.assertIsNone(errors[2])
+        self.assertEqual(sorted(m[0] for m in self.handler.messages), ['fine@example.com', 'ok@example.com'])
+
+    def test_malformed_address_not_retried(self):
+        """Test that a malformed recipient fails for good while the rest are sent."""
+        job_id = str(uuid.uuid4())
+
+        result = send_email_task.apply(
+            args=[['a@example.com', 'x@', 'b@example.com'], 'Subject', 'Body'], kwargs={'job_id': job_id}
+        ).get()
+
+        self.assertEqual(result['sent_count'], 2)
+        self.assertEqual(result['failed_emails'], ['x@'])
+        delivery = EmailDelivery.objects.get(job_id=job_id, recipient='x@')
+        self.assertEqual((delivery.status, delivery.attempts), (EmailDelivery.Status.FAILED, 1))
+
+    def test_connections_recycled_and_reused(self):
+        """Test that connections persist across calls and recycle per batch."""
+        with AsyncSMTPPool(size=2, batch_size=3) as pool:
+            first = pool.send_many([BatchMailer().build('a@example.com', 'S', 'B')])
+            second = pool.send_many([BatchMailer().build(f'u{i}@example.com', 'S', 'B') for i in range(6)])
+
+        self.assertEqual(first, [None])
+        self.assertEqual(second, [None] * 6)
+        # 7 messages, at most 3 per connection, 2 at a time
+        self.assertEqual(pool.connections_opened, 3)
+
+
+class AsyncPoolReconnectTests(SMTPServerTestCase):
+    """Tests for reconnecting pool connections after a 421."""
+
+    concurrency = 2
+    handler_kwargs = {'fail_first': 1}
+
+    def test_reconnects_and_resends_on_421(self):
+        """Test that a dropped pool connection is replaced and the message resent."""
+        result = send_email_task(['a@example.com', 'b@example.com'], 'Subject', 'Body')
+
+        self.assertEqual(result['sent_count'], 2)
+        self.assertEqual(sorted(m[0] for m in self.handler.messages), ['a@example.com', 'b@example.com'])
+        self.assertEqual(len(self.handler.sessions), 3)
@@ -0,0 +1,139 @@
+"""Tests for the transactional outbox and its dispatcher."""
+
+import threading
+import uuid
+from io import StringIO
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from accounts import outbox
+from accounts.models import OutboxMessage
+from accounts.tasks import send_email_task
+
+User = get_user_model()
+
+
+class OutboxTests(TestCase):
+    """Tests for enqueueing and dispatching outbox messages."""
+
+    def test_rolled_back_transaction_leaves_nothing(self):
+        """Test that a task call is dropped with the transaction that made it."""
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                outbox.enqueue(send_email_task, [['a@example.com'], 'Subject', 'Body'])
+                raise RuntimeError('rollback')
+
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    @patch('accounts.tasks.send_email_task.apply_async')
+    def test_dispatch_publishes_and_deletes(self, mock_apply):
+        """Test that due messages are published in order and removed."""
+        for i in range(3):
+            outbox.enqueue(send_email_task, [[f'user{i}@example.com'], 'Subject', 'Body'], key=f'job-{i}')
+
+        self.assertEqual(outbox.dispatch_batch(batch_size=2), (2, 0))
+        self.assertEqual(outbox.dispatch_batch(batch_size=2), (1, 0))
+
+        published = [call.args[0][0] for call in mock_apply.call_args_list]
+        self.assertEqual(published, [['user0@example.com'], ['user1@example.com'], ['user2@example.com']])
+        self.assertFalse(OutboxMessage.objects.exists())
+        self.assertEqual(outbox.dispatch_batch(), (0, 0))
+
+    def test_failed_publish_backs_off(self):
+        """Test that a message that cannot be published is kept and retried later."""
+        outbox.enqueue('accounts.tasks.no_such_task', key='broken')
+
+        self.assertEqual(outbox.dispatch_batch(), (0, 1))
+
+        message = OutboxMessage.objects.get(key='broken')
+        self.assertEqual(message.attempts, 1)
+        self.assertIn('no_such_task', message.last_error)
+        self.assertGreater(message.available_at, timezone.now())
+        # Not due yet
+        self.assertEqual(outbox.dispatch_batch(), (0, 0))
+
+    @patch('accounts.tasks.send_email_task.apply_async')
+    def test_stats_report_backlog_and_throughput(self, mock_apply):
+        """Test that stats show pending messages and published counts."""
+        outbox.enqueue(send_email_task, [['a@example.com'], 'Subject', 'Body'])
+        before = outbox.stats()
+        with patch('accounts.outbox.time.time', return_value=timezone.now().timestamp() - 60):
+            outbox.dispatch_batch()
+        after = outbox.stats()
+
+        self.assertEqual(before['pending'], 1)
+        self.assertIsNotNone(before['oldest_age_seconds'])
+        self.assertEqual(after['pending'], 0)
+        self.assertEqual(after['published_last_hour'], 1)
+
+    @patch('accounts.tasks.send_email_task.apply_async')
+    def test_command_drains_outbox(self, mock_apply):
+        """Test that the dispatcher command with --once publishes everything."""
+        for i in range(5):
+            outbox.enqueue(send_email_task, [[f'user{i}@example.com'], 'Subject', 'Body'])
+        out = StringIO()
+
+        call_command('dispatch_outbox', '--once', '--batch-size', '2', stdout=out)
+
+        self.assertEqual(mock_apply.call_count, 5)
+        self.assertIn('publishing 5 messages', out.getvalue())
+
+    def test_admin_outbox_endpoint(self):
+        """Test that staff can read outbox stats."""
+        uid = uuid.uuid4().hex[:8]
+        admin = User.objects.create_superuser(
+            email=f'admin_{uid}@example.com',
+            username=f'admin_{uid}',
+            password='AdminPass123!'
+        )
+        client = APIClient()
+        client.force_authenticate(user=admin)
+
+        response = client.get('/api/accounts/admin/outbox/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['pending'], 0)
+
+
+@skipUnless(connection.features.has_select_for_update_skip_locked, 'needs SKIP LOCKED')
+class ConcurrentDispatchTests(TransactionTestCase):
+    """Tests for several dispatchers draining the outbox at once."""
+
+    def test_concurrent_dispatchers_publish_each_message_once(self):
+        """Test that parallel dispatchers never publish the same row twice."""
+        OutboxMessage.objects.bulk_create([
+            OutboxMessage(task_name=send_email_task.name, args=[[f'user{i}@example.com'], 'S', 'B'])
+            for i in range(200)
+        ])
+        published = []
+        lock = threading.Lock()
+
+        def record(args, kwargs, **options):
+            with lock:
+                published.append(args[0][0])
+
+        def dispatcher():
+            try:
+                while outbox.dispatch_batch(batch_size=10) != (0, 0):
+                    pass
+            finally:
+                connection.close()
+
+        with patch('accounts.tasks.send_email_task.apply_async', side_effect=record):
+            threads = [threading.Thread(target=dispatcher) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(published), 200)
+        self.assertEqual(len(set(published)), 200)
+        self.assertFalse(OutboxMessage.objects.exists())
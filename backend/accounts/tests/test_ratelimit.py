@@ -0,0 +1,133 @@
+"""Tests for the cluster-wide SMTP rate limiter."""
+
+import uuid
+from unittest.mock import patch
+
+from celery.exceptions import Retry
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from accounts import ratelimit
+from accounts.models import EmailDelivery
+from accounts.tasks import send_email_task
+
+User = get_user_model()
+
+
+class TokenBucketTests(TestCase):
+    """Tests for the Redis token buckets."""
+
+    @override_settings(EMAIL_RATE_PER_SECOND=2, EMAIL_RATE_PER_HOUR=None)
+    def test_per_second_bucket(self):
+        """Test that the bucket grants its capacity, then asks to wait."""
+        self.assertEqual(ratelimit.try_acquire(), 0)
+        self.assertEqual(ratelimit.try_acquire(), 0)
+
+        wait = ratelimit.try_acquire()
+
+        self.assertGreater(wait, 0)
+        self.assertLessEqual(wait, 0.5)
+
+    @override_settings(EMAIL_RATE_PER_SECOND=100, EMAIL_RATE_PER_HOUR=3)
+    def test_hourly_bucket_limits_across_buckets(self):
+        """Test that the tightest bucket decides, and no token is taken on refusal."""
+        for _ in range(3):
+            self.assertEqual(ratelimit.try_acquire(), 0)
+
+        wait = ratelimit.try_acquire()
+
+        # One token per 1200s at 3/hour
+        self.assertGreater(wait, 1000)
+        self.assertEqual(ratelimit.current_rate()['last_hour'], 3)
+
+    @override_settings(EMAIL_RATE_PER_SECOND=0.5, EMAIL_RATE_PER_HOUR=None)
+    def test_fractional_rate_grants_tokens(self):
+        """Test that a rate below one per second still grants a token every few seconds."""
+        self.assertEqual(ratelimit.try_acquire(), 0)
+
+        wait = ratelimit.try_acquire()
+
+        self.assertGreater(wait, 1)
+        self.assertLessEqual(wait, 2)
+
+    @override_settings(EMAIL_RATE_PER_SECOND=None, EMAIL_RATE_PER_HOUR=None)
+    def test_unlimited_when_not_configured(self):
+        """Test that no limits means no Redis round trips at all."""
+        with patch('accounts.ratelimit.get_redis') as mock_redis:
+            self.assertEqual(ratelimit.acquire(), 0)
+        mock_redis.assert_not_called()
+
+    @override_settings(EMAIL_RATE_PER_SECOND=1, EMAIL_RATE_MAX_SLEEP=2)
+    @patch('accounts.ratelimit.time.sleep')
+    def test_short_waits_are_slept_off(self, mock_sleep):
+        """Test that acquire sleeps through waits shorter than the maximum."""
+        with patch('accounts.ratelimit.try_acquire', side_effect=[0.4, 0]):
+            self.assertEqual(ratelimit.acquire(), 0)
+        mock_sleep.assert_called_once_with(0.4)
+
+
+class RateLimitedTaskTests(TestCase):
+    """Tests for send_email_task under the rate limiter."""
+
+    @override_settings(EMAIL_RATE_PER_SECOND=None, EMAIL_RATE_PER_HOUR=2)
+    def test_task_reschedules_when_limit_exhausted(self):
+        """Test that the task stops, keeps the rest pending and reschedules."""
+        job_id = str(uuid.uuid4())
+        recipients = ['a@example.com', 'b@example.com', 'c@example.com']
+
+        with self.assertRaises(Retry) as ctx:
+            send_email_task.apply(args=[recipients, 'Subject', 'Body'], kwargs={'job_id': job_id})
+
+        self.assertGreater(ctx.exception.when, 1000)
+        statuses = dict(EmailDelivery.objects.filter(job_id=job_id).values_list('recipient', 'status'))
+        self.assertEqual(statuses, {
+            'a@example.com': EmailDelivery.Status.SENT,
+            'b@example.com': EmailDelivery.Status.SENT,
+            'c@example.com': EmailDelivery.Status.PENDING,
+        })
+
+    def test_rate_limit_reschedules_do_not_use_up_task_retries(self):
+        """Test that a job paused by the limiter more than max_retries times still completes."""
+        job_id = str(uuid.uuid4())
+        recipients = [f'user{i}@example.com' for i in range(5)]
+        conf = send_email_task.app.conf
+        conf.CELERY_TASK_EAGER_PROPAGATES = False
+        self.addCleanup(setattr, conf, 'CELERY_TASK_EAGER_PROPAGATES', True)
+
+        # Every send after the first finds the limit exhausted for an hour once
+        waits = [0] + [3600, 0] * 4
+        with patch('accounts.tasks.ratelimit.acquire', side_effect=waits):
+            result = send_email_task.apply(args=[recipients, 'Subject', 'Body'], kwargs={'job_id': job_id})
+
+        self.assertEqual(result.get()['sent_count'], 5)
+        self.assertEqual(
+            set(EmailDelivery.objects.filter(job_id=job_id).values_list('status', flat=True)),
+            {EmailDelivery.Status.SENT}
+        )
+
+
+class AdminSendRateTests(TestCase):
+    """Tests for the send rate endpoint."""
+
+    def setUp(self):
+        self.client = APIClient()
+        uid = uuid.uuid4().hex[:8]
+        self.admin = User.objects.create_superuser(
+            email=f'admin_{uid}@example.com',
+            username=f'admin_{uid}',
+            password='AdminPass123!'
+        )
+
+    @override_settings(EMAIL_RATE_PER_SECOND=10, EMAIL_RATE_PER_HOUR=1000)
+    def test_rate_endpoint(self):
+        """Test that the endpoint reports sends and limits."""
+        ratelimit.try_acquire()
+        self.client.force_authenticate(user=self.admin)
+
+        response = self.client.get('/api/accounts/admin/notify/rate/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['last_hour'], 1)
+        self.assertEqual(response.data['limits'], {'per_second': 10, 'per_hour': 1000})
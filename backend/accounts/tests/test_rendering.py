@@ -0,0 +1,141 @@
+"""Tests for Markdown rendering and multipart notification emails."""
+
+import uuid
+from email import message_from_bytes
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import TestCase
+
+from accounts.rendering import (
+    CompiledTemplate,
+    NotificationTemplate,
+    markdown_to_html,
+    recipient_context,
+    render_html,
+)
+from accounts.tasks import send_email_task
+
+User = get_user_model()
+
+
+def parts_of(message):
+    """Return {content type: decoded payload} of a built message."""
+    parsed = message_from_bytes(message.message().as_bytes())
+    return {
+        part.get_content_type(): part.get_payload(decode=True).decode()
+        for part in parsed.walk()
+        if not part.is_multipart()
+    }
+
+
+class MarkdownRenderingTests(TestCase):
+    """Tests for Markdown to sanitized HTML."""
+
+    def test_markdown_rendered(self):
+        """Test that Markdown formatting becomes HTML."""
+        html = markdown_to_html('# Update\n\n**bold** and [link](https://example.com)')
+
+        self.assertIn('<h1>Update</h1>', html)
+        self.assertIn('<strong>bold</strong>', html)
+        self.assertIn('href="https://example.com"', html)
+
+    def test_unsafe_html_removed(self):
+        """Test that scripts, event handlers and javascript: links are stripped."""
+        html = markdown_to_html(
+            '<script>alert(1)</script><img src=x onerror="alert(1)">'
+            '\n\n[click](javascript:alert(1))'
+        )
+
+        self.assertNotIn('<script', html)
+        self.assertNotIn('onerror', html)
+        self.assertNotIn('javascript:', html)
+
+    def test_rendered_once_per_content(self):
+        """Test that the rendered HTML is reused from the cache."""
+        with patch('accounts.rendering.markdown_to_html', return_value='<p>x</p>') as mock_render:
+            first = render_html('Subject', 'Body')
+            second = render_html('Subject', 'Body')
+            render_html('Subject', 'Other body')
+
+        self.assertEqual(first, second)
+        self.assertEqual(mock_render.call_count, 2)
+
+
+class CompiledTemplateTests(TestCase):
+    """Tests for per-recipient variable substitution."""
+
+    def test_known_variables_substituted(self):
+        """Test that known variables are replaced and unknown ones kept."""
+        template = CompiledTemplate('Hi {{ username }} ({{email}}), {{ other }}')
+
+        self.assertEqual(template.variables, {'username', 'email'})
+        self.assertEqual(
+            template.render({'username': 'sam', 'email': 'sam@example.com'}),
+            'Hi sam (sam@example.com), {{ other }}'
+        )
+
+    def test_values_escaped_for_html(self):
+        """Test that substituted values cannot inject HTML."""
+        template = CompiledTemplate('<p>{{ username }}</p>')
+
+        self.assertEqual(
+            template.render({'username': '<b>x</b>'}, escape_values=True),
+            '<p>&lt;b&gt;x&lt;/b&gt;</p>'
+        )
+
+
+class NotificationTemplateTests(TestCase):
+    """Tests for building multipart messages from one rendering."""
+
+    def test_multipart_alternative(self):
+        """Test that messages carry a text and an HTML part."""
+        message = NotificationTemplate('News', '**Hello**').build('a@example.com')
+
+        self.assertEqual(message.message().get_content_type(), 'multipart/alternative')
+        parts = parts_of(message)
+        self.assertEqual(parts['text/plain'], '**Hello**')
+        self.assertIn('<strong>Hello</strong>', parts['text/html'])
+
+    def test_parts_shared_without_variables(self):
+        """Test that recipients share the same encoded parts."""
+        template = NotificationTemplate('News', 'Same for everyone')
+
+        first = template.build('a@example.com')
+        second = template.build('b@example.com')
+
+        self.assertIs(first.parts, second.parts)
+        self.assertEqual(second.message()['To'], 'b@example.com')
+
+    def test_variables_per_recipient(self):
+        """Test that variables are filled from the recipient's account."""
+        uid = uuid.uuid4().hex[:8]
+        user = User.objects.create_user(
+            email=f'render_{uid}@example.com',
+            username=f'render_{uid}',
+            password='RenderPass123!'
+        )
+        template = NotificationTemplate('Hi {{ username }}', 'Hello **{{ username }}**')
+        contexts = recipient_context([user.email, 'unknown@example.com'])
+
+        message = template.build(user.email, contexts[user.email])
+        stranger = template.build('unknown@example.com', contexts['unknown@example.com'])
+
+        self.assertEqual(message.subject, f'Hi render_{uid}')
+        self.assertIn(f'<strong>render_{uid}</strong>', parts_of(message)['text/html'])
+        self.assertEqual(stranger.body, 'Hello ****')
+
+
+class SendEmailTaskRenderingTests(TestCase):
+    """Tests for rendering in send_email_task."""
+
+    def test_task_sends_rendered_html(self):
+        """Test that the task sends Markdown as multipart HTML email."""
+        result = send_email_task(['a@example.com', 'b@example.com'], 'Update', '# Release\n\n- item')
+
+        self.assertEqual(result['sent_count'], 2)
+        html = parts_of(mail.outbox[1])['text/html']
+        self.assertIn('<h1>Release</h1>', html)
+        self.assertIn('<li>item</li>', html)
+        self.assertIs(mail.outbox[0].parts, mail.outbox[1].parts)
@@ -0,0 +1,182 @@
+"""Tests for the Redis sliding-window throttles."""
+
+import uuid
+from unittest.mock import patch
+
+import fakeredis
+import redis
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from config.redis_client import get_redis
+
+User = get_user_model()
+
+
+def throttle_rates(**rates):
+    """Return REST_FRAMEWORK settings with only the given scopes enabled."""
+    defaults = {scope: None for scope in settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']}
+    defaults.update(rates)
+    return {**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': defaults}
+
+
+class RedisThrottleTestCase(TestCase):
+    """Runs each test against the per-test in-memory Redis from conftest."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.redis = get_redis()
+
+
+class LoginThrottleTests(RedisThrottleTestCase):
+    """Tests for login throttling by IP and by email."""
+
+    def setUp(self):
+        super().setUp()
+        self.login_url = reverse('accounts:login')
+        uid = uuid.uuid4().hex[:8]
+        self.user = User.objects.create_user(
+            email=f'throttle_{uid}@example.com',
+            username=f'throttle_{uid}',
+            password='ThrottlePass123!'
+        )
+
+    def attempt(self, email, ip='10.0.0.1'):
+        return self.client.post(
+            self.login_url,
+            {'email': email, 'password': 'wrong-password'},
+            format='json',
+            REMOTE_ADDR=ip,
+        )
+
+    def test_login_throttled_per_email(self):
+        """Test that attempts against one account are limited across IPs."""
+        with override_settings(REST_FRAMEWORK=throttle_rates(login_email='3/min')):
+            for i in range(3):
+                response = self.attempt(self.user.email, ip=f'10.0.0.{i}')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+            response = self.attempt(self.user.email.upper(), ip='10.0.0.99')
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+        self.assertLessEqual(int(response['Retry-After']), 60)
+
+    def test_login_throttled_per_ip(self):
+        """Test that one IP is limited across different emails."""
+        with override_settings(REST_FRAMEWORK=throttle_rates(login_ip='2/min')):
+            self.attempt('a@example.com')
+            self.attempt('b@example.com')
+            blocked = self.attempt('c@example.com')
+            other_ip = self.attempt('c@example.com', ip='10.0.0.2')
+
+        self.assertEqual(blocked.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(other_ip.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_forwarded_for_prefix_cannot_evade_ip_limit(self):
+        """Test that client-supplied X-Forwarded-For entries do not change the throttled IP."""
+        with override_settings(REST_FRAMEWORK=throttle_rates(login_ip='2/min')):
+            responses = [
+                self.client.post(
+                    self.login_url,
+                    {'email': self.user.email, 'password': 'wrong-password'},
+                    format='json',
+                    REMOTE_ADDR='172.18.0.5',
+                    # nginx appends the address it saw to whatever the client sent
+                    HTTP_X_FORWARDED_FOR=f'203.0.113.{i}, 10.0.0.1',
+                )
+                for i in range(3)
+            ]
+
+        self.assertEqual(
+            [response.status_code for response in responses],
+            [status.HTTP_400_BAD_REQUEST, status.HTTP_400_BAD_REQUEST, status.HTTP_429_TOO_MANY_REQUESTS]
+        )
+        self.assertEqual(self.redis.keys('throttle:login_ip:*'), [b'throttle:login_ip:10.0.0.1'])
+
+    def test_window_slides(self):
+        """Test that expired attempts no longer count against the limit."""
+        with override_settings(REST_FRAMEWORK=throttle_rates(login_ip='1/min')):
+            self.attempt(self.user.email)
+            key = self.redis.keys('throttle:login_ip:*')[0]
+            # Age the recorded attempt past the window
+            member, score = self.redis.zrange(key, 0, 0, withscores=True)[0]
+            self.redis.zadd(key, {member: score - 61_000})
+            response = self.attempt(self.user.email)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_throttle_fails_open_without_redis(self):
+        """Test that login keeps working when Redis is unreachable."""
+        broken = redis.Redis(host='127.0.0.1', port=1, socket_connect_timeout=0.1)
+        with patch('accounts.throttling.get_redis', return_value=broken), \
+                override_settings(REST_FRAMEWORK=throttle_rates(login_ip='1/min')):
+            self.attempt(self.user.email)
+            response = self.attempt(self.user.email)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_throttle_follows_current_client(self):
+        """Test that the script runs on the current client, not the one it was registered with."""
+        with override_settings(REST_FRAMEWORK=throttle_rates(login_ip='1/min')):
+            self.attempt(self.user.email)
+            replacement = fakeredis.FakeRedis()
+            with patch('accounts.throttling.get_redis', return_value=replacement):
+                self.attempt(self.user.email)
+                response = self.attempt(self.user.email)
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(len(replacement.keys('throttle:login_ip:*')), 1)
+
+
+class RegisterThrottleTests(RedisThrottleTestCase):
+    """Tests for registration throttling."""
+
+    def test_register_throttled_per_ip(self):
+        """Test that registrations from one IP are limited."""
+        with override_settings(REST_FRAMEWORK=throttle_rates(register_ip='1/hour')):
+            uid = uuid.uuid4().hex[:8]
+            data = {
+                'email': f'reg_{uid}@example.com',
+                'username': f'reg_{uid}',
+                'password': 'RegPass123!',
+                'password2': 'RegPass123!'
+            }
+            first = self.client.post(reverse('accounts:register'), data, format='json')
+            data.update(email=f'reg2_{uid}@example.com', username=f'reg2_{uid}')
+            second = self.client.post(reverse('accounts:register'), data, format='json')
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+
+class UserWriteThrottleTests(RedisThrottleTestCase):
+    """Tests for the per-user write throttle."""
+
+    def setUp(self):
+        super().setUp()
+        uid = uuid.uuid4().hex[:8]
+        self.user = User.objects.create_user(
+            email=f'writer_{uid}@example.com',
+            username=f'writer_{uid}',
+            password='WriterPass123!'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_writes_throttled_reads_not(self):
+        """Test that only unsafe methods count against the write limit."""
+        with override_settings(REST_FRAMEWORK=throttle_rates(user_write='2/min')):
+            for _ in range(2):
+                response = self.client.post('/api/tasks/', {'title': 'Task'}, format='json')
+                self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+            blocked = self.client.post('/api/tasks/', {'title': 'Task'}, format='json')
+            read = self.client.get('/api/tasks/')
+
+        self.assertEqual(blocked.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(read.status_code, status.HTTP_200_OK)
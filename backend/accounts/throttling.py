@@ -0,0 +1,153 @@
+"""Redis-backed throttles shared by every gunicorn worker and container.
+
+DRF's built-in throttles keep their history in the Django cache, which is
+per-process unless a shared cache is configured. These throttles keep a
+sliding window per key in a Redis sorted set and update it atomically with a
+Lua script, so all workers see the same counts.
+
+Rates come from ``REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']`` keyed by scope,
+in the usual DRF ``'<count>/<period>'`` format. A rate of ``None`` disables
+the throttle.
+"""
+
+import logging
+import math
+import uuid
+
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+from config.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1] = window key
+# ARGV[1] = window length (ms), ARGV[2] = limit, ARGV[3] = unique member
+# Returns {allowed, retry_after_ms}. Uses the Redis clock so that workers
+# with skewed clocks still share one timeline.
+SLIDING_WINDOW_SCRIPT = """
+local key = KEYS[1]
+local window = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local count = redis.call('ZCARD', key)
+if count < limit then
+    redis.call('ZADD', key, now, ARGV[3])
+    redis.call('PEXPIRE', key, window)
+    return {1, 0}
+end
+
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+local retry_after = window
+if oldest[2] then
+    retry_after = tonumber(oldest[2]) + window - now
+end
+return {0, retry_after}
+"""
+
+_script = None
+
+
+def _sliding_window():
+    global _script
+    if _script is None:
+        _script = get_redis().register_script(SLIDING_WINDOW_SCRIPT)
+    return _script
+
+
+class RedisSlidingWindowThrottle(SimpleRateThrottle):
+    """Base class for sliding-window throttles stored in Redis.
+
+    Subclasses set ``scope`` and implement ``get_ident_value`` to return the
+    value the window is keyed on, or ``None`` to skip throttling.
+    """
+
+    cache_format = 'throttle:%(scope)s:%(ident)s'
+
+    def get_rate(self):
+        # Read the rates at call time (not at import time like DRF does) so
+        # that settings overrides take effect.
+        if not getattr(self, 'scope', None):
+            return super().get_rate()
+        rates = api_settings.DEFAULT_THROTTLE_RATES or {}
+        return rates.get(self.scope)
+
+    def get_ident_value(self, request, view):
+        raise NotImplementedError('.get_ident_value() must be overridden')
+
+    def get_cache_key(self, request, view):
+        ident = self.get_ident_value(request, view)
+        if ident is None:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+    def allow_request(self, request, view):
+        self.retry_after = None
+        if self.rate is None:
+            return True
+
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+
+        try:
+            allowed, retry_after_ms = _sliding_window()(
+                keys=[key],
+                args=[self.duration * 1000, self.num_requests, uuid.uuid4().hex],
+                client=get_redis(),
+            )
+        except Exception as e:
+            # Fail open: an unavailable Redis must not lock everybody out.
+            logger.warning(f"Throttle '{self.scope}' skipped, Redis unavailable: {str(e)}")
+            return True
+
+        if allowed:
+            return True
+        self.retry_after = max(1, math.ceil(int(retry_after_ms) / 1000))
+        return False
+
+    def wait(self):
+        return self.retry_after
+
+
+class IPThrottle(RedisSlidingWindowThrottle):
+    """Throttle keyed by client IP address."""
+
+    def get_ident_value(self, request, view):
+        return self.get_ident(request)
+
+
+class LoginIPThrottle(IPThrottle):
+    scope = 'login_ip'
+
+
+class RegisterIPThrottle(IPThrottle):
+    scope = 'register_ip'
+
+
+class LoginEmailThrottle(RedisSlidingWindowThrottle):
+    """Throttle login attempts per target account, whatever the source IP."""
+
+    scope = 'login_email'
+
+    def get_ident_value(self, request, view):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if not email or not isinstance(email, str):
+            return None
+        return email.strip().lower()
+
+
+class UserWriteThrottle(RedisSlidingWindowThrottle):
+    """Throttle unsafe (write) requests per authenticated user."""
+
+    scope = 'user_write'
+
+    def get_ident_value(self, request, view):
+        if request.method in ('GET', 'HEAD', 'OPTIONS'):
+            return None
+        if request.user and request.user.is_authenticated:
+            return request.user.pk
+        return None
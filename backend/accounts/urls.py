@@ -6,6 +6,11 @@ from .views import (
     ProfileView,
     AdminOverviewView,
     AdminNotifyView,
+    AdminNotifyStatusView,
+    AdminOutboxView,
+    AdminDeadLetterView,
+    AdminDeadLetterReplayView,
+    AdminSendRateView,
 )
 
 app_name = 'accounts'
@@ -17,4 +22,9 @@ urlpatterns = [
     path('profile/', ProfileView.as_view(), name='profile'),
     path('admin/overview/', AdminOverviewView.as_view(), name='admin-overview'),
     path('admin/notify/', AdminNotifyView.as_view(), name='admin-notify'),
+    path('admin/notify/rate/', AdminSendRateView.as_view(), name='admin-send-rate'),
+    path('admin/notify/<uuid:job_id>/', AdminNotifyStatusView.as_view(), name='admin-notify-status'),
+    path('admin/outbox/', AdminOutboxView.as_view(), name='admin-outbox'),
+    path('admin/dead-letters/', AdminDeadLetterView.as_view(), name='admin-dead-letters'),
+    path('admin/dead-letters/replay/', AdminDeadLetterReplayView.as_view(), name='admin-dead-letters-replay'),
 ]
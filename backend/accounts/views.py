@@ -3,13 +3,24 @@ from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
 from rest_framework.views import APIView
 from rest_framework.decorators import api_view, permission_classes
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.db.models import Count, Q
 from .serializers import UserSerializer, RegisterSerializer
-from .tasks import send_email_task
+from .progress import wait_for_progress
+from .ratelimit import current_rate
+from .audiences import AUDIENCES
+from . import claimcheck, deadletter, outbox
+from .tasks import dispatch_audience_task, dispatch_recipients_task
+from .throttling import LoginEmailThrottle, LoginIPThrottle, RegisterIPThrottle
 from tasks.models import Task
+import logging
+import math
 import uuid
 
+logger = logging.getLogger(__name__)
+
 User = get_user_model()
 
 
@@ -18,6 +29,7 @@ class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = RegisterSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [RegisterIPThrottle]
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -31,8 +43,13 @@ class RegisterView(generics.CreateAPIView):
 
 
 class LoginView(APIView):
-    """User login endpoint."""
+    """User login endpoint.
+
+    Throttled per client IP and per target email before any password
+    hashing happens.
+    """
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [LoginIPThrottle, LoginEmailThrottle]
 
     def post(self, request):
         email = request.data.get('email')
@@ -104,6 +121,8 @@ class AdminOverviewView(APIView):
     Only accessible by staff/superuser.
     """
     permission_classes = [permissions.IsAdminUser]
+    # Aggregates over every user; cancel rather than pile up under load
+    statement_timeout = 10000
 
     def get(self, request):
         users = User.objects.annotate(
@@ -118,27 +137,46 @@ class AdminOverviewView(APIView):
             'open_tasks'
         )
 
+        totals = User.objects.aggregate(
+            total_users=Count('id'),
+            active_users=Count('id', filter=Q(is_active=True))
+        )
+
         return Response({
             'users': list(users),
-            'total_users': User.objects.count(),
-            'active_users': User.objects.filter(is_active=True).count()
+            **totals
         })
 
 
 class AdminNotifyView(APIView):
     """Admin endpoint to send email notifications to users.
     Only accessible by staff/superuser.
+
+    Recipients are given either as an explicit ``recipients`` list or as a
+    named ``audience`` (see ``accounts.audiences``) that the worker resolves
+    from the database.
+
+    The job is written to the transactional outbox (see ``accounts.outbox``)
+    and published to Celery by the outbox dispatcher, so the request does
+    not depend on the broker being reachable.
     """
     permission_classes = [permissions.IsAdminUser]
 
     def post(self, request):
         recipients = request.data.get('recipients', [])
+        audience = request.data.get('audience')
         message = request.data.get('message', '')
         subject = request.data.get('subject', 'Notification from TaskBoard')
 
-        if not recipients:
+        if not recipients and not audience:
+            return Response(
+                {'error': 'Recipients list or audience is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if audience and audience not in AUDIENCES:
             return Response(
-                {'error': 'Recipients list is required'},
+                {'error': f"Unknown audience. Choose one of: {', '.join(AUDIENCES)}"},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
@@ -151,15 +189,173 @@ class AdminNotifyView(APIView):
         # Generate unique job ID
         job_id = str(uuid.uuid4())
 
-        # Queue email task
-        task = send_email_task.apply_async(
-            args=[recipients, subject, message],
-            task_id=job_id
-        )
+        if audience:
+            with transaction.atomic():
+                outbox.enqueue(
+                    dispatch_audience_task,
+                    [audience, subject, claimcheck.wrap(message), job_id],
+                    key=job_id,
+                )
+            return Response({
+                'job_id': job_id,
+                'task_id': job_id,
+                'status': 'queued',
+                'audience': audience,
+                'message': f'Email notification queued for audience "{audience}"'
+            }, status=status.HTTP_202_ACCEPTED)
+
+        # Queue email task(s); large lists are split across workers
+        with transaction.atomic():
+            outbox.enqueue(
+                dispatch_recipients_task,
+                [claimcheck.wrap(recipients), subject, claimcheck.wrap(message), job_id],
+                key=job_id,
+            )
+        chunks = -(-len(recipients) // settings.EMAIL_FANOUT_CHUNK_SIZE)
 
         return Response({
             'job_id': job_id,
-            'task_id': task.id,
+            # The job's final result is stored under its id
+            'task_id': job_id,
             'status': 'queued',
+            'chunks': chunks,
             'message': f'Email notification queued for {len(recipients)} recipients'
         }, status=status.HTTP_202_ACCEPTED)
+
+
+class AdminNotifyStatusView(APIView):
+    """Admin endpoint to check the progress of a notification job.
+
+    Pass ``?wait=<seconds>&version=<n>`` to long-poll: the response is held
+    until the job's progress version differs from ``n``, the job completes or
+    the wait runs out. Without Redis, jobs still in the outbox are reported
+    as pending and others get a 503.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, job_id):
+        try:
+            wait = float(request.query_params.get('wait', 0))
+            version = int(request.query_params.get('version', -1))
+            if not math.isfinite(wait):
+                # A NaN deadline would never pass
+                raise ValueError(wait)
+        except ValueError:
+            return Response(
+                {'error': 'wait and version must be numbers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        wait = min(max(wait, 0), settings.NOTIFY_STATUS_MAX_WAIT)
+        try:
+            progress = wait_for_progress(job_id, since_version=version, timeout=wait)
+            unavailable = False
+        except Exception as e:
+            logger.warning(f"Progress of job {job_id} unavailable: {str(e)}")
+            progress = None
+            unavailable = True
+        if progress is None and outbox.is_pending(job_id):
+            # Not yet published to Celery
+            progress = {
+                'job_id': str(job_id),
+                'status': 'pending',
+                'total': None,
+                'queued': None,
+                'sent': 0,
+                'failed': 0,
+                'rate_per_second': None,
+                'eta_seconds': None,
+                'version': -1,
+            }
+        if progress is None and unavailable:
+            return Response(
+                {'error': 'Job progress is temporarily unavailable'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        if progress is None:
+            return Response(
+                {'error': 'Job not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(progress)
+
+
+class AdminDeadLetterView(APIView):
+    """Admin endpoint listing deliveries that could not be made.
+
+    Returns the number of unreplayed dead letters per notification job and
+    the most recent ones with their failure reason.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        letters = deadletter.pending(request.query_params.get('job_id'))
+        jobs = letters.values('message__job_id', 'message__subject').annotate(
+            count=Count('id')
+        ).order_by('-count')
+        recent = letters.select_related('message').order_by('-id')[:50]
+
+        return Response({
+            'total': letters.count(),
+            'jobs': [
+                {'job_id': job['message__job_id'], 'subject': job['message__subject'], 'count': job['count']}
+                for job in jobs
+            ],
+            'recent': [
+                {
+                    'job_id': letter.message.job_id,
+                    'recipient': letter.recipient,
+                    'reason': letter.reason,
+                    'attempts': letter.attempts,
+                    'created_at': letter.created_at,
+                }
+                for letter in recent
+            ],
+        })
+
+
+class AdminDeadLetterReplayView(APIView):
+    """Admin endpoint queueing dead letters for delivery again.
+
+    Accepts an optional ``job_id`` and ``limit``. Replayed recipients are sent
+    as new notification jobs, spaced out by ``DEAD_LETTER_REPLAY_INTERVAL``.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request):
+        try:
+            limit = int(request.data['limit']) if request.data.get('limit') else None
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'limit must be a number'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        jobs = deadletter.replay(job_id=request.data.get('job_id'), limit=limit)
+        if not jobs:
+            return Response(
+                {'error': 'No dead letters to replay'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        return Response({
+            'status': 'queued',
+            'jobs': jobs,
+            'recipients': sum(job['recipients'] for job in jobs),
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class AdminOutboxView(APIView):
+    """Admin endpoint reporting the outbox backlog and publish throughput."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(outbox.stats())
+
+
+class AdminSendRateView(APIView):
+    """Admin endpoint reporting the cluster-wide email send rate and limits."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(current_rate())
@@ -0,0 +1,16 @@
+"""Benchmark harness for the hot API endpoints.
+
+Seeds a synthetic dataset (``benchmarks.dataset``), replays the hot
+endpoints in-process through the full Django stack (``benchmarks.harness``)
+and records p50/p95/p99 latency and throughput per scenario to a JSON
+baseline. A later run can be compared against that baseline and fails when
+a scenario regressed by more than a threshold.
+
+Run from ``backend/``::
+
+    python -m benchmarks --users 10000 --tasks 1000000 --output benchmarks/baseline.json
+    python -m benchmarks --compare benchmarks/baseline.json --threshold 0.2
+
+Point ``DATABASE_URL`` at a dedicated PostgreSQL database: the dataset is
+written to it and kept for later runs.
+"""
@@ -0,0 +1,80 @@
+"""Command line entry point: ``python -m benchmarks --help``."""
+
+import argparse
+import logging
+import os
+import sys
+from datetime import datetime, timezone
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__)
+    parser.add_argument('--users', type=int, default=10000, help='Benchmark users to seed')
+    parser.add_argument('--tasks', type=int, default=1000000, help='Benchmark tasks to seed')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for data and request mix')
+    parser.add_argument('--reset', action='store_true', help='Delete and reseed the benchmark dataset')
+    parser.add_argument('--seed-only', action='store_true', help='Seed the dataset and exit (for load tests)')
+    parser.add_argument('--requests', type=int, default=200, help='Measured requests per scenario')
+    parser.add_argument('--warmup', type=int, default=10, help='Unmeasured requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=1, help='Client threads per scenario')
+    parser.add_argument('--scenario', action='append', dest='scenarios', help='Run only these scenarios')
+    parser.add_argument('--output', help='Write results to this JSON file')
+    parser.add_argument('--compare', help='Baseline JSON file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed regression, 0.2 = 20%%')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.local')
+    import django
+    django.setup()
+    # Development settings log every SQL statement; seeding would drown the output
+    logging.getLogger('django.db.backends').setLevel(logging.WARNING)
+
+    from django.db import connection
+
+    from . import dataset, harness, report as reports
+
+    if args.reset:
+        dataset.reset()
+    users, tasks = dataset.seed(args.users, args.tasks, seed=args.seed, stdout=sys.stdout)
+    print(f"Dataset: {users} users, {tasks} tasks on {connection.vendor}")
+    if args.seed_only:
+        return 0
+
+    report = {
+        'meta': {
+            'users': users,
+            'tasks': tasks,
+            'database': connection.vendor,
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+        },
+        'scenarios': harness.run(
+            requests=args.requests,
+            warmup=args.warmup,
+            concurrency=args.concurrency,
+            only=args.scenarios,
+            seed=args.seed,
+            stdout=sys.stdout,
+        ),
+    }
+    if args.output:
+        reports.save(args.output, report)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        regressions = reports.compare(reports.load(args.compare), report, args.threshold)
+        if regressions:
+            print(f"Regressions beyond {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.compare}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
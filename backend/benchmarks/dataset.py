@@ -0,0 +1,52 @@
+"""Synthetic benchmark dataset.
+
+Benchmark users are recognised by their ``bench_`` username prefix, so a
+dataset is seeded once and reused by later runs. Tasks are spread over
+users with a heavy-tailed distribution, as in production where a few
+accounts own most of the tasks. Rows are generated and loaded by
+``tasks.seeding``, with ``COPY`` on PostgreSQL; the same ``seed`` always
+produces the same dataset for the same day.
+"""
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+
+from tasks import seeding
+from tasks.models import Task
+
+User = get_user_model()
+
+PREFIX = 'bench_'
+PASSWORD = 'BenchPass123!'
+ADMIN_USERNAME = f'{PREFIX}admin'
+
+
+def bench_users():
+    return User.objects.filter(username__startswith=PREFIX, is_staff=False)
+
+
+def seed(users, tasks, seed=42, stdout=None):
+    """Create the benchmark dataset unless one already exists (see ``reset``).
+
+    Returns:
+        Tuple of (users, tasks) in the benchmark dataset
+    """
+    existing = bench_users().count()
+    if existing:
+        return existing, Task.objects.filter(user__in=bench_users()).count()
+
+    User.objects.update_or_create(
+        username=ADMIN_USERNAME,
+        defaults={
+            'email': f'{ADMIN_USERNAME}@example.com',
+            'password': make_password(PASSWORD),
+            'is_staff': True,
+            'is_superuser': True,
+        },
+    )
+    return seeding.seed(users, tasks, PREFIX, PASSWORD, seed=seed, stdout=stdout)
+
+
+def reset():
+    """Delete the benchmark dataset."""
+    seeding.clear(PREFIX)
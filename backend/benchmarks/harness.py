@@ -0,0 +1,142 @@
+"""Benchmark scenarios run in-process through the Django stack.
+
+Requests go through the whole Django stack (middleware, authentication,
+DRF, ORM, database) with the test client, so results measure the
+application and its queries without network and gunicorn noise. Token
+authentication is used as real clients do. Throttling is switched off for
+the run so it does not cap throughput.
+"""
+
+import copy
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import connection
+from django.test import Client, override_settings
+from rest_framework.authtoken.models import Token
+
+from tasks.models import Task
+from tasks.seeding import WORDS
+
+from . import dataset
+from .report import summarize
+
+CREATED_TITLE = 'Benchmark created task'
+TOKEN_POOL = 200
+
+
+@dataclass
+class Scenario:
+    name: str
+    # Fraction of --requests this scenario runs; expensive ones run fewer
+    share: float
+    request: callable
+
+
+class Context:
+    """Users and tokens the scenarios pick from, chosen deterministically."""
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        users = list(dataset.bench_users().order_by('pk')[:TOKEN_POOL])
+        if not users:
+            raise RuntimeError('No benchmark dataset; seed one first')
+        self.emails = [user.email for user in users]
+        self.tokens = [Token.objects.get_or_create(user=user)[0].key for user in users]
+        admin = dataset.User.objects.get(username=dataset.ADMIN_USERNAME)
+        self.admin_token = Token.objects.get_or_create(user=admin)[0].key
+
+    def token(self):
+        return self.rng.choice(self.tokens)
+
+
+def auth(token):
+    return {'HTTP_AUTHORIZATION': f'Token {token}'}
+
+
+SCENARIOS = [
+    Scenario('task_list', 1, lambda c, ctx: c.get('/api/tasks/', **auth(ctx.token()))),
+    Scenario('task_filter', 1, lambda c, ctx: c.get(
+        '/api/tasks/', {'status': ctx.rng.choice(['TODO', 'DOING']), 'priority': 'HIGH'}, **auth(ctx.token())
+    )),
+    Scenario('task_search', 1, lambda c, ctx: c.get(
+        '/api/tasks/', {'search': ctx.rng.choice(WORDS)}, **auth(ctx.token())
+    )),
+    Scenario('task_create', 1, lambda c, ctx: c.post(
+        '/api/tasks/', {'title': CREATED_TITLE, 'priority': 'HIGH'}, content_type='application/json',
+        **auth(ctx.token())
+    )),
+    Scenario('login', 0.25, lambda c, ctx: c.post(
+        '/api/accounts/login/', {'email': ctx.rng.choice(ctx.emails), 'password': dataset.PASSWORD},
+        content_type='application/json'
+    )),
+    Scenario('admin_overview', 0.05, lambda c, ctx: c.get('/api/accounts/admin/overview/', **auth(ctx.admin_token))),
+]
+
+
+def benchmark_settings():
+    """Settings overrides for a run: no throttling, no DEBUG query log."""
+    rest_framework = copy.deepcopy(settings.REST_FRAMEWORK)
+    rest_framework['DEFAULT_THROTTLE_RATES'] = {scope: None for scope in rest_framework['DEFAULT_THROTTLE_RATES']}
+    return override_settings(
+        DEBUG=False,
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+        REST_FRAMEWORK=rest_framework,
+    )
+
+
+def run_scenario(scenario, ctx, requests, warmup, concurrency):
+    count = max(int(requests * scenario.share), 1)
+    client = Client()
+    for _ in range(warmup):
+        scenario.request(client, ctx)
+
+    def worker(share):
+        client = Client()
+        latencies = []
+        errors = 0
+        try:
+            for _ in range(share):
+                started = time.perf_counter()
+                response = scenario.request(client, ctx)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code >= 400:
+                    errors += 1
+        finally:
+            if concurrency > 1:
+                connection.close()
+        return latencies, errors
+
+    shares = [count // concurrency + (1 if i < count % concurrency else 0) for i in range(concurrency)]
+    started = time.perf_counter()
+    if concurrency == 1:
+        results = [worker(count)]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(worker, shares))
+    wall = time.perf_counter() - started
+
+    latencies = [latency for result in results for latency in result[0]]
+    return summarize(latencies, sum(result[1] for result in results), wall)
+
+
+def run(requests=200, warmup=10, concurrency=1, only=None, seed=42, stdout=None):
+    """Run the scenarios and return their results keyed by name."""
+    results = {}
+    with benchmark_settings():
+        ctx = Context(seed)
+        for scenario in SCENARIOS:
+            if only and scenario.name not in only:
+                continue
+            results[scenario.name] = run_scenario(scenario, ctx, requests, warmup, concurrency)
+            if stdout:
+                r = results[scenario.name]
+                stdout.write(
+                    f"{scenario.name:<16} p50 {r['p50_ms']:>8} ms  p95 {r['p95_ms']:>8} ms  "
+                    f"p99 {r['p99_ms']:>8} ms  {r['throughput_rps']:>8} req/s  {r['errors']} errors\n"
+                )
+    Task.objects.filter(title=CREATED_TITLE).delete()
+    return results
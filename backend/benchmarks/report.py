@@ -0,0 +1,66 @@
+"""Benchmark and load-test reports: latency statistics, JSON files, comparison.
+
+Kept free of Django imports so the Locust load tests (``loadtests``) can
+write and compare reports in the same format as ``python -m benchmarks``::
+
+    {"meta": {...}, "scenarios": {"task_list": {"p50_ms": ..., "p95_ms": ...,
+     "p99_ms": ..., "mean_ms": ..., "throughput_rps": ..., "requests": ...,
+     "errors": ...}}}
+"""
+
+import json
+import statistics
+
+
+def percentile(sorted_values, fraction):
+    """Return the value at ``fraction`` (0-1) by linear interpolation."""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(latencies, errors, wall_seconds):
+    """Return latency percentiles (ms) and throughput from latencies in seconds."""
+    values = sorted(latencies)
+    return {
+        'requests': len(values),
+        'errors': errors,
+        'p50_ms': round(percentile(values, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(values, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(values, 0.99) * 1000, 2),
+        'mean_ms': round(statistics.fmean(values) * 1000, 2),
+        'throughput_rps': round(len(values) / wall_seconds, 2) if wall_seconds else None,
+    }
+
+
+def compare(baseline, current, threshold):
+    """Return regressions of ``current`` against ``baseline`` beyond ``threshold``.
+
+    A scenario regresses when its p50 or p95 latency grew, or its
+    throughput shrank, by more than ``threshold`` (0.2 = 20%).
+    """
+    regressions = []
+    for name, before in baseline['scenarios'].items():
+        after = current['scenarios'].get(name)
+        if after is None:
+            continue
+        for metric in ('p50_ms', 'p95_ms'):
+            if before[metric] and after[metric] > before[metric] * (1 + threshold):
+                regressions.append(f"{name}: {metric} {before[metric]} -> {after[metric]}")
+        if before['throughput_rps'] and after['throughput_rps'] < before['throughput_rps'] * (1 - threshold):
+            regressions.append(f"{name}: throughput_rps {before['throughput_rps']} -> {after['throughput_rps']}")
+    return regressions
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(path, report):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write('\n')
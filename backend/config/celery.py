@@ -12,6 +12,9 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 # Auto-discover tasks from installed apps
 app.autodiscover_tasks()
 
+# Connects the task duration signal handlers in every process using the app
+from . import metrics  # noqa: E402,F401
+
 
 @app.task(bind=True, ignore_result=True)
 def debug_task(self):
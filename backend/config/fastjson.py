@@ -0,0 +1,73 @@
+"""DRF JSON renderer and parser backed by orjson.
+
+DRF's ``JSONRenderer`` and ``JSONParser`` use the stdlib ``json`` module,
+which encodes large responses such as task lists and the admin overview
+mostly in Python. ``JSONRenderer`` and ``JSONParser`` here are drop-in
+replacements that do the work in orjson's native code and produce the
+same bytes and the same values:
+
+- Datetimes, dates and times are handed back to DRF's encoder, so they
+  keep its format (``Z`` for UTC) rather than orjson's.
+- ``\\u2028`` and ``\\u2029`` are escaped as DRF does.
+- Anything orjson rejects falls back to DRF's implementation, which then
+  renders it or raises exactly as before: integers wider than 64 bits,
+  non-string keys, indented output (the browsable API) and, when parsing,
+  invalid JSON, which thus gets DRF's error message. Bodies with numbers of
+  20 or more digits are parsed by DRF too, as orjson reads those as floats.
+
+Two differences remain: floats in exponent form are written ``1e16``
+rather than ``1e+16`` (the same number), and NaN and infinities are
+written as ``null`` instead of raising. Without orjson installed both
+classes behave exactly like DRF's.
+"""
+
+import io
+import re
+
+from django.conf import settings
+from rest_framework import parsers, renderers
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# Dataclasses go to DRF's encoder too, which refuses them
+OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS if orjson else 0
+LONG_NUMBER = re.compile(rb'\d{20}')
+UTF8 = ('utf-8', 'utf8')
+
+_encoder = JSONEncoder()
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """``JSONRenderer`` encoding with orjson where the output is identical."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or not self.compact or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_encoder.default, option=OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+class JSONParser(parsers.JSONParser):
+    """``JSONParser`` decoding UTF-8 bodies with orjson."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower() not in UTF8:
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        if not LONG_NUMBER.search(body):
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass
+        return super().parse(io.BytesIO(body), media_type, parser_context)
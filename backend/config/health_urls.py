@@ -6,6 +6,8 @@ from . import health_views
 
 urlpatterns = [
     path("", health_views.health_check, name="health-check"),
+    path("live/", health_views.liveness, name="health-live"),
+    path("ready/", health_views.readiness, name="health-ready"),
     path("db/", health_views.database_health, name="database-health"),
     path("redis/", health_views.redis_health, name="redis-health"),
     path("detailed/", health_views.detailed_health, name="detailed-health"),
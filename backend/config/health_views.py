@@ -1,11 +1,121 @@
-"""Health check views for monitoring."""
+"""Health check views for monitoring.
+
+``live/`` only says the process can serve requests and never touches a
+dependency, so a slow database or Redis cannot get a healthy replica
+restarted. ``ready/`` only fails on the database; Redis being down is
+reported as degraded. ``ready/`` and ``detailed/`` run their checks concurrently on a
+small shared thread pool, give each check ``HEALTH_CHECK_TIMEOUT`` seconds,
+and cache the outcome per process for ``HEALTH_CACHE_TTL`` seconds, so
+frequent probes from every replica cost at most one round of checks per
+TTL and never tie up request threads on a hung dependency.
+"""
+
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 
-import redis
-from django.http import JsonResponse
-from django.db import connection
 from django.conf import settings
+from django.db import close_old_connections, connection
+from django.http import JsonResponse
 from django.utils import timezone
 
+from .metrics import record_cache
+from .redis_client import get_redis
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='health')
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def check_database():
+    # Runs on a pool thread: reuse its persistent connection while usable
+    close_old_connections()
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+    return {'message': 'Database connection OK'}
+
+
+def check_redis():
+    get_redis().ping()
+    return {'message': 'Redis connection OK'}
+
+
+def check_disk():
+    total, used, free = shutil.disk_usage("/")
+    free_gb = free // (2**30)
+    return {
+        'status': 'healthy' if free_gb > 1 else 'warning',
+        'free_space_gb': free_gb,
+        'total_space_gb': total // (2**30)
+    }
+
+
+CHECKS = {
+    'database': check_database,
+    'redis': check_redis,
+    'disk': check_disk,
+}
+
+
+def run_checks(names, timeout=None):
+    """Run the named checks concurrently, each bounded by ``timeout`` seconds.
+
+    A check that raises or does not finish in time is reported unhealthy;
+    a timed-out check keeps running on its pool thread but is not waited for.
+    """
+    timeout = settings.HEALTH_CHECK_TIMEOUT if timeout is None else timeout
+    started = time.monotonic()
+    futures = {name: _executor.submit(CHECKS[name]) for name in names}
+    wait(futures.values(), timeout=timeout)
+
+    results = {}
+    for name, future in futures.items():
+        if not future.done():
+            future.cancel()
+            results[name] = {'status': 'unhealthy', 'error': f'Timed out after {timeout}s'}
+            continue
+        try:
+            results[name] = {'status': 'healthy', **future.result()}
+        except Exception as e:
+            results[name] = {'status': 'unhealthy', 'error': str(e)}
+    duration_ms = round((time.monotonic() - started) * 1000, 1)
+    return results, duration_ms
+
+
+def cached_checks(names):
+    """Return ``run_checks(names)``, reusing a result younger than the TTL."""
+    key = tuple(names)
+    now = time.monotonic()
+    with _cache_lock:
+        hit = _cache.get(key)
+        fresh = hit is not None and now - hit[0] < settings.HEALTH_CACHE_TTL
+    record_cache('health', fresh)
+    if fresh:
+        return hit[1]
+    result = run_checks(names)
+    with _cache_lock:
+        _cache[key] = (time.monotonic(), result)
+    return result
+
+
+def check_response(names, required):
+    """Build a health response; 503 if any ``required`` check is unhealthy.
+
+    Failing checks that are not required are reported as ``degraded``
+    with a 200.
+    """
+    checks, duration_ms = cached_checks(names)
+    ready = all(checks[name]['status'] != 'unhealthy' for name in required)
+    healthy = all(check['status'] != 'unhealthy' for check in checks.values())
+    return JsonResponse({
+        'status': 'healthy' if healthy else 'degraded' if ready else 'unhealthy',
+        'timestamp': timezone.now().isoformat(),
+        'duration_ms': duration_ms,
+        'checks': checks
+    }, status=200 if ready else 503)
+
 
 def health_check(request):
     """Simple health check endpoint."""
@@ -17,112 +127,31 @@ def health_check(request):
     })
 
 
+def liveness(request):
+    """Liveness probe: the process is up. Checks no dependencies."""
+    return JsonResponse({'status': 'alive', 'timestamp': timezone.now().isoformat()})
+
+
+def readiness(request):
+    """Readiness probe: the database can take traffic.
+
+    Redis is checked but not required: throttles, the rate limiter and job
+    progress recording fail open without it, so an outage only degrades the
+    replica. The notification status endpoint answers 503 meanwhile.
+    """
+    return check_response(['database', 'redis'], required=['database'])
+
+
 def database_health(request):
     """Check database connectivity."""
-    try:
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT 1")
-            cursor.fetchone()
-        
-        return JsonResponse({
-            'status': 'healthy',
-            'database': 'connected',
-            'timestamp': timezone.now().isoformat()
-        })
-    except Exception as e:
-        return JsonResponse({
-            'status': 'unhealthy',
-            'database': 'disconnected',
-            'error': str(e),
-            'timestamp': timezone.now().isoformat()
-        }, status=503)
+    return check_response(['database'], required=['database'])
 
 
 def redis_health(request):
     """Check Redis connectivity."""
-    try:
-        # Parse Redis URL
-        redis_url = settings.CELERY_BROKER_URL
-        
-        # Connect to Redis
-        r = redis.from_url(redis_url)
-        r.ping()
-        
-        return JsonResponse({
-            'status': 'healthy',
-            'redis': 'connected',
-            'timestamp': timezone.now().isoformat()
-        })
-    except Exception as e:
-        return JsonResponse({
-            'status': 'unhealthy',
-            'redis': 'disconnected',
-            'error': str(e),
-            'timestamp': timezone.now().isoformat()
-        }, status=503)
+    return check_response(['redis'], required=['redis'])
 
 
 def detailed_health(request):
     """Detailed health check with all services."""
-    health_status = {
-        'status': 'healthy',
-        'timestamp': timezone.now().isoformat(),
-        'checks': {}
-    }
-    
-    # Check database
-    try:
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT 1")
-            cursor.fetchone()
-        health_status['checks']['database'] = {
-            'status': 'healthy',
-            'message': 'Database connection OK'
-        }
-    except Exception as e:
-        health_status['status'] = 'degraded'
-        health_status['checks']['database'] = {
-            'status': 'unhealthy',
-            'error': str(e)
-        }
-    
-    # Check Redis
-    try:
-        redis_url = settings.CELERY_BROKER_URL
-        r = redis.from_url(redis_url)
-        r.ping()
-        health_status['checks']['redis'] = {
-            'status': 'healthy',
-            'message': 'Redis connection OK'
-        }
-    except Exception as e:
-        health_status['status'] = 'degraded'
-        health_status['checks']['redis'] = {
-            'status': 'unhealthy',
-            'error': str(e)
-        }
-    
-    # Check disk space
-    import shutil
-    try:
-        total, used, free = shutil.disk_usage("/")
-        free_gb = free // (2**30)
-        health_status['checks']['disk'] = {
-            'status': 'healthy' if free_gb > 1 else 'warning',
-            'free_space_gb': free_gb,
-            'total_space_gb': total // (2**30)
-        }
-    except Exception as e:
-        health_status['checks']['disk'] = {
-            'status': 'unknown',
-            'error': str(e)
-        }
-    
-    # Overall status code
-    status_code = 200
-    if health_status['status'] == 'degraded':
-        status_code = 503
-    elif health_status['status'] == 'unhealthy':
-        status_code = 503
-    
-    return JsonResponse(health_status, status=status_code)
+    return check_response(list(CHECKS), required=['database', 'redis'])
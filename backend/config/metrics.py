@@ -0,0 +1,229 @@
+"""Prometheus metrics for the API and the Celery workers.
+
+``MetricsMiddleware`` records per-route request latency, status codes and
+the number and time of SQL statements per request. Celery signals record
+task durations and outcomes, ``record_cache`` counts cache hits and misses,
+and the Celery queue depth is read from the broker on every scrape.
+
+gunicorn and Celery prefork run several processes, each with its own
+counters. When ``PROMETHEUS_MULTIPROC_DIR`` is set, prometheus_client
+writes samples to per-process files in that directory and ``/metrics``
+aggregates them, so a scrape sees the whole container rather than the one
+worker that answered. The directory must be emptied before the server
+starts.
+"""
+
+import logging
+import os
+import time
+from contextlib import ExitStack
+
+import redis
+from celery.signals import task_failure, task_postrun, task_prerun, task_retry, worker_init
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+UNRESOLVED = '<unresolved>'
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Request latency by resolved route',
+    ['method', 'route'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+RESPONSES = Counter(
+    'http_responses_total',
+    'Responses by resolved route and status code',
+    ['method', 'route', 'status'],
+)
+DB_QUERIES = Histogram(
+    'http_request_db_queries',
+    'SQL statements executed per request',
+    ['route'],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250),
+)
+DB_TIME = Histogram(
+    'http_request_db_seconds',
+    'Time spent in SQL statements per request',
+    ['route'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+CACHE_REQUESTS = Counter(
+    'cache_requests_total',
+    'Cache lookups by cache and result (hit or miss)',
+    ['cache', 'result'],
+)
+TASK_DURATION = Histogram(
+    'celery_task_duration_seconds',
+    'Celery task run time by task and final state',
+    ['task', 'state'],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 15, 60, 300, 900),
+)
+TASK_EVENTS = Counter(
+    'celery_task_events_total',
+    'Celery task failures and retries',
+    ['task', 'event'],
+)
+
+
+def multiprocess_enabled():
+    return bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+
+def record_cache(cache, hit):
+    """Count one lookup in the named cache."""
+    CACHE_REQUESTS.labels(cache=cache, result='hit' if hit else 'miss').inc()
+
+
+class QueryRecorder:
+    """``execute_wrapper`` hook counting statements and their total time."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+class MetricsMiddleware:
+    """Record latency, status and SQL usage of every request by route.
+
+    Routes are labelled with the namespaced URL name (``tasks:task-list``,
+    ``accounts:admin-overview``), so label cardinality is bounded by the
+    URLconf, not by ids in paths.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        match = getattr(request, 'resolver_match', None)
+        route = (match.view_name if match else None) or UNRESOLVED
+        REQUEST_LATENCY.labels(method=request.method, route=route).observe(elapsed)
+        RESPONSES.labels(method=request.method, route=route, status=response.status_code).inc()
+        DB_QUERIES.labels(route=route).observe(recorder.count)
+        DB_TIME.labels(route=route).observe(recorder.seconds)
+        return response
+
+
+class QueueDepthCollector:
+    """Report the number of messages waiting in each Celery queue at scrape time."""
+
+    _broker = None
+
+    def broker(self):
+        if settings.CELERY_BROKER_URL == settings.REDIS_URL:
+            return get_redis()
+        if QueueDepthCollector._broker is None:
+            QueueDepthCollector._broker = redis.Redis.from_url(
+                settings.CELERY_BROKER_URL,
+                socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            )
+        return QueueDepthCollector._broker
+
+    def describe(self):
+        # Lets the registry learn the metric name without reaching the broker
+        yield self.family()
+
+    def family(self):
+        return GaugeMetricFamily('celery_queue_length', 'Messages waiting in a Celery queue', labels=['queue'])
+
+    def collect(self):
+        depth = self.family()
+        try:
+            pipe = self.broker().pipeline()
+            for queue in settings.METRICS_CELERY_QUEUES:
+                pipe.llen(queue)
+            for queue, length in zip(settings.METRICS_CELERY_QUEUES, pipe.execute()):
+                depth.add_metric([queue], length)
+        except Exception as e:
+            logger.warning(f"Could not read Celery queue depth: {str(e)}")
+        yield depth
+
+
+def multiprocess_registry():
+    """Return a registry merging the sample files of every process."""
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def metrics_view(request):
+    """Expose metrics in the Prometheus text format."""
+    if multiprocess_enabled():
+        registry = multiprocess_registry()
+        registry.register(QueueDepthCollector())
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+
+if not multiprocess_enabled():
+    REGISTRY.register(QueueDepthCollector())
+
+
+_task_started = {}
+
+
+@task_prerun.connect
+def _task_prerun(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def _task_postrun(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None and task is not None:
+        TASK_DURATION.labels(task=task.name, state=state or 'UNKNOWN').observe(time.perf_counter() - started)
+
+
+@task_failure.connect
+def _task_failure(sender=None, **kwargs):
+    TASK_EVENTS.labels(task=getattr(sender, 'name', str(sender)), event='failure').inc()
+
+
+@task_retry.connect
+def _task_retry(sender=None, **kwargs):
+    TASK_EVENTS.labels(task=getattr(sender, 'name', str(sender)), event='retry').inc()
+
+
+@worker_init.connect
+def _serve_worker_metrics(**kwargs):
+    # Workers have no HTTP server of their own; expose their metrics on a port
+    port = settings.CELERY_METRICS_PORT
+    if port:
+        start_http_server(port, registry=multiprocess_registry() if multiprocess_enabled() else REGISTRY)
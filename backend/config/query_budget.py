@@ -0,0 +1,154 @@
+"""Per-request SQL budget, N+1 detection and PostgreSQL statement timeouts.
+
+``QueryBudgetMiddleware`` wraps every database connection with
+``execute_wrapper`` for the duration of a request when
+``QUERY_BUDGET_ENABLED`` is on. Statements are grouped by shape (the SQL
+with ``IN`` lists collapsed), with their count, total time and the first
+project call site that issued them. A request over
+``QUERY_BUDGET_MAX_QUERIES`` statements or ``QUERY_BUDGET_MAX_DB_MS``
+milliseconds logs its most expensive shapes, and any shape repeated
+``QUERY_BUDGET_REPEAT_THRESHOLD`` times or more is logged as a likely N+1.
+
+Independently of the budget, a view class may set ``statement_timeout``
+(milliseconds) to have PostgreSQL cancel its slow statements;
+``QUERY_STATEMENT_TIMEOUT`` is the default for views that do not.
+"""
+
+import logging
+import os
+import re
+import time
+import traceback
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connection, connections
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+WHITESPACE = re.compile(r'\s+')
+# Middleware frames are on every stack and never the culprit
+SKIPPED_FILES = {__file__, metrics.__file__}
+
+
+def query_shape(sql):
+    """Return ``sql`` with parameter lists collapsed, so repeats group together."""
+    return IN_LIST.sub('IN (...)', WHITESPACE.sub(' ', sql).strip())
+
+
+def call_site():
+    """Return "file:line in function" of the code that issued a statement.
+
+    The innermost frame of this project is used; when the statement comes
+    from a library evaluating a lazy queryset (e.g. a DRF mixin), the
+    innermost frame outside Django is used instead.
+    """
+    base = str(settings.BASE_DIR)
+    fallback = None
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        filename = frame.filename
+        if filename in SKIPPED_FILES:
+            continue
+        if filename.startswith(base) and 'site-packages' not in filename:
+            return f"{os.path.relpath(filename, base)}:{frame.lineno} in {frame.name}"
+        if fallback is None and f'{os.sep}django{os.sep}' not in filename:
+            fallback = frame
+    if fallback is None:
+        return ''
+    return f"{fallback.filename}:{fallback.lineno} in {fallback.name}"
+
+
+class QueryLog:
+    """``execute_wrapper`` hook grouping a request's statements by shape."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.seconds += elapsed
+            shape = query_shape(sql)
+            entry = self.shapes.get(shape)
+            if entry is None:
+                entry = self.shapes[shape] = {'count': 0, 'seconds': 0.0, 'site': call_site()}
+            entry['count'] += 1
+            entry['seconds'] += elapsed
+
+    def top(self, limit):
+        """Return the ``limit`` shapes with the most total time."""
+        return sorted(self.shapes.items(), key=lambda item: item[1]['seconds'], reverse=True)[:limit]
+
+    def repeated(self, threshold):
+        return [(shape, entry) for shape, entry in self.shapes.items() if entry['count'] >= threshold]
+
+
+def describe(shape, entry):
+    site = f" at {entry['site']}" if entry['site'] else ''
+    return f"{entry['seconds'] * 1000:.1f} ms x{entry['count']} {shape[:300]}{site}"
+
+
+class QueryBudgetMiddleware:
+    """Enforce the per-request query budget and per-view statement timeouts."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            if not settings.QUERY_BUDGET_ENABLED:
+                return self.get_response(request)
+
+            log = QueryLog()
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(log))
+                response = self.get_response(request)
+            self.report(request, log)
+            return response
+        finally:
+            if getattr(request, '_statement_timeout_set', False):
+                self.set_statement_timeout(None)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+        timeout = getattr(view_class, 'statement_timeout', settings.QUERY_STATEMENT_TIMEOUT)
+        if timeout and connection.vendor == 'postgresql':
+            self.set_statement_timeout(timeout)
+            request._statement_timeout_set = True
+        return None
+
+    def set_statement_timeout(self, timeout):
+        try:
+            with connection.cursor() as cursor:
+                if timeout:
+                    cursor.execute('SET statement_timeout = %s', [int(timeout)])
+                else:
+                    cursor.execute('RESET statement_timeout')
+        except Exception as e:
+            logger.warning(f"Could not set statement_timeout: {str(e)}")
+
+    def report(self, request, log):
+        match = getattr(request, 'resolver_match', None)
+        endpoint = f"{request.method} {match.view_name if match else request.path}"
+
+        db_ms = log.seconds * 1000
+        if log.count > settings.QUERY_BUDGET_MAX_QUERIES or db_ms > settings.QUERY_BUDGET_MAX_DB_MS:
+            lines = [
+                f"Query budget exceeded on {endpoint}: {log.count} queries, {db_ms:.1f} ms "
+                f"(budget {settings.QUERY_BUDGET_MAX_QUERIES} queries, {settings.QUERY_BUDGET_MAX_DB_MS} ms)"
+            ]
+            lines += [f"  {describe(shape, entry)}" for shape, entry in log.top(settings.QUERY_BUDGET_TOP)]
+            logger.warning("\n".join(lines))
+
+        for shape, entry in log.repeated(settings.QUERY_BUDGET_REPEAT_THRESHOLD):
+            logger.warning(f"Possible N+1 on {endpoint}: {describe(shape, entry)}")
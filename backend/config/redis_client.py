@@ -0,0 +1,28 @@
+"""Shared Redis client for application features (throttling, job state, ...).
+
+Celery talks to Redis through its own connections; this module gives the
+Django side a single pooled client per process instead of opening a new
+connection on every use.
+"""
+
+import redis
+from django.conf import settings
+
+_client = None
+
+
+def get_redis():
+    """Return the process-wide Redis client, creating it on first use.
+
+    redis-py resets its connection pool after a fork, so the client is safe
+    to create before gunicorn or Celery fork their workers.
+    """
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            health_check_interval=30,
+        )
+    return _client
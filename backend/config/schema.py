@@ -0,0 +1,85 @@
+"""OpenAPI schema views serving a schema generated once per process.
+
+drf_yasg introspects every view to build the schema, on every request.
+The schema only changes when the code does, so ``SchemaView`` builds it
+on the first request for a format (JSON, YAML, or the ``?format=openapi``
+spec the Swagger UI and ReDoc pages load) and serves the rendered bytes
+from memory afterwards; a deploy starts new processes and so a fresh
+schema. It is generated without a request, so it carries no host and
+clients resolve paths against the host they fetched it from.
+
+Responses carry an ``ETag`` derived from the content, identical in every
+process, so clients and proxies revalidate with a cheap 304, and may reuse
+the schema for ``OPENAPI_CACHE_MAX_AGE`` seconds without asking. The
+HTML pages are left alone: drf_yasg renders them without the schema,
+which they fetch from the spec URL.
+"""
+
+import hashlib
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from drf_yasg import openapi
+from drf_yasg.renderers import _SpecRenderer
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+
+from .metrics import record_cache
+
+INFO = openapi.Info(
+    title="TaskBoard API",
+    default_version='v1',
+    description="Complete API documentation for TaskBoard application",
+    terms_of_service="https://www.taskboard.com/terms/",
+    contact=openapi.Contact(email="support@taskboard.com"),
+    license=openapi.License(name="MIT License"),
+)
+
+BaseSchemaView = get_schema_view(
+    INFO,
+    public=True,
+    permission_classes=(permissions.AllowAny,),
+)
+
+_lock = threading.Lock()
+# Renderer format -> (rendered schema, ETag)
+_rendered = {}
+
+
+def rendered_schema(view, renderer):
+    """Return the schema rendered by ``renderer`` and its ETag, built once."""
+    cached = _rendered.get(renderer.format)
+    record_cache('openapi_schema', cached is not None)
+    if cached is not None:
+        return cached
+    with _lock:
+        if renderer.format not in _rendered:
+            generator = view.generator_class(INFO)
+            body = renderer.render(generator.get_schema(request=None, public=True), renderer.media_type)
+            if isinstance(body, str):
+                body = body.encode()
+            _rendered[renderer.format] = body, f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        return _rendered[renderer.format]
+
+
+def clear():
+    """Forget the rendered schemas, e.g. after changing URLs in tests."""
+    _rendered.clear()
+
+
+class SchemaView(BaseSchemaView):
+
+    def get(self, request, version='', format=None):
+        renderer = request.accepted_renderer
+        if not isinstance(renderer, _SpecRenderer):
+            return super().get(request, version, format)
+
+        body, etag = rendered_schema(self, renderer)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(body, content_type=f'{renderer.media_type}; charset={renderer.charset}')
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, max_age=settings.OPENAPI_CACHE_MAX_AGE)
+        return response
@@ -2,6 +2,7 @@
 from pathlib import Path
 import os
 import dj_database_url
+from celery.schedules import crontab
 
 # Build paths - adjusted for settings/ subdirectory
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -35,6 +36,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "config.metrics.MetricsMiddleware",
+    "config.query_budget.QueryBudgetMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -130,6 +133,16 @@ AUTHENTICATION_BACKENDS = [
 
 # REST Framework Configuration
 REST_FRAMEWORK = {
+    # orjson-backed drop-ins for DRF's JSON classes, with identical output
+    "DEFAULT_RENDERER_CLASSES": [
+        "config.fastjson.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "config.fastjson.JSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework.authentication.TokenAuthentication",
         "rest_framework.authentication.SessionAuthentication",
@@ -139,6 +152,20 @@ REST_FRAMEWORK = {
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 20,
+    # Reverse proxies in front of gunicorn (1 = the bundled nginx). Client IPs
+    # for throttling are taken that many hops from the end of X-Forwarded-For,
+    # so a client cannot pick its own by sending the header; 0 uses REMOTE_ADDR
+    "NUM_PROXIES": int(os.environ.get('NUM_PROXIES', 1)),
+    # Redis-backed so limits hold across all gunicorn workers and containers
+    "DEFAULT_THROTTLE_CLASSES": [
+        "accounts.throttling.UserWriteThrottle",
+    ],
+    "DEFAULT_THROTTLE_RATES": {
+        "login_ip": os.environ.get('THROTTLE_LOGIN_IP', '20/min'),
+        "login_email": os.environ.get('THROTTLE_LOGIN_EMAIL', '5/min'),
+        "register_ip": os.environ.get('THROTTLE_REGISTER_IP', '10/hour'),
+        "user_write": os.environ.get('THROTTLE_USER_WRITE', '120/min'),
+    },
 }
 
 # Swagger Settings
@@ -153,6 +180,9 @@ SWAGGER_SETTINGS = {
     'USE_SESSION_AUTH': False,
     'JSON_EDITOR': True,
 }
+# Seconds clients and proxies may reuse the OpenAPI schema before
+# revalidating its ETag; it is regenerated only when the app restarts
+OPENAPI_CACHE_MAX_AGE = int(os.environ.get('OPENAPI_CACHE_MAX_AGE', 3600))
 
 # CORS Configuration - Override in local.py and production.py
 CORS_ALLOW_CREDENTIALS = True
@@ -164,6 +194,60 @@ CELERY_ACCEPT_CONTENT = ['application/json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'Asia/Tehran'
+# Long-running email chunks: don't let one process prefetch work the others could run
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_BEAT_SCHEDULE = {
+    'purge-expired-claim-checks': {
+        'task': 'accounts.tasks.purge_claim_checks',
+        'schedule': 3600,
+    },
+    'send-due-reminders': {
+        'task': 'tasks.tasks.send_due_reminders_task',
+        'schedule': 15 * 60,
+    },
+    'send-daily-digests': {
+        'task': 'tasks.tasks.send_daily_digests_task',
+        'schedule': crontab(hour=int(os.environ.get('DIGEST_HOUR', 7)), minute=0),
+    },
+}
+# Task arguments and results whose JSON exceeds this many bytes are stored
+# once in the database and passed through the broker by reference
+CLAIM_CHECK_THRESHOLD = int(os.environ.get('CLAIM_CHECK_THRESHOLD', 16 * 1024))
+# How long stored payloads and results are kept (seconds)
+CLAIM_CHECK_TTL = int(os.environ.get('CLAIM_CHECK_TTL', 7 * 24 * 3600))
+# Transactional outbox: messages published per batch, idle poll interval and
+# base backoff (seconds, doubled per failed publish)
+OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', 100))
+OUTBOX_POLL_INTERVAL = float(os.environ.get('OUTBOX_POLL_INTERVAL', 0.5))
+OUTBOX_RETRY_BACKOFF = int(os.environ.get('OUTBOX_RETRY_BACKOFF', 5))
+
+# Redis used by the application itself (throttling, job state)
+REDIS_URL = os.environ.get('REDIS_URL', CELERY_BROKER_URL)
+REDIS_SOCKET_TIMEOUT = float(os.environ.get('REDIS_SOCKET_TIMEOUT', 2))
+
+# Health checks: seconds each dependency check may take, and seconds a
+# result is reused before probes trigger a new round of checks
+HEALTH_CHECK_TIMEOUT = float(os.environ.get('HEALTH_CHECK_TIMEOUT', 2))
+HEALTH_CACHE_TTL = float(os.environ.get('HEALTH_CACHE_TTL', 5))
+
+# Prometheus metrics (see config.metrics); set PROMETHEUS_MULTIPROC_DIR when
+# running several gunicorn or Celery processes
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True') == 'True'
+METRICS_CELERY_QUEUES = os.environ.get('METRICS_CELERY_QUEUES', 'celery').split(',')
+# Port Celery workers serve their metrics on; 0 disables it
+CELERY_METRICS_PORT = int(os.environ.get('CELERY_METRICS_PORT', 0))
+
+# Per-request query budget (see config.query_budget): log requests over
+# either limit with their costliest statements, and statements repeated this
+# often as likely N+1 queries
+QUERY_BUDGET_ENABLED = os.environ.get('QUERY_BUDGET_ENABLED', str(DEBUG)) == 'True'
+QUERY_BUDGET_MAX_QUERIES = int(os.environ.get('QUERY_BUDGET_MAX_QUERIES', 20))
+QUERY_BUDGET_MAX_DB_MS = float(os.environ.get('QUERY_BUDGET_MAX_DB_MS', 200))
+QUERY_BUDGET_REPEAT_THRESHOLD = int(os.environ.get('QUERY_BUDGET_REPEAT_THRESHOLD', 5))
+QUERY_BUDGET_TOP = int(os.environ.get('QUERY_BUDGET_TOP', 5))
+# Default PostgreSQL statement_timeout (ms) for views without their own
+# ``statement_timeout``; 0 leaves the server setting alone
+QUERY_STATEMENT_TIMEOUT = int(os.environ.get('QUERY_STATEMENT_TIMEOUT', 0))
 
 # For testing: execute tasks synchronously
 if os.environ.get('CELERY_TASK_ALWAYS_EAGER') == 'True':
@@ -178,3 +262,43 @@ EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'True') == 'True'
 EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'noreply@taskboard.local')
+EMAIL_TIMEOUT = int(os.environ.get('EMAIL_TIMEOUT', 30))
+# Messages sent over one SMTP connection before it is recycled
+EMAIL_BATCH_SIZE = int(os.environ.get('EMAIL_BATCH_SIZE', 100))
+# Recipients per send_email_task when a notification is fanned out
+EMAIL_FANOUT_CHUNK_SIZE = int(os.environ.get('EMAIL_FANOUT_CHUNK_SIZE', 500))
+# Flush notification progress to Redis every N messages
+EMAIL_PROGRESS_EVERY = int(os.environ.get('EMAIL_PROGRESS_EVERY', 50))
+# How long notification job progress is kept (seconds)
+NOTIFY_JOB_TTL = int(os.environ.get('NOTIFY_JOB_TTL', 24 * 3600))
+# Long-polling limits for the notification status endpoint (seconds)
+NOTIFY_STATUS_MAX_WAIT = 25
+NOTIFY_STATUS_POLL_INTERVAL = 0.5
+# Delivery attempts per recipient, and base backoff (seconds, doubled per attempt)
+EMAIL_MAX_ATTEMPTS = int(os.environ.get('EMAIL_MAX_ATTEMPTS', 4))
+EMAIL_RETRY_BACKOFF = int(os.environ.get('EMAIL_RETRY_BACKOFF', 60))
+# Times a send task may reschedule itself to wait for backoff or the rate
+# limiter; counted apart from its error retries
+EMAIL_MAX_RESCHEDULES = int(os.environ.get('EMAIL_MAX_RESCHEDULES', 1000))
+# Cluster-wide SMTP send limits (unset = unlimited); waits up to
+# EMAIL_RATE_MAX_SLEEP seconds are slept off, longer ones reschedule the task
+EMAIL_RATE_PER_SECOND = float(os.environ['EMAIL_RATE_PER_SECOND']) if os.environ.get('EMAIL_RATE_PER_SECOND') else None
+EMAIL_RATE_PER_HOUR = int(os.environ['EMAIL_RATE_PER_HOUR']) if os.environ.get('EMAIL_RATE_PER_HOUR') else None
+EMAIL_RATE_MAX_SLEEP = float(os.environ.get('EMAIL_RATE_MAX_SLEEP', 2))
+# Reconnect attempts per message when the SMTP server drops the connection
+EMAIL_MAX_RECONNECTS = int(os.environ.get('EMAIL_MAX_RECONNECTS', 2))
+# Concurrent SMTP connections per worker process (accounts.smtp_pool);
+# 1 sends over a single blocking connection
+EMAIL_SMTP_CONCURRENCY = int(os.environ.get('EMAIL_SMTP_CONCURRENCY', 8))
+# Dead-letter replay: recipients per replayed job and seconds between jobs
+DEAD_LETTER_REPLAY_BATCH_SIZE = int(os.environ.get('DEAD_LETTER_REPLAY_BATCH_SIZE', 200))
+DEAD_LETTER_REPLAY_INTERVAL = int(os.environ.get('DEAD_LETTER_REPLAY_INTERVAL', 30))
+# Remind users of open tasks due within this many hours
+TASK_REMINDER_HOURS = int(os.environ.get('TASK_REMINDER_HOURS', 24))
+# Reminder runs in a row that rescan after temporary send failures
+TASK_REMINDER_MAX_RETRIES = int(os.environ.get('TASK_REMINDER_MAX_RETRIES', 3))
+# Daily digest: subscribers per Celery chunk, and highlighted tasks per email
+DIGEST_CHUNK_SIZE = int(os.environ.get('DIGEST_CHUNK_SIZE', 500))
+DIGEST_HIGHLIGHTS = int(os.environ.get('DIGEST_HIGHLIGHTS', 5))
+# Days of digest delivery ledger rows kept; older days are purged by the beat task
+DIGEST_LEDGER_RETENTION_DAYS = int(os.environ.get('DIGEST_LEDGER_RETENTION_DAYS', 7))
@@ -25,10 +25,19 @@ PASSWORD_HASHERS = [
 # Email - Use in-memory backend (no actual emails sent)
 EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
 
+# Throttling - Disabled by default; throttle tests enable the scopes they need
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_THROTTLE_RATES': {scope: None for scope in REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']},
+}
+
 # Celery - Execute tasks synchronously in tests
 CELERY_TASK_ALWAYS_EAGER = True
 CELERY_TASK_EAGER_PROPAGATES = True
 
+# Eager tasks ignore retry countdowns, so make per-recipient retries due at once
+EMAIL_RETRY_BACKOFF = 0
+
 # Disable migrations for faster test database creation
 # Uncomment if you want even faster tests
 # class DisableMigrations:
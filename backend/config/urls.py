@@ -1,22 +1,8 @@
 from django.contrib import admin
 from django.urls import path, include, re_path
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
 
-# Swagger/ReDoc configuration
-schema_view = get_schema_view(
-    openapi.Info(
-        title="TaskBoard API",
-        default_version='v1',
-        description="Complete API documentation for TaskBoard application",
-        terms_of_service="https://www.taskboard.com/terms/",
-        contact=openapi.Contact(email="support@taskboard.com"),
-        license=openapi.License(name="MIT License"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
+from config.metrics import metrics_view
+from config.schema import SchemaView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -24,14 +10,12 @@ urlpatterns = [
     # API endpoints
     path('api/accounts/', include('accounts.urls')),
     path('api/tasks/', include('tasks.urls')),
+    path('api/health/', include('config.health_urls')),
+    path('metrics', metrics_view, name='metrics'),
     
-    # API Documentation
-    re_path(r'^swagger(?P<format>\.json|\.yaml)$', 
-            schema_view.without_ui(cache_timeout=0), name='schema-json'),
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), 
-         name='schema-swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), 
-         name='schema-redoc'),
-    path('api/docs/', schema_view.with_ui('swagger', cache_timeout=0), 
-         name='api-docs'),
+    # API Documentation; the schema is generated once per process (config.schema)
+    re_path(r'^swagger(?P<format>\.json|\.yaml)$', SchemaView.without_ui(), name='schema-json'),
+    path('swagger/', SchemaView.with_ui('swagger'), name='schema-swagger-ui'),
+    path('redoc/', SchemaView.with_ui('redoc'), name='schema-redoc'),
+    path('api/docs/', SchemaView.with_ui('swagger'), name='api-docs'),
 ]
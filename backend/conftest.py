@@ -1,15 +1,25 @@
 """Pytest configuration and global fixtures."""
 
+import fakeredis
 import pytest
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework.authtoken.models import Token
+from config import redis_client
 from tasks.models import Task
 
 
 User = get_user_model()
 
 
+@pytest.fixture(autouse=True)
+def fake_redis(monkeypatch):
+    """Point the shared Redis client at an in-memory fake for every test."""
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(redis_client, '_client', client)
+    return client
+
+
 @pytest.fixture
 def api_client():
     """Return API client for tests."""
@@ -15,10 +15,5 @@ echo "Collecting static files..."
 python manage.py collectstatic --noinput
 
 echo "Starting Gunicorn..."
-exec gunicorn config.wsgi:application \
-    --bind 0.0.0.0:8000 \
-    --workers ${GUNICORN_WORKERS:-3} \
-    --timeout 120 \
-    --access-logfile - \
-    --error-logfile - \
-    --log-level info
+# Workers, threads and timeouts: see gunicorn.conf.py
+exec gunicorn --config gunicorn.conf.py
@@ -0,0 +1,218 @@
+"""gunicorn configuration for every environment that serves the API.
+
+Run from the backend directory with ``gunicorn --config gunicorn.conf.py``;
+the application comes from ``GUNICORN_WORKER_MODE``, so none is given on
+the command line.
+
+Sizing: unless ``GUNICORN_WORKERS`` is set, the server starts
+``2 * cores + 1`` workers, capped by how many ``GUNICORN_WORKER_MEMORY_MB``
+budgets fit in the available memory. Cores and memory come from the
+container's cgroup limits when there are any (``deploy.resources.limits``
+in ``docker-compose.prod.yml``), not from the host.
+
+Worker modes:
+    ``gthread`` (default): the WSGI app in threaded workers with
+        ``GUNICORN_THREADS`` threads each, so requests blocked on the
+        database or Redis do not hold a whole process
+    ``uvicorn``: the ASGI app in ``uvicorn.workers.UvicornWorker``, for
+        async views. Django runs the (synchronous) DRF views one at a time
+        per worker there, so it is not faster for this API as it stands
+
+The app is loaded once in the master (``preload_app``) and forked, so
+workers share its code and data pages copy-on-write. The garbage collector
+would break that sharing by writing to every object it visits: it is
+disabled while the app loads and ``gc.freeze()`` moves everything loaded
+into a generation it never scans before each fork. Workers are recycled
+after ``GUNICORN_MAX_REQUESTS`` requests, plus a random jitter so they do
+not all restart together, to bound slow leaks.
+
+In ``gthread`` mode each worker logs its request count, rate, mean and
+worst latency and 5xx count every ``GUNICORN_STATS_INTERVAL`` seconds, and
+its lifetime totals when it exits (``0`` turns the periodic report off).
+"""
+
+import gc
+import math
+import os
+import threading
+import time
+
+WORKER_CLASSES = {
+    'gthread': ('gthread', 'config.wsgi:application'),
+    'uvicorn': ('uvicorn.workers.UvicornWorker', 'config.asgi:application'),
+}
+
+
+def _env_int(name, default):
+    value = os.environ.get(name, '')
+    return int(value) if value.strip() else default
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def cpu_limit():
+    """Return the number of cores this process may use, rounded up."""
+    if hasattr(os, 'sched_getaffinity'):
+        cores = len(os.sched_getaffinity(0))
+    else:
+        cores = os.cpu_count() or 1
+
+    # cgroup v2 ("max 100000" when unlimited), then v1 (quota -1)
+    quota = period = None
+    cpu_max = _read('/sys/fs/cgroup/cpu.max')
+    if cpu_max:
+        limit, _, cpu_period = cpu_max.partition(' ')
+        if limit != 'max':
+            quota, period = int(limit), int(cpu_period)
+    else:
+        cfs_quota = _read('/sys/fs/cgroup/cpu/cpu.cfs_quota_us')
+        cfs_period = _read('/sys/fs/cgroup/cpu/cpu.cfs_period_us')
+        if cfs_quota and cfs_period and int(cfs_quota) > 0:
+            quota, period = int(cfs_quota), int(cfs_period)
+    if quota and period:
+        cores = min(cores, math.ceil(quota / period))
+    return max(1, cores)
+
+
+def memory_limit():
+    """Return the memory available to this process's cgroup, in MB."""
+    memory = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    # cgroup v1 reports a huge number rather than "max" when unlimited
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        limit = _read(path)
+        if limit and limit.isdigit():
+            memory = min(memory, int(limit))
+            break
+    return memory // (1024 * 1024)
+
+
+def worker_count(cores, memory_mb, worker_memory_mb):
+    """Return ``2 * cores + 1`` workers, or as many as fit in ``memory_mb``."""
+    return max(1, min(2 * cores + 1, memory_mb // worker_memory_mb))
+
+
+class WorkerStats:
+    """Request count and latency of one worker, overall and since the last report."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.requests = self.errors = 0
+        self.reset_window(self.started)
+
+    def reset_window(self, now):
+        self.window_started = now
+        self.window_requests = self.window_errors = 0
+        self.window_seconds = self.window_max = 0.0
+
+    def record(self, seconds, failed, interval):
+        """Add a request; return the window's summary once ``interval`` has passed."""
+        now = time.monotonic()
+        with self.lock:
+            self.requests += 1
+            self.window_requests += 1
+            self.window_seconds += seconds
+            self.window_max = max(self.window_max, seconds)
+            if failed:
+                self.errors += 1
+                self.window_errors += 1
+            if not interval or now - self.window_started < interval:
+                return None
+            summary = self.summary(now)
+            self.reset_window(now)
+            return summary
+
+    def summary(self, now):
+        elapsed = now - self.window_started
+        requests = self.window_requests
+        return (
+            f'{requests} requests in {elapsed:.0f}s ({requests / elapsed:.1f}/s), '
+            f'mean {self.window_seconds / requests * 1000:.1f} ms, '
+            f'max {self.window_max * 1000:.1f} ms, {self.window_errors} errors'
+        )
+
+
+mode = os.environ.get('GUNICORN_WORKER_MODE', 'gthread')
+if mode not in WORKER_CLASSES:
+    raise ValueError(f'GUNICORN_WORKER_MODE must be one of {", ".join(WORKER_CLASSES)}, not "{mode}"')
+worker_class, wsgi_app = WORKER_CLASSES[mode]
+
+cores = cpu_limit()
+memory_mb = memory_limit()
+workers = _env_int('GUNICORN_WORKERS', 0) or worker_count(
+    cores, memory_mb, _env_int('GUNICORN_WORKER_MEMORY_MB', 150)
+)
+threads = _env_int('GUNICORN_THREADS', 2) if mode == 'gthread' else 1
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+timeout = _env_int('GUNICORN_TIMEOUT', 120)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10)
+# The heartbeat file is touched constantly; keep it off the container's overlay filesystem
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() not in ('0', 'false', 'no')
+if preload_app:
+    # Re-enabled in each worker after the fork
+    gc.disable()
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+stats_interval = _env_int('GUNICORN_STATS_INTERVAL', 60)
+
+
+def when_ready(server):
+    server.log.info(
+        f'Serving {wsgi_app} with {workers} {mode} workers x {threads} threads '
+        f'(cores: {cores}, memory: {memory_mb} MB, preload: {preload_app})'
+    )
+
+
+def pre_fork(server, worker):
+    if preload_app:
+        # Connections opened while loading the app must not be shared by workers
+        from django.db import connections
+        connections.close_all()
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    gc.enable()
+    worker.stats = WorkerStats()
+
+
+def pre_request(worker, req):
+    req.started = time.monotonic()
+
+
+def post_request(worker, req, environ, resp):
+    failed = resp is None or not resp.status_code or resp.status_code >= 500
+    summary = worker.stats.record(time.monotonic() - req.started, failed, stats_interval)
+    if summary:
+        worker.log.info(f'Worker {worker.pid}: {summary}')
+
+
+def worker_exit(server, worker):
+    stats = getattr(worker, 'stats', None)
+    if stats is not None and stats.requests:
+        uptime = time.monotonic() - stats.started
+        server.log.info(
+            f'Worker {worker.pid} exiting after {stats.requests} requests '
+            f'in {uptime:.0f}s, {stats.errors} errors'
+        )
+
+
+def child_exit(server, worker):
+    # Drop the dead worker's live gauge samples from the /metrics aggregate
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
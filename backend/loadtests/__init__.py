@@ -0,0 +1,16 @@
+"""Locust load tests for the API against a running stack.
+
+Unlike ``benchmarks``, which replays endpoints in-process, these drive a
+real deployment (gunicorn, nginx, PostgreSQL, Redis) over HTTP with a mix
+of simulated clients modelled on production traffic
+(``loadtests.locustfile``). A run writes a JSON summary in the same format
+as ``python -m benchmarks`` so releases can be compared with
+``python -m loadtests``.
+
+Start the load-test compose stack from the repository root, then run
+Locust headless from ``backend/``::
+
+    docker-compose -f docker-compose.yml -f docker-compose.loadtest.yml up -d --build
+    locust --config loadtests/locust.conf
+    python -m loadtests loadtests/baseline.json loadtests/results/summary.json
+"""
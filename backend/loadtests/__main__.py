@@ -0,0 +1,38 @@
+"""Compare two load-test summaries: ``python -m loadtests BASELINE CURRENT``."""
+
+import argparse
+import sys
+
+from benchmarks.report import compare, load
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m loadtests', description=__doc__)
+    parser.add_argument('baseline', help='Summary JSON of the previous release')
+    parser.add_argument('current', help='Summary JSON of this run')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed regression, 0.2 = 20%%')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    baseline, current = load(args.baseline), load(args.current)
+
+    for name, result in sorted(current['scenarios'].items()):
+        print(
+            f"{name:<16} p50 {result['p50_ms']:>8} ms  p95 {result['p95_ms']:>8} ms  "
+            f"p99 {result['p99_ms']:>8} ms  {result['throughput_rps']:>8} req/s  {result['errors']} errors"
+        )
+
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"Regressions beyond {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
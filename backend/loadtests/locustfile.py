@@ -0,0 +1,152 @@
+"""Locust scenarios modelling the production traffic mix.
+
+Three kinds of simulated clients, weighted like real traffic:
+
+- ``DashboardUser`` logs in and polls the task list, mostly filtered by
+  status, the way the frontend dashboard refreshes.
+- ``CrudUser`` logs in and works in bursts: create a task, read it, update
+  it, move it along, delete it.
+- ``AdminUser`` watches the admin overview and occasionally queues a
+  notification.
+
+Clients log in as the ``bench_*`` users seeded by
+``python -m benchmarks --seed-only`` (password ``BenchPass123!``). Tuned
+with environment variables:
+
+- ``LOADTEST_THINK_MIN`` / ``LOADTEST_THINK_MAX``: seconds between a
+  client's requests (default 1-3)
+- ``LOADTEST_USER_POOL``: distinct bench users to log in as (default 200)
+- ``LOADTEST_WEIGHTS``: dashboard,crud,admin client weights (default 8,3,1)
+- ``LOADTEST_NOTIFY``: set to ``False`` to skip the notify endpoint
+- ``LOADTEST_SUMMARY``: where to write the JSON summary
+  (default ``loadtests/results/summary.json``)
+
+The number of clients, spawn rate and duration are Locust's own
+``--users``, ``--spawn-rate`` and ``--run-time`` (see ``locust.conf``).
+"""
+
+import itertools
+import os
+import random
+
+from locust import HttpUser, between, events, task
+from locust.runners import WorkerRunner
+
+from benchmarks.report import save
+from loadtests import summary
+
+PASSWORD = 'BenchPass123!'
+ADMIN_EMAIL = 'bench_admin@example.com'
+THINK_MIN = float(os.environ.get('LOADTEST_THINK_MIN', 1))
+THINK_MAX = float(os.environ.get('LOADTEST_THINK_MAX', 3))
+USER_POOL = int(os.environ.get('LOADTEST_USER_POOL', 200))
+WEIGHTS = [int(w) for w in os.environ.get('LOADTEST_WEIGHTS', '8,3,1').split(',')]
+NOTIFY = os.environ.get('LOADTEST_NOTIFY', 'True') == 'True'
+SUMMARY_PATH = os.environ.get('LOADTEST_SUMMARY', 'loadtests/results/summary.json')
+STATUSES = ['TODO', 'DOING', 'DONE']
+
+# Each simulated client takes the next bench user so logins spread evenly
+_accounts = itertools.count()
+
+
+class ApiUser(HttpUser):
+    """Base client: logs in once and sends its token with every request."""
+    abstract = True
+    wait_time = between(THINK_MIN, THINK_MAX)
+
+    def email(self):
+        return f'bench_{next(_accounts) % USER_POOL}@example.com'
+
+    def on_start(self):
+        with self.client.post(
+            '/api/accounts/login/',
+            json={'email': self.email(), 'password': PASSWORD},
+            name='login',
+            catch_response=True,
+        ) as response:
+            if response.status_code != 200:
+                response.failure(f'Login failed with {response.status_code}; is the dataset seeded?')
+                self.stop()
+                return
+            self.client.headers['Authorization'] = f"Token {response.json()['token']}"
+
+
+class DashboardUser(ApiUser):
+    weight = WEIGHTS[0]
+
+    @task(6)
+    def poll_filtered(self):
+        self.client.get('/api/tasks/', params={'status': random.choice(STATUSES)}, name='task_filter')
+
+    @task(3)
+    def poll_all(self):
+        self.client.get('/api/tasks/', name='task_list')
+
+    @task(1)
+    def profile(self):
+        self.client.get('/api/accounts/profile/', name='profile')
+
+
+class CrudUser(ApiUser):
+    weight = WEIGHTS[1]
+
+    @task(3)
+    def burst(self):
+        response = self.client.post(
+            '/api/tasks/', json={'title': 'Load test task', 'priority': 'HIGH'}, name='task_create'
+        )
+        if response.status_code != 201:
+            return
+        url = f"/api/tasks/{response.json()['id']}/"
+        self.client.get(url, name='task_detail')
+        self.client.patch(url, json={'status': 'DOING'}, name='task_update')
+        self.client.patch(url, json={'status': 'DONE'}, name='task_update')
+        self.client.delete(url, name='task_delete')
+
+    @task(1)
+    def list_tasks(self):
+        self.client.get('/api/tasks/', name='task_list')
+
+
+class AdminUser(ApiUser):
+    weight = WEIGHTS[2]
+
+    def email(self):
+        return ADMIN_EMAIL
+
+    @task(10)
+    def overview(self):
+        self.client.get('/api/accounts/admin/overview/', name='admin_overview')
+
+    @task(1)
+    def notify(self):
+        if not NOTIFY:
+            return
+        self.client.post(
+            '/api/accounts/admin/notify/',
+            json={'recipients': [ADMIN_EMAIL], 'subject': 'Load test', 'message': 'Load test notification'},
+            name='admin_notify',
+        )
+
+
+@events.quitting.add_listener
+def write_summary(environment, **kwargs):
+    """Write the run's percentiles and throughput in the benchmark format."""
+    if isinstance(environment.runner, WorkerRunner):
+        # Distributed runs: only the master holds the aggregated stats
+        return
+    options = environment.parsed_options
+    report = summary.build(
+        environment.stats.entries.values(),
+        environment.stats.total,
+        {
+            'host': environment.host,
+            'users': getattr(options, 'num_users', None),
+            'spawn_rate': getattr(options, 'spawn_rate', None),
+            'run_time': getattr(options, 'run_time', None),
+            'think_time': [THINK_MIN, THINK_MAX],
+            'weights': WEIGHTS,
+        },
+    )
+    os.makedirs(os.path.dirname(SUMMARY_PATH) or '.', exist_ok=True)
+    save(SUMMARY_PATH, report)
@@ -0,0 +1,36 @@
+"""Turn Locust request statistics into a benchmark-format report.
+
+Does not import Locust (importing it monkey-patches the standard library
+with gevent), so reports can be built and compared in any process.
+"""
+
+from datetime import datetime, timezone
+
+
+def entry_summary(entry):
+    """Return the benchmark metrics for one Locust ``StatsEntry``."""
+    return {
+        'requests': entry.num_requests,
+        'errors': entry.num_failures,
+        'p50_ms': round(entry.get_response_time_percentile(0.50), 2),
+        'p95_ms': round(entry.get_response_time_percentile(0.95), 2),
+        'p99_ms': round(entry.get_response_time_percentile(0.99), 2),
+        'mean_ms': round(entry.avg_response_time, 2),
+        'throughput_rps': round(entry.total_rps, 2),
+    }
+
+
+def build(entries, total, meta):
+    """Return a report keyed by request name, plus ``total`` over all requests.
+
+    Requests are named after the scenario that issued them (``name=`` in
+    the locustfile), so names line up with the in-process benchmarks where
+    both measure the same endpoint.
+    """
+    scenarios = {entry.name: entry_summary(entry) for entry in entries if entry.num_requests}
+    if total.num_requests:
+        scenarios['total'] = entry_summary(total)
+    return {
+        'meta': {**meta, 'timestamp': datetime.now(timezone.utc).isoformat()},
+        'scenarios': scenarios,
+    }
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Task
+from .models import Task, TaskReminder
 
 
 @admin.register(Task)
@@ -7,3 +7,10 @@ class TaskAdmin(admin.ModelAdmin):
     list_display = ("title", "user", "status", "priority", "due_date", "created_at")
     list_filter = ("status", "priority")
     search_fields = ("title", "description")
+
+
+@admin.register(TaskReminder)
+class TaskReminderAdmin(admin.ModelAdmin):
+    list_display = ("task", "due_date", "sent_at")
+    list_select_related = ("task",)
+    raw_id_fields = ("task",)
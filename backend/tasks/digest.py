@@ -0,0 +1,171 @@
+"""Opt-in daily digest of each user's open, overdue and completed tasks.
+
+The beat task splits subscribers into primary-key ranges and fans the
+ranges out as Celery chunk tasks. A chunk computes its digests with a fixed
+number of set-based queries, whatever its size:
+
+* the subscribers in the range,
+* per-user task counts, one ``GROUP BY user_id`` with conditional
+  aggregates, and
+* each user's most urgent open tasks, ranked with a ``ROW_NUMBER()``
+  window per user.
+
+All three are streamed in user id order. Deliveries go through the
+delivery ledger under one job id per day, so a retried or redelivered
+chunk only emails the users it has not reached yet. Ledger rows of past
+days are purged after ``DIGEST_LEDGER_RETENTION_DAYS``.
+"""
+
+import logging
+from datetime import timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage
+from django.db.models import Count, F, Q, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from accounts import ratelimit
+from accounts.audiences import queryset_pk_ranges
+from accounts.ledger import DeliveryLedger
+from accounts.models import EmailDelivery
+from accounts.smtp_pool import open_mailer
+
+from .models import Task
+from .reminders import OPEN_STATUSES, batched
+
+logger = logging.getLogger(__name__)
+
+COMPLETED_WITHIN = timedelta(days=1)
+JOB_ID_PREFIX = 'digest:'
+
+
+def subscribers():
+    """Return active users who opted in to the daily digest."""
+    return get_user_model().objects.filter(is_active=True, daily_digest=True)
+
+
+def digest_ranges(size=None):
+    """Split subscribers into (after_pk, upto_pk) ranges; returns (ranges, total)."""
+    return queryset_pk_ranges(subscribers(), size or settings.DIGEST_CHUNK_SIZE)
+
+
+def job_id(day):
+    """Delivery ledger job id of the digest sent on ``day``."""
+    return f'{JOB_ID_PREFIX}{day.isoformat()}'
+
+
+def purge_ledger(today):
+    """Delete digest ledger rows older than the retention period; returns the count.
+
+    Digest job ids end in an ISO date, so older days sort before the cutoff
+    and the range is served by the ``job_id`` index.
+    """
+    cutoff = today - timedelta(days=settings.DIGEST_LEDGER_RETENTION_DAYS)
+    deleted, _ = EmailDelivery.objects.filter(
+        job_id__startswith=JOB_ID_PREFIX, job_id__lt=job_id(cutoff)
+    ).delete()
+    return deleted
+
+
+def collect(after_pk, upto_pk, today):
+    """Return digests of the subscribers in a pk range, in user id order.
+
+    Users with nothing open and nothing recently completed are left out.
+    Each digest is a dict with ``email``, ``username``, the ``open``,
+    ``overdue``, ``due_today`` and ``completed`` counts, and up to
+    ``DIGEST_HIGHLIGHTS`` open tasks due soonest in ``highlights``.
+    """
+    users = subscribers().filter(pk__gt=after_pk, pk__lte=upto_pk)
+    completed_since = timezone.now() - COMPLETED_WITHIN
+    is_open = Q(status__in=OPEN_STATUSES)
+
+    counts = (
+        Task.objects.filter(user__in=users)
+        .values('user_id')
+        .annotate(
+            open=Count('id', filter=is_open),
+            overdue=Count('id', filter=is_open & Q(due_date__lt=today)),
+            due_today=Count('id', filter=is_open & Q(due_date=today)),
+            completed=Count('id', filter=Q(status=Task.Status.DONE, updated_at__gte=completed_since)),
+        )
+        .order_by('user_id')
+    )
+    highlights = (
+        Task.objects.filter(is_open, user__in=users, due_date__isnull=False)
+        .annotate(rank=Window(
+            RowNumber(),
+            partition_by=[F('user_id')],
+            order_by=[F('due_date').asc(), F('id').asc()],
+        ))
+        .filter(rank__lte=settings.DIGEST_HIGHLIGHTS)
+        .order_by('user_id', 'rank')
+        .values('user_id', 'title', 'due_date', 'priority')
+    )
+
+    digests = {
+        row['user_id']: dict(row, highlights=[])
+        for row in counts.iterator(chunk_size=2000)
+        if row['open'] or row['completed']
+    }
+    for user_id, tasks in groupby(highlights.iterator(chunk_size=2000), key=lambda row: row['user_id']):
+        if user_id in digests:
+            digests[user_id]['highlights'] = list(tasks)
+
+    for pk, email, username in users.order_by('pk').values_list('pk', 'email', 'username').iterator(chunk_size=2000):
+        if pk in digests:
+            yield dict(digests[pk], email=email, username=username)
+
+
+def build_digest(digest, today):
+    """Return (subject, body) of one user's digest email."""
+    subject = f"Your tasks for {today:%A, %B} {today.day}: {digest['open']} open, {digest['overdue']} overdue"
+    lines = [
+        f"Hi {digest['username']},",
+        "",
+        f"Open tasks: {digest['open']}",
+        f"Overdue: {digest['overdue']}",
+        f"Due today: {digest['due_today']}",
+        f"Completed in the last day: {digest['completed']}",
+    ]
+    if digest['highlights']:
+        lines += ["", "Coming up first:"]
+        for task in digest['highlights']:
+            label = 'overdue' if task['due_date'] < today else f"due {task['due_date']:%Y-%m-%d}"
+            lines.append(f"- {task['title']} ({label}, {task['priority'].lower()} priority)")
+    return subject, "\n".join(lines)
+
+
+def send_digests(after_pk, upto_pk, today):
+    """Email the digests of one subscriber range.
+
+    Returns:
+        Tuple of (ledger, result dict with ``sent`` and ``failed`` counts)
+    """
+    digests = {digest['email']: digest for digest in collect(after_pk, upto_pk, today)}
+    ledger = DeliveryLedger(job_id(today), list(digests))
+    sent = 0
+    failed = 0
+
+    with open_mailer() as mailer:
+        for window in batched(ledger.due(), settings.EMAIL_PROGRESS_EVERY):
+            messages = []
+            for email in window:
+                ratelimit.acquire(max_sleep=float('inf'))
+                subject, body = build_digest(digests[email], today)
+                messages.append(EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [email]))
+
+            for email, error in zip(window, mailer.send_many(messages)):
+                if error is None:
+                    ledger.sent(email)
+                    sent += 1
+                else:
+                    failed += 1
+                    logger.error(f"Failed to send digest to {email}: {str(error)}")
+                    ledger.failed(email, error)
+    ledger.flush()
+
+    logger.info(f"Sent {sent} digests for user ids ({after_pk}, {upto_pk}], {failed} failed")
+    return ledger, {'sent': sent, 'failed': failed}
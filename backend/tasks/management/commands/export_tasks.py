@@ -0,0 +1,39 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks import transfer
+from tasks.models import Task
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Export tasks to a CSV or NDJSON file, streamed from the database with COPY."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help="Output file; standard output by default")
+        parser.add_argument('--format', choices=transfer.FORMATS, help="Defaults to the file extension, else csv")
+        parser.add_argument('--owner', help="Only tasks of the user with this email")
+        parser.add_argument('--status', choices=Task.Status.values, help="Only tasks with this status")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        owner = None
+        if options['owner']:
+            try:
+                owner = User.objects.get(email=options['owner'])
+            except User.DoesNotExist:
+                raise CommandError(f"No user with email {options['owner']}")
+
+        out = sys.stdout if path == '-' else open(path, 'w', newline='', encoding='utf-8')
+        try:
+            count = transfer.export_tasks(
+                out, options['format'] or transfer.format_for(path), user=owner, task_status=options['status'],
+            )
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        if out is not sys.stdout:
+            self.stdout.write(self.style.SUCCESS(f"Exported {count} tasks to {path}"))
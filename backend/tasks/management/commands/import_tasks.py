@@ -0,0 +1,59 @@
+import sys
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks import transfer
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Import tasks from a CSV or NDJSON file, validated in batches and "
+        "loaded with COPY. Nothing is imported if any row is invalid, "
+        "unless --skip-invalid is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, or - for standard input")
+        parser.add_argument('--format', choices=transfer.FORMATS, help="Defaults to the file extension, else csv")
+        parser.add_argument('--owner', help="Email of the user owning rows without an email column")
+        parser.add_argument('--skip-invalid', action='store_true', help="Import the valid rows anyway")
+        parser.add_argument('--dry-run', action='store_true', help="Only validate the file")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or transfer.format_for(path)
+        owner = None
+        if options['owner']:
+            try:
+                owner = User.objects.get(email=options['owner'])
+            except User.DoesNotExist:
+                raise CommandError(f"No user with email {options['owner']}")
+
+        started = time.monotonic()
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8-sig')
+        try:
+            result = transfer.import_tasks(
+                stream, fmt, owner=owner, skip_invalid=options['skip_invalid'], dry_run=options['dry_run'],
+            )
+        except UnicodeDecodeError:
+            raise CommandError("The file must be UTF-8 encoded")
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        for error in result['errors']:
+            details = '; '.join(f"{field}: {message}" for field, message in error['errors'].items())
+            self.stderr.write(f"Line {error['line']}: {details}")
+        summary = f"{result['valid']} valid, {result['invalid']} invalid rows"
+        if options['dry_run']:
+            self.stdout.write(f"Dry run: {summary}")
+        elif result['invalid'] and not options['skip_invalid']:
+            raise CommandError(f"Nothing imported: {summary}")
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Imported {result['imported']} tasks in {time.monotonic() - started:.1f}s ({summary})"
+            ))
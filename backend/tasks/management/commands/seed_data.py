@@ -0,0 +1,61 @@
+import time
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from tasks import seeding
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic users and tasks with skewed, reproducible "
+        "distributions, loaded with COPY on PostgreSQL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help="Users to create")
+        parser.add_argument('--tasks-per-user', type=int, default=100, help="Average tasks per user")
+        parser.add_argument(
+            '--tasks-per-user-dist', choices=sorted(seeding.DISTRIBUTIONS), default='pareto',
+            help="How tasks spread over users; pareto puts most tasks on a few users",
+        )
+        parser.add_argument('--seed', type=int, default=42, help="Random seed; same seed, same data")
+        parser.add_argument(
+            '--anchor', type=date.fromisoformat,
+            help="Date (YYYY-MM-DD) timestamps are generated relative to; defaults to today",
+        )
+        parser.add_argument('--prefix', default='seed_', help="Username prefix of the generated users")
+        parser.add_argument('--password', default='SeedPass123!', help="Password of every generated user")
+        parser.add_argument('--reset', action='store_true', help="Delete users with --prefix and their tasks first")
+
+    def handle(self, *args, **options):
+        if options['users'] < 1:
+            raise CommandError("--users must be at least 1")
+        if options['tasks_per_user'] < 0:
+            raise CommandError("--tasks-per-user must not be negative")
+
+        prefix = options['prefix']
+        if options['reset']:
+            seeding.clear(prefix)
+        elif User.objects.filter(username__startswith=prefix).exists():
+            raise CommandError(f"Users prefixed {prefix!r} already exist; pass --reset to replace them")
+
+        started = time.monotonic()
+        users, tasks = seeding.seed(
+            options['users'],
+            options['users'] * options['tasks_per_user'],
+            prefix,
+            options['password'],
+            seed=options['seed'],
+            distribution=options['tasks_per_user_dist'],
+            anchor=options['anchor'],
+            stdout=self.stdout,
+        )
+        method = 'COPY' if connection.vendor == 'postgresql' else 'bulk_create'
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {users} users and {tasks} tasks in {time.monotonic() - started:.1f}s with {method}"
+        ))
@@ -77,6 +77,9 @@ class Task(models.Model):
             # Composite index for user dashboard:
             # "Show my recent tasks by status"
             models.Index(fields=['user', '-created_at'], name='task_user_created_idx'),
+
+            # Incremental scans: "tasks changed since the last run"
+            models.Index(fields=['updated_at'], name='task_updated_idx'),
         ]
         verbose_name = "Task"
         verbose_name_plural = "Tasks"
@@ -104,3 +107,29 @@ class Task(models.Model):
     def priority_display(self):
         """Get human-readable priority."""
         return self.get_priority_display()
+
+
+class TaskReminder(models.Model):
+    """Record of a due-date reminder sent for a task.
+
+    Keyed by the due date it was sent for, so moving the deadline makes the
+    task eligible for a new reminder.
+    """
+
+    task = models.ForeignKey(
+        Task,
+        on_delete=models.CASCADE,
+        related_name="reminders",
+    )
+    due_date = models.DateField()
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'due_date'], name='reminder_task_due_uniq'),
+        ]
+        verbose_name = "Task reminder"
+        verbose_name_plural = "Task reminders"
+
+    def __str__(self):
+        return f"Reminder for task {self.task_id} due {self.due_date}"
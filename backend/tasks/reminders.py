@@ -0,0 +1,168 @@
+"""Due-date reminders, found by an incremental scan of ``tasks_task``.
+
+Each run only looks at tasks that could have become due for a reminder
+since the previous run:
+
+* tasks whose due date has just entered the reminder window (due dates
+  past the last scanned one), and
+* tasks changed since the last scan (``updated_at``) that are due within
+  the window, e.g. newly created or rescheduled ones.
+
+The high-water marks for both live in a Redis hash. If they are lost, the
+next run scans the whole window once. ``TaskReminder`` rows keep a task
+from being reminded twice for the same due date. Reminders are grouped
+into one email per user.
+
+A reminder the server rejects for good (5xx, malformed address) is
+recorded like a sent one so it is not tried again. After temporary
+failures the marks are kept so the next run retries, for up to
+``TASK_REMINDER_MAX_RETRIES`` runs in a row before the scan moves on.
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+from itertools import groupby, islice
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from accounts import ratelimit
+from accounts.mail import is_permanent_failure
+from accounts.smtp_pool import open_mailer
+from config.redis_client import get_redis
+
+from .models import Task, TaskReminder
+
+logger = logging.getLogger(__name__)
+
+STATE_KEY = 'reminders:scan'
+# Changes committed while the previous scan ran may carry an earlier
+# updated_at; rescanning a little is harmless since reminders are deduplicated
+SCAN_OVERLAP = timedelta(minutes=1)
+OPEN_STATUSES = [Task.Status.TODO, Task.Status.DOING]
+
+
+def batched(iterable, size):
+    """Yield lists of up to ``size`` items."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def load_state():
+    """Return (due_upto, updated_since, retries) of the last scan.
+
+    The marks are None if there was no scan yet; ``retries`` counts the
+    runs in a row that kept them because of temporary failures.
+    """
+    try:
+        raw = get_redis().hgetall(STATE_KEY)
+    except Exception as e:
+        logger.warning(f"Reminder scan state unavailable, scanning the full window: {str(e)}")
+        return None, None, 0
+    data = {k.decode(): v.decode() for k, v in raw.items()}
+    retries = int(data.get('retries', 0))
+    if 'due_upto' not in data:
+        return None, None, retries
+    return date.fromisoformat(data['due_upto']), datetime.fromisoformat(data['updated_since']), retries
+
+
+def save_state(due_upto, updated_since, retries=0):
+    mapping = {'retries': retries}
+    if due_upto is not None:
+        mapping.update(due_upto=due_upto.isoformat(), updated_since=updated_since.isoformat())
+    try:
+        get_redis().hset(STATE_KEY, mapping=mapping)
+    except Exception as e:
+        logger.warning(f"Could not save reminder scan state: {str(e)}")
+
+
+def due_tasks(today, upto, due_upto=None, updated_since=None):
+    """Return open, not yet reminded tasks due between ``today`` and ``upto``.
+
+    Uses range and IN predicates only, so the due_date and updated_at
+    indexes apply. Without high-water marks the whole window is returned.
+    """
+    tasks = Task.objects.filter(
+        status__in=OPEN_STATUSES,
+        due_date__gte=today,
+        due_date__lte=upto,
+        user__isnull=False,
+        user__is_active=True,
+    )
+    if due_upto is not None and updated_since is not None:
+        tasks = tasks.filter(Q(due_date__gt=due_upto) | Q(updated_at__gt=updated_since - SCAN_OVERLAP))
+
+    reminded = TaskReminder.objects.filter(task=OuterRef('pk'), due_date=OuterRef('due_date'))
+    return tasks.filter(~Exists(reminded))
+
+
+def build_reminder(tasks):
+    """Return (subject, body) of the reminder email for one user's tasks."""
+    count = len(tasks)
+    subject = f"Reminder: {count} task{'s' if count != 1 else ''} due soon"
+    lines = ["These tasks are due soon:", ""]
+    for task in tasks:
+        lines.append(f"- {task['title']} (due {task['due_date']:%Y-%m-%d}, {task['priority'].lower()} priority)")
+    return subject, "\n".join(lines)
+
+
+def send_due_reminders(hours=None):
+    """Email every user with tasks due in the next ``hours`` hours.
+
+    Returns:
+        Dict with the number of ``users`` emailed, ``tasks`` reminded about
+        and ``failed`` users
+    """
+    hours = hours or settings.TASK_REMINDER_HOURS
+    scan_started = timezone.now()
+    now = timezone.localtime(scan_started)
+    today = now.date()
+    upto = (now + timedelta(hours=hours)).date()
+    due_upto, updated_since, retries = load_state()
+
+    rows = due_tasks(today, upto, due_upto, updated_since).order_by('user_id', 'due_date', 'id').values(
+        'id', 'title', 'due_date', 'priority', 'user_id', 'user__email'
+    )
+
+    users = 0
+    reminded = 0
+    failed = 0
+    temporary = 0
+    by_user = (list(group) for _, group in groupby(rows.iterator(chunk_size=2000), key=lambda row: row['user_id']))
+    with open_mailer() as mailer:
+        for window in batched(by_user, settings.EMAIL_PROGRESS_EVERY):
+            messages = []
+            for tasks in window:
+                ratelimit.acquire(max_sleep=float('inf'))
+                subject, body = build_reminder(tasks)
+                messages.append(EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [tasks[0]['user__email']]))
+
+            done = []
+            for tasks, error in zip(window, mailer.send_many(messages)):
+                if error is None:
+                    users += 1
+                    reminded += len(tasks)
+                else:
+                    failed += 1
+                    logger.error(f"Failed to send reminder to {tasks[0]['user__email']}: {str(error)}")
+                    if not is_permanent_failure(error):
+                        temporary += 1
+                        continue
+                # Undeliverable reminders are recorded too, so they are not retried
+                done.extend(TaskReminder(task_id=task['id'], due_date=task['due_date']) for task in tasks)
+            TaskReminder.objects.bulk_create(done, ignore_conflicts=True)
+
+    if temporary and retries < settings.TASK_REMINDER_MAX_RETRIES:
+        # Keep the old marks so the next run picks the failed users up again
+        logger.warning(f"{temporary} reminder emails failed temporarily; they will be retried on the next run")
+        save_state(due_upto, updated_since, retries + 1)
+    else:
+        if temporary:
+            logger.warning(f"Giving up on {temporary} reminder emails after {retries} retried runs")
+        save_state(upto, scan_started)
+
+    logger.info(f"Sent {users} reminder emails covering {reminded} tasks")
+    return {'users': users, 'tasks': reminded, 'failed': failed}
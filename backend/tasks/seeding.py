@@ -0,0 +1,128 @@
+"""Synthetic users and tasks for benchmarking and index tuning.
+
+Rows are produced by generators and loaded with ``COPY`` (see
+``config.pgcopy``), so millions of tasks load in seconds on PostgreSQL.
+Distributions are skewed like production data: a few users own most
+tasks, most tasks are open, descriptions range from empty to long, and
+creation times, updates and due dates spread over the past year.
+
+Everything is drawn from one ``random.Random(seed)`` relative to an
+``anchor`` date, so the same seed and anchor always produce the same rows.
+"""
+
+import random
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from config.pgcopy import copy_from
+
+from .models import Task
+
+User = get_user_model()
+
+WORDS = ['report', 'review', 'deploy', 'invoice', 'meeting', 'design', 'bug', 'release', 'budget', 'hiring']
+STATUSES = [(Task.Status.TODO, 0.45), (Task.Status.DOING, 0.2), (Task.Status.DONE, 0.35)]
+PRIORITIES = [(Task.Priority.LOW, 0.3), (Task.Priority.MEDIUM, 0.5), (Task.Priority.HIGH, 0.2)]
+HISTORY_DAYS = 365
+MAX_DESCRIPTION_WORDS = 2000
+
+# Relative weight of each user's share of the tasks
+DISTRIBUTIONS = {
+    'pareto': lambda rng: rng.paretovariate(1.2),
+    'lognormal': lambda rng: rng.lognormvariate(0, 1),
+    'exponential': lambda rng: rng.expovariate(1),
+    'uniform': lambda rng: 1.0,
+}
+
+USER_COLUMNS = (
+    'username', 'email', 'password', 'is_staff', 'is_superuser', 'is_active', 'is_verified',
+    'daily_digest', 'created_date', 'updated_date',
+)
+TASK_COLUMNS = ('user_id', 'title', 'description', 'status', 'priority', 'due_date', 'created_at', 'updated_at')
+
+
+def tasks_per_user(users, tasks, rng, distribution='pareto'):
+    """Split ``tasks`` over ``users`` with weights drawn from ``distribution``."""
+    draw = DISTRIBUTIONS[distribution]
+    weights = [draw(rng) for _ in range(users)]
+    total = sum(weights)
+    counts = [int(tasks * weight / total) for weight in weights]
+    for i in range(tasks - sum(counts)):
+        counts[i % users] += 1
+    return counts
+
+
+def anchor_time(anchor):
+    """Midnight of ``anchor`` (a date), the "now" generated rows are relative to."""
+    return timezone.make_aware(datetime.combine(anchor, time.min))
+
+
+def user_rows(prefix, count, password, rng, now):
+    for i in range(count):
+        joined = now - timedelta(seconds=rng.randint(0, HISTORY_DAYS * 86400))
+        yield (
+            f'{prefix}{i}', f'{prefix}{i}@example.com', password,
+            False, False, rng.random() < 0.97, rng.random() < 0.8, rng.random() < 0.2,
+            joined, joined,
+        )
+
+
+def description(rng):
+    """Mostly short descriptions, a fifth empty, a long tail of long ones."""
+    if rng.random() < 0.2:
+        return ''
+    words = min(int(rng.lognormvariate(2.5, 1.2)), MAX_DESCRIPTION_WORDS)
+    return ' '.join(rng.choices(WORDS, k=words))
+
+
+def task_row(user_id, rng, now):
+    status = rng.choices([s for s, _ in STATUSES], [w for _, w in STATUSES])[0]
+    priority = rng.choices([p for p, _ in PRIORITIES], [w for _, w in PRIORITIES])[0]
+    age = rng.randint(0, HISTORY_DAYS * 86400)
+    created = now - timedelta(seconds=age)
+    updated = created + timedelta(seconds=rng.randint(0, age))
+    due = created.date() + timedelta(days=rng.randint(-5, 60)) if rng.random() < 0.7 else None
+    title = ' '.join(rng.sample(WORDS, rng.randint(2, 5))).capitalize()
+    return (user_id, title, description(rng), status, priority, due, created, updated)
+
+
+def task_rows(user_ids, counts, rng, now):
+    for user_id, count in zip(user_ids, counts):
+        for _ in range(count):
+            yield task_row(user_id, rng, now)
+
+
+def progress(rows, stdout, label, every=100000):
+    for i, row in enumerate(rows, 1):
+        yield row
+        if stdout and i % every == 0:
+            stdout.write(f"{label}: {i}\n")
+
+
+def seed(users, tasks, prefix, password, seed=42, distribution='pareto', anchor=None, stdout=None):
+    """Create ``users`` users named ``{prefix}{i}`` and ``tasks`` tasks spread over them.
+
+    Returns:
+        Tuple of (users, tasks) created
+    """
+    rng = random.Random(seed)
+    now = anchor_time(anchor or timezone.localdate())
+    with transaction.atomic():
+        created_users = copy_from(User, USER_COLUMNS, user_rows(prefix, users, make_password(password), rng, now))
+        user_ids = list(
+            User.objects.filter(username__startswith=prefix, is_staff=False)
+            .order_by('pk').values_list('pk', flat=True)
+        )
+        rows = task_rows(user_ids, tasks_per_user(len(user_ids), tasks, rng, distribution), rng, now)
+        created_tasks = copy_from(Task, TASK_COLUMNS, progress(rows, stdout, 'Tasks'))
+    return created_users, created_tasks
+
+
+def clear(prefix):
+    """Delete users named with ``prefix`` and their tasks."""
+    Task.objects.filter(user__username__startswith=prefix).delete()
+    User.objects.filter(username__startswith=prefix).delete()
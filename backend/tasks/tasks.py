@@ -0,0 +1,69 @@
+from datetime import date
+
+from celery import group, shared_task
+from django.conf import settings
+from django.utils import timezone
+import logging
+
+from accounts.tasks import reschedule, retry_after_error
+
+from .digest import digest_ranges, purge_ledger, send_digests
+from .reminders import send_due_reminders
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(ignore_result=True)
+def send_due_reminders_task():
+    """
+    Periodic task emailing users about their tasks that are due soon.
+
+    Scans incrementally from the previous run (see ``tasks.reminders``),
+    so running it every few minutes stays cheap.
+    """
+    return send_due_reminders()
+
+
+@shared_task
+def send_daily_digests_task():
+    """
+    Periodic task fanning the daily digest out over subscriber chunks.
+
+    Only streams subscriber ids here; every chunk task computes its own
+    digests with a few grouped queries (see ``tasks.digest``). Also purges
+    ledger rows of digests past their retention.
+    """
+    today = timezone.localdate()
+    purged = purge_ledger(today)
+    if purged:
+        logger.info(f"Purged {purged} expired digest deliveries")
+    ranges, total = digest_ranges()
+    if ranges:
+        group(send_digest_chunk_task.s(after, upto, today.isoformat()) for after, upto in ranges).apply_async()
+    logger.info(f"Queued daily digests for {total} subscribers in {len(ranges)} chunks")
+    return {'subscribers': total, 'chunks': len(ranges)}
+
+
+@shared_task(bind=True, max_retries=3)
+def send_digest_chunk_task(self, after_pk, upto_pk, day, reschedules=0):
+    """
+    Send the daily digest to subscribers with ``after_pk < id <= upto_pk``.
+
+    Recipients that failed temporarily are retried once their ledger
+    backoff has passed; delivered ones are skipped on every rerun. Waiting
+    for backoff does not use up the task's error retries; recipients still
+    waiting after ``EMAIL_MAX_RESCHEDULES`` reschedules are abandoned.
+    """
+    try:
+        ledger, result = send_digests(after_pk, upto_pk, date.fromisoformat(day))
+    except Exception as exc:
+        logger.error(f"Digest chunk ({after_pk}, {upto_pk}] failed: {str(exc)}")
+        raise retry_after_error(self, exc, reschedules, countdown=60)
+
+    retry_in = ledger.next_retry_in()
+    if retry_in is not None:
+        if reschedules < settings.EMAIL_MAX_RESCHEDULES:
+            raise reschedule(self, retry_in, reschedules)
+        logger.error(f"Digest chunk ({after_pk}, {upto_pk}] gave up after {reschedules} reschedules")
+        ledger.abandon(f'Undelivered after {reschedules} reschedules')
+    return result
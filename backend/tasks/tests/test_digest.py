@@ -0,0 +1,182 @@
+"""Tests for the opt-in daily digest."""
+
+import uuid
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import EmailDelivery
+from accounts.tests.test_ledger import FlakyMailer
+from tasks.digest import collect, job_id, send_digests
+from tasks.models import Task
+from tasks.tasks import send_daily_digests_task
+
+User = get_user_model()
+
+
+class DailyDigestTests(TestCase):
+    """Test suite for computing and sending daily digests."""
+
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.alice = self.make_user('alice')
+        self.bob = self.make_user('bob')
+
+    def make_user(self, name, daily_digest=True):
+        uid = uuid.uuid4().hex[:8]
+        return User.objects.create_user(
+            email=f'{name}_{uid}@example.com',
+            username=f'{name}_{uid}',
+            password='DigestPass123!',
+            daily_digest=daily_digest
+        )
+
+    def test_digest_counts(self):
+        """Test that open, overdue, due-today and completed tasks are counted."""
+        Task.objects.create(user=self.alice, title='Late', due_date=self.today - timedelta(days=2))
+        Task.objects.create(user=self.alice, title='Today', status='DOING', due_date=self.today)
+        Task.objects.create(user=self.alice, title='Someday')
+        Task.objects.create(user=self.alice, title='Shipped', status='DONE')
+
+        digest = next(collect(0, self.bob.pk, self.today))
+
+        self.assertEqual(digest['email'], self.alice.email)
+        self.assertEqual(
+            [digest[key] for key in ('open', 'overdue', 'due_today', 'completed')],
+            [3, 1, 1, 1]
+        )
+        self.assertEqual([task['title'] for task in digest['highlights']], ['Late', 'Today'])
+
+    def test_highlights_are_limited_per_user(self):
+        """Test that only the soonest due open tasks are highlighted."""
+        for days in range(8, 0, -1):
+            Task.objects.create(user=self.alice, title=f'In {days}', due_date=self.today + timedelta(days=days))
+        Task.objects.create(user=self.bob, title='Bob', due_date=self.today)
+
+        digests = list(collect(0, self.bob.pk, self.today))
+
+        self.assertEqual(
+            [task['title'] for task in digests[0]['highlights']],
+            ['In 1', 'In 2', 'In 3', 'In 4', 'In 5']
+        )
+        self.assertEqual([task['title'] for task in digests[1]['highlights']], ['Bob'])
+
+    def test_query_count_does_not_grow_with_users(self):
+        """Test that a chunk is computed with a fixed number of queries."""
+        users = [self.make_user(f'user{i}') for i in range(10)]
+        for user in users:
+            Task.objects.create(user=user, title='Open', due_date=self.today)
+
+        with CaptureQueriesContext(connection) as queries:
+            digests = list(collect(0, users[-1].pk, self.today))
+
+        self.assertEqual(len(digests), 10)
+        self.assertEqual(len(queries), 3)
+
+    def test_only_subscribers_with_news(self):
+        """Test that opted-out, inactive and idle users get no digest."""
+        carol = self.make_user('carol', daily_digest=False)
+        dave = self.make_user('dave')
+        dave.is_active = False
+        dave.save()
+        for user in (self.alice, carol, dave):
+            Task.objects.create(user=user, title='Open')
+        Task.objects.create(user=self.bob, title='Old', status='DONE')
+        Task.objects.filter(user=self.bob).update(updated_at=timezone.now() - timedelta(days=3))
+
+        send_digests(0, dave.pk, self.today)
+
+        self.assertEqual([m.to for m in mail.outbox], [[self.alice.email]])
+        self.assertIn('1 open', mail.outbox[0].subject)
+
+    def test_rerun_does_not_resend(self):
+        """Test that a chunk run twice on the same day emails each user once."""
+        Task.objects.create(user=self.alice, title='Open')
+
+        send_digests(0, self.bob.pk, self.today)
+        _, result = send_digests(0, self.bob.pk, self.today)
+
+        self.assertEqual(result, {'sent': 0, 'failed': 0})
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertTrue(EmailDelivery.objects.filter(job_id=job_id(self.today), recipient=self.alice.email).exists())
+
+    def test_chunk_task_retries_failed_recipients(self):
+        """Test that a temporary failure is retried by the chunk task."""
+        Task.objects.create(user=self.alice, title='Open')
+        Task.objects.create(user=self.bob, title='Open')
+        conf = send_daily_digests_task.app.conf
+        conf.CELERY_TASK_EAGER_PROPAGATES = False
+        self.addCleanup(setattr, conf, 'CELERY_TASK_EAGER_PROPAGATES', True)
+
+        mailer = FlakyMailer(failures={self.bob.email: 1})
+        with patch('accounts.mail.BatchMailer.send', side_effect=mailer):
+            send_daily_digests_task.delay()
+
+        self.assertEqual(mailer.calls, {self.alice.email: 1, self.bob.email: 2})
+        self.assertEqual(
+            set(EmailDelivery.objects.filter(job_id=job_id(self.today)).values_list('status', flat=True)),
+            {EmailDelivery.Status.SENT}
+        )
+
+    @override_settings(EMAIL_MAX_ATTEMPTS=6)
+    def test_chunk_task_reschedules_beyond_max_retries(self):
+        """Test that waiting on backoff more than max_retries times still finishes the chunk."""
+        Task.objects.create(user=self.alice, title='Open')
+        Task.objects.create(user=self.bob, title='Open')
+        conf = send_daily_digests_task.app.conf
+        conf.CELERY_TASK_EAGER_PROPAGATES = False
+        self.addCleanup(setattr, conf, 'CELERY_TASK_EAGER_PROPAGATES', True)
+
+        mailer = FlakyMailer(failures={self.alice.email: 4, self.bob.email: 10})
+        with patch('accounts.mail.BatchMailer.send', side_effect=mailer):
+            send_daily_digests_task.delay()
+
+        self.assertEqual(mailer.calls, {self.alice.email: 5, self.bob.email: 6})
+        self.assertEqual(
+            dict(EmailDelivery.objects.filter(job_id=job_id(self.today)).values_list('recipient', 'status')),
+            {self.alice.email: EmailDelivery.Status.SENT, self.bob.email: EmailDelivery.Status.FAILED}
+        )
+
+    def test_beat_task_purges_old_ledger_rows(self):
+        """Test that digest deliveries past their retention are deleted."""
+        for days in (0, 7, 8, 30):
+            EmailDelivery.objects.create(job_id=job_id(self.today - timedelta(days=days)), recipient='a@example.com')
+        EmailDelivery.objects.create(job_id='notify-job', recipient='a@example.com')
+
+        with self.settings(DIGEST_LEDGER_RETENTION_DAYS=7):
+            send_daily_digests_task.delay()
+
+        self.assertEqual(
+            sorted(EmailDelivery.objects.values_list('job_id', flat=True)),
+            sorted([job_id(self.today), job_id(self.today - timedelta(days=7)), 'notify-job'])
+        )
+
+    def test_fan_out_in_chunks(self):
+        """Test that the beat task splits subscribers into chunk tasks."""
+        for i in range(3):
+            Task.objects.create(user=self.make_user(f'user{i}'), title='Open')
+
+        with self.settings(DIGEST_CHUNK_SIZE=2):
+            result = send_daily_digests_task.delay().get()
+
+        self.assertEqual(result, {'subscribers': 5, 'chunks': 3})
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_opt_in_through_profile(self):
+        """Test that users can turn the digest on from their profile."""
+        user = self.make_user('erin', daily_digest=False)
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        response = client.patch('/api/accounts/profile/', {'daily_digest': True}, format='json')
+
+        self.assertTrue(response.data['daily_digest'])
+        user.refresh_from_db()
+        self.assertTrue(user.daily_digest)
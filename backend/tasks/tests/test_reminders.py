@@ -0,0 +1,159 @@
+"""Tests for due-date reminders."""
+
+import smtplib
+import uuid
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from tasks.models import Task, TaskReminder
+from tasks.reminders import load_state, save_state, send_due_reminders
+from tasks.tasks import send_due_reminders_task
+
+User = get_user_model()
+
+
+class DueRemindersTests(TestCase):
+    """Test suite for the incremental due-date reminder scan."""
+
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.tomorrow = self.today + timedelta(days=1)
+        self.alice = self.make_user('alice')
+        self.bob = self.make_user('bob')
+
+    def make_user(self, name):
+        uid = uuid.uuid4().hex[:8]
+        return User.objects.create_user(
+            email=f'{name}_{uid}@example.com',
+            username=f'{name}_{uid}',
+            password='ReminderPass123!'
+        )
+
+    def test_reminders_grouped_per_user(self):
+        """Test that each user gets one email listing their due tasks."""
+        Task.objects.create(user=self.alice, title='Report', due_date=self.tomorrow)
+        Task.objects.create(user=self.alice, title='Review', status='DOING', due_date=self.today)
+        Task.objects.create(user=self.bob, title='Deploy', due_date=self.tomorrow)
+
+        result = send_due_reminders(hours=24)
+
+        self.assertEqual(result, {'users': 2, 'tasks': 3, 'failed': 0})
+        self.assertEqual(len(mail.outbox), 2)
+        alice_mail = next(m for m in mail.outbox if m.to == [self.alice.email])
+        self.assertIn('2 tasks due soon', alice_mail.subject)
+        self.assertIn('Report', alice_mail.body)
+        self.assertIn('Review', alice_mail.body)
+
+    def test_only_open_tasks_in_window(self):
+        """Test that done, overdue, far-off and ownerless tasks are skipped."""
+        Task.objects.create(user=self.alice, title='Done', status='DONE', due_date=self.tomorrow)
+        Task.objects.create(user=self.alice, title='Overdue', due_date=self.today - timedelta(days=1))
+        Task.objects.create(user=self.alice, title='Later', due_date=self.today + timedelta(days=10))
+        Task.objects.create(title='Nobody', due_date=self.tomorrow)
+        self.bob.is_active = False
+        self.bob.save()
+        Task.objects.create(user=self.bob, title='Inactive', due_date=self.tomorrow)
+
+        result = send_due_reminders(hours=24)
+
+        self.assertEqual(result['tasks'], 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_same_task_not_reminded_twice(self):
+        """Test that a second run does not resend reminders."""
+        Task.objects.create(user=self.alice, title='Report', due_date=self.tomorrow)
+        send_due_reminders(hours=24)
+        mail.outbox.clear()
+
+        result = send_due_reminders(hours=24)
+
+        self.assertEqual(result['tasks'], 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_new_and_rescheduled_tasks_picked_up(self):
+        """Test that tasks created or moved after a scan are reminded next run."""
+        task = Task.objects.create(user=self.alice, title='Report', due_date=self.tomorrow)
+        send_due_reminders(hours=24)
+
+        Task.objects.create(user=self.bob, title='New', due_date=self.tomorrow)
+        task.due_date = self.today
+        task.save()
+        result = send_due_reminders(hours=24)
+
+        self.assertEqual(result, {'users': 2, 'tasks': 2, 'failed': 0})
+        self.assertEqual(TaskReminder.objects.filter(task=task).count(), 2)
+
+    def test_scan_is_incremental(self):
+        """Test that unchanged tasks behind the high-water marks are not rescanned."""
+        Task.objects.create(user=self.alice, title='Report', due_date=self.tomorrow)
+        # As if a previous run had already covered this due date and change
+        save_state(self.tomorrow, timezone.now() + timedelta(minutes=5))
+
+        result = send_due_reminders(hours=24)
+
+        self.assertEqual(result['tasks'], 0)
+
+    def test_due_date_entering_window_is_picked_up(self):
+        """Test that a due date past the last scanned one is reminded."""
+        Task.objects.create(user=self.alice, title='Report', due_date=self.tomorrow)
+        save_state(self.today, timezone.now() + timedelta(minutes=5))
+
+        result = send_due_reminders(hours=24)
+
+        self.assertEqual(result['tasks'], 1)
+
+    def test_failed_send_retried_next_run(self):
+        """Test that a failed email is not recorded and is sent next time."""
+        Task.objects.create(user=self.alice, title='Report', due_date=self.tomorrow)
+        with patch('accounts.mail.BatchMailer.send', side_effect=ConnectionError('down')):
+            failed = send_due_reminders(hours=24)
+
+        retried = send_due_reminders(hours=24)
+
+        self.assertEqual(failed, {'users': 0, 'tasks': 0, 'failed': 1})
+        self.assertEqual(retried['tasks'], 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_permanent_failure_advances_scan(self):
+        """Test that an undeliverable reminder is not retried and does not pin the marks."""
+        Task.objects.create(user=self.alice, title='Report', due_date=self.tomorrow)
+        refused = smtplib.SMTPRecipientsRefused({self.alice.email: (550, b'No such user')})
+        with patch('accounts.mail.BatchMailer.send', side_effect=refused):
+            failed = send_due_reminders(hours=24)
+
+        retried = send_due_reminders(hours=24)
+
+        self.assertEqual(failed, {'users': 0, 'tasks': 0, 'failed': 1})
+        self.assertEqual(retried['tasks'], 0)
+        self.assertTrue(TaskReminder.objects.filter(task__user=self.alice).exists())
+        self.assertEqual(load_state()[2], 0)
+
+    @override_settings(TASK_REMINDER_MAX_RETRIES=2)
+    def test_temporary_failures_retried_a_limited_number_of_runs(self):
+        """Test that the scan moves on after temporary failures in too many runs."""
+        Task.objects.create(user=self.alice, title='Report', due_date=self.tomorrow)
+        # Old enough to fall outside the scan overlap once the marks advance
+        Task.objects.update(updated_at=timezone.now() - timedelta(minutes=10))
+        with patch('accounts.mail.BatchMailer.send', side_effect=ConnectionError('down')) as send:
+            for _ in range(3):
+                send_due_reminders(hours=24)
+
+        after = send_due_reminders(hours=24)
+
+        self.assertEqual(send.call_count, 3)
+        self.assertEqual(after['tasks'], 0)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(load_state()[2], 0)
+
+    def test_celery_task(self):
+        """Test that the beat task runs the scan."""
+        Task.objects.create(user=self.alice, title='Report', due_date=self.tomorrow)
+
+        send_due_reminders_task.delay()
+
+        self.assertEqual(len(mail.outbox), 1)
@@ -0,0 +1,90 @@
+"""Tests for the synthetic data generator and seed_data command."""
+
+import io
+import random
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from tasks import seeding
+from tasks.models import Task
+
+User = get_user_model()
+
+ANCHOR = date(2024, 6, 1)
+
+
+def snapshot(prefix):
+    """Generated tasks keyed by owner username, without database ids."""
+    return sorted(
+        Task.objects.filter(user__username__startswith=prefix).values_list(
+            'user__username', 'title', 'description', 'status', 'priority', 'due_date',
+        )
+    )
+
+
+class SeedDataCommandTests(TestCase):
+    """Test suite for the seed_data management command."""
+
+    def seed(self, *args):
+        out = io.StringIO()
+        call_command(
+            'seed_data', '--users', '20', '--tasks-per-user', '10', '--anchor', ANCHOR.isoformat(),
+            *args, stdout=out,
+        )
+        return out.getvalue()
+
+    def test_seeds_requested_sizes(self):
+        """Test that the command creates users and users * tasks-per-user tasks."""
+        output = self.seed()
+
+        self.assertIn('Seeded 20 users and 200 tasks', output)
+        users = User.objects.filter(username__startswith='seed_')
+        self.assertEqual(users.count(), 20)
+        self.assertTrue(users.get(username='seed_0').check_password('SeedPass123!'))
+        self.assertEqual(Task.objects.filter(user__in=users).count(), 200)
+        self.assertEqual(
+            set(Task.objects.values_list('status', flat=True)),
+            {Task.Status.TODO, Task.Status.DOING, Task.Status.DONE}
+        )
+
+    def test_same_seed_reproduces_data(self):
+        """Test that the same seed and anchor generate identical rows."""
+        self.seed('--seed', '7')
+        first = snapshot('seed_')
+
+        self.seed('--seed', '7', '--reset')
+        self.assertEqual(snapshot('seed_'), first)
+
+        self.seed('--seed', '8', '--reset')
+        self.assertNotEqual(snapshot('seed_'), first)
+
+    def test_existing_prefix_requires_reset(self):
+        """Test that seeding twice with one prefix is refused without --reset."""
+        self.seed()
+
+        with self.assertRaises(CommandError):
+            self.seed()
+        self.seed('--prefix', 'other_')
+        self.assertEqual(User.objects.filter(username__startswith='other_').count(), 20)
+
+    def test_rejects_invalid_sizes(self):
+        """Test that no users or a negative task count is refused before seeding."""
+        with self.assertRaises(CommandError):
+            self.seed('--users', '0')
+        with self.assertRaises(CommandError):
+            self.seed('--tasks-per-user', '-1')
+        self.assertFalse(User.objects.filter(username__startswith='seed_').exists())
+
+        self.seed('--tasks-per-user', '0')
+        self.assertEqual(User.objects.filter(username__startswith='seed_').count(), 20)
+
+    def test_distributions_skew_tasks(self):
+        """Test that pareto concentrates tasks on few users and uniform does not."""
+        pareto = sorted(seeding.tasks_per_user(100, 10000, random.Random(1)), reverse=True)
+        uniform = seeding.tasks_per_user(100, 10000, random.Random(1), 'uniform')
+
+        self.assertGreater(sum(pareto[:10]), 2500)
+        self.assertEqual(set(uniform), {100})
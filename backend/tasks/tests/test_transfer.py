@@ -0,0 +1,325 @@
+"""Tests for bulk task import and export."""
+
+import io
+import json
+import os
+import tempfile
+import uuid
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from tasks import transfer
+from tasks.models import Task
+
+User = get_user_model()
+
+TRICKY = 'Tab\there, "quotes", comma, back\\slash\nnew line, ünïcode'
+
+
+def make_user(prefix, **extra):
+    uid = uuid.uuid4().hex[:8]
+    return User.objects.create_user(
+        email=f'{prefix}_{uid}@example.com',
+        username=f'{prefix}_{uid}',
+        password='TransferPass123!',
+        **extra
+    )
+
+
+class TaskImportTests(TestCase):
+    """Test suite for importing tasks."""
+
+    def setUp(self):
+        self.alice = make_user('alice')
+        self.bob = make_user('bob')
+
+    def csv(self, *lines):
+        return io.StringIO('email,title,description,status,priority,due_date\n' + '\n'.join(lines) + '\n')
+
+    def test_import_csv_resolves_owners(self):
+        """Test that CSV rows are loaded for the users named by email."""
+        result = transfer.import_tasks(self.csv(
+            f'{self.alice.email},Write report,,DOING,HIGH,2024-06-01',
+            f'{self.alice.email},Review,"Two\nlines",,,',
+            f'{self.bob.email},Deploy,,done,low,',
+        ), 'csv')
+
+        self.assertEqual(result, {'valid': 3, 'invalid': 0, 'imported': 3, 'errors': []})
+        self.assertEqual(Task.objects.filter(user=self.alice).count(), 2)
+        review = Task.objects.get(title='Review')
+        self.assertEqual(review.description, 'Two\nlines')
+        self.assertEqual((review.status, review.priority), ('TODO', 'MEDIUM'))
+        self.assertEqual(Task.objects.get(title='Deploy').status, 'DONE')
+
+    def test_import_ndjson_with_owner(self):
+        """Test that NDJSON rows without an email belong to the given owner."""
+        stream = io.StringIO(
+            json.dumps({'title': 'First', 'description': TRICKY}) + '\n\n'
+            + json.dumps({'title': 'Second', 'created_at': '2024-01-02T03:04:05Z'}) + '\n'
+        )
+
+        result = transfer.import_tasks(stream, 'ndjson', owner=self.bob)
+
+        self.assertEqual(result['imported'], 2)
+        self.assertEqual(Task.objects.get(title='First', user=self.bob).description, TRICKY)
+
+    def test_invalid_rows_abort_import(self):
+        """Test that any invalid row rolls back the import and every error is reported."""
+        result = transfer.import_tasks(self.csv(
+            f'{self.alice.email},Fine,,,,',
+            'nobody@example.com,Orphan,,,,',
+            f'{self.alice.email},,,URGENT,,not-a-date',
+            f'{self.alice.email},{"x" * 201},,,,',
+        ), 'csv', batch_size=2)
+
+        self.assertEqual((result['valid'], result['invalid'], result['imported']), (1, 3, 0))
+        self.assertEqual([error['line'] for error in result['errors']], [3, 4, 5])
+        self.assertEqual(set(result['errors'][1]['errors']), {'title', 'status', 'due_date'})
+        self.assertIn('email', result['errors'][0]['errors'])
+        self.assertFalse(Task.objects.exists())
+
+    def test_skip_invalid_and_dry_run(self):
+        """Test that skip_invalid keeps valid rows and dry_run keeps nothing."""
+        lines = (f'{self.alice.email},Fine,,,,', f'{self.alice.email},Bad,,WRONG,,')
+
+        dry = transfer.import_tasks(self.csv(*lines), 'csv', skip_invalid=True, dry_run=True)
+        self.assertEqual((dry['valid'], dry['imported']), (1, 0))
+        self.assertFalse(Task.objects.exists())
+
+        result = transfer.import_tasks(self.csv(*lines), 'csv', skip_invalid=True)
+        self.assertEqual((result['valid'], result['invalid'], result['imported']), (1, 1, 1))
+        self.assertTrue(Task.objects.filter(title='Fine').exists())
+
+    def test_owners_resolved_once_per_batch(self):
+        """Test that validation queries owners per batch, not per row."""
+        validate = transfer.BatchValidator()
+        batch = [(i, {'email': self.alice.email if i % 2 else self.bob.email, 'title': 'T'}) for i in range(500)]
+
+        with self.assertNumQueries(1):
+            rows, errors = validate(batch)
+        with self.assertNumQueries(0):
+            validate(batch)
+
+        self.assertEqual((len(rows), errors), (500, []))
+
+    def test_format_for(self):
+        """Test format detection from file names."""
+        self.assertEqual(transfer.format_for('tasks.ndjson'), 'ndjson')
+        self.assertEqual(transfer.format_for('tasks.JSONL'), 'ndjson')
+        self.assertEqual(transfer.format_for('tasks.csv'), 'csv')
+        self.assertEqual(transfer.format_for('-'), 'csv')
+
+
+class TaskExportTests(TestCase):
+    """Test suite for exporting tasks and importing them back."""
+
+    def setUp(self):
+        self.alice = make_user('alice')
+        self.bob = make_user('bob')
+        Task.objects.create(user=self.alice, title='Tricky', description=TRICKY, status='DOING')
+        Task.objects.create(user=self.alice, title='Plain', due_date='2024-06-01')
+        Task.objects.create(user=self.bob, title='Other', status='DONE')
+
+    def export(self, fmt, **filters):
+        out = io.StringIO()
+        count = transfer.export_tasks(out, fmt, **filters)
+        return count, out.getvalue()
+
+    def test_export_csv(self):
+        """Test that CSV exports have a header and round-trip special characters."""
+        count, data = self.export('csv', user=self.alice)
+
+        self.assertEqual(count, 2)
+        rows = list(transfer.read_rows(io.StringIO(data), 'csv'))
+        self.assertEqual(list(rows[0][1]), list(transfer.EXPORT_FIELDS))
+        self.assertEqual([row['title'] for _, row in rows], ['Tricky', 'Plain'])
+        self.assertEqual(rows[0][1]['description'], TRICKY)
+        self.assertEqual(rows[0][1]['email'], self.alice.email)
+        self.assertEqual(rows[1][1]['due_date'], '2024-06-01')
+
+    def test_export_ndjson(self):
+        """Test that NDJSON exports one object per task, filtered by status."""
+        count, data = self.export('ndjson', task_status='DONE')
+
+        self.assertEqual(count, 1)
+        (line,) = data.splitlines()
+        row = json.loads(line)
+        self.assertEqual((row['title'], row['email'], row['status']), ('Other', self.bob.email, 'DONE'))
+
+        _, data = self.export('ndjson', user=self.alice)
+        self.assertEqual(json.loads(data.splitlines()[0])['description'], TRICKY)
+
+    def test_round_trip(self):
+        """Test that an export imports back as the same tasks."""
+        for fmt in transfer.FORMATS:
+            _, data = self.export(fmt, user=self.alice)
+            Task.objects.filter(user=self.alice).delete()
+
+            result = transfer.import_tasks(io.StringIO(data), fmt)
+
+            self.assertEqual(result['imported'], 2, result['errors'])
+            self.assertEqual(
+                set(Task.objects.filter(user=self.alice).values_list('title', 'description', 'status')),
+                {('Tricky', TRICKY, 'DOING'), ('Plain', '', 'TODO')}
+            )
+
+
+    @skipUnless(connection.vendor == 'postgresql', 'COPY TO STDOUT is PostgreSQL-only')
+    def test_copy_export_counts_rows(self):
+        """Test that COPY exports report the rows written, multi-line fields included."""
+        Task.objects.bulk_create(
+            Task(user=self.bob, title=f'Bulk {i}', description=TRICKY) for i in range(250)
+        )
+
+        for fmt in transfer.FORMATS:
+            count, data = self.export(fmt, user=self.bob)
+
+            self.assertEqual(count, 251)
+            self.assertEqual(len(list(transfer.read_rows(io.StringIO(data), fmt))), 251)
+
+
+class CopyOutputTests(SimpleTestCase):
+    """Test suite for the wrappers counting rows written by COPY TO STDOUT."""
+
+    def test_csv_records_skip_quoted_newlines(self):
+        """Test that newlines inside quoted fields do not end a record."""
+        out = io.StringIO()
+        records = transfer.CSVRecords(out)
+        # COPY writes one row per call, as bytes
+        for row in (b'1,"Two\nlines ""quoted""\n",x\n', b'2,plain,\n', b'3,"a,""b""",c\n'):
+            records.write(row)
+
+        self.assertEqual(records.count, 3)
+        self.assertEqual(out.getvalue().count('\n'), 5)
+
+    def test_json_lines_counts_and_unescapes(self):
+        """Test that JSON lines are counted and their backslashes unescaped."""
+        out = io.StringIO()
+        lines = transfer.JSONLines(out)
+        lines.write(b'{"a": "back\\\\slash"}\n{"b"')
+        lines.write(b': 1}\n')
+
+        self.assertEqual(lines.count, 2)
+        self.assertEqual(out.getvalue(), '{"a": "back\\slash"}\n{"b": 1}\n')
+
+class TransferCommandTests(TestCase):
+    """Test suite for the import_tasks and export_tasks commands."""
+
+    def setUp(self):
+        self.user = make_user('cmd')
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_import_then_export(self):
+        """Test importing a file with an owner and exporting it again."""
+        with open(self.path('in.ndjson'), 'w') as f:
+            f.write(json.dumps({'title': 'From file', 'priority': 'HIGH'}) + '\n')
+
+        out = io.StringIO()
+        call_command('import_tasks', self.path('in.ndjson'), '--owner', self.user.email, stdout=out)
+        self.assertIn('Imported 1 tasks', out.getvalue())
+
+        call_command('export_tasks', self.path('out.csv'), '--owner', self.user.email, stdout=out)
+        with open(self.path('out.csv')) as f:
+            self.assertIn('From file', f.read())
+
+    def test_invalid_file_fails(self):
+        """Test that an invalid file imports nothing and reports the lines."""
+        with open(self.path('in.csv'), 'w') as f:
+            f.write(f'email,title\n{self.user.email},Good\n{self.user.email},\n')
+
+        err = io.StringIO()
+        with self.assertRaises(CommandError):
+            call_command('import_tasks', self.path('in.csv'), stdout=io.StringIO(), stderr=err)
+
+        self.assertIn('Line 3: title', err.getvalue())
+        self.assertFalse(Task.objects.exists())
+
+
+class TransferEndpointTests(APITestCase):
+    """Test suite for the admin import and export endpoints."""
+
+    def setUp(self):
+        self.admin = make_user('admin', is_staff=True)
+        self.user = make_user('user')
+        self.client.force_authenticate(self.admin)
+
+    def upload(self, content, name='tasks.csv', **data):
+        if isinstance(content, str):
+            content = content.encode()
+        return self.client.post(
+            reverse('tasks:task-import'),
+            {'file': SimpleUploadedFile(name, content), **data},
+            format='multipart'
+        )
+
+    def test_staff_only(self):
+        """Test that regular users cannot import or export."""
+        self.client.force_authenticate(self.user)
+
+        self.assertEqual(self.upload('title\nx\n').status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get(reverse('tasks:task-export')).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_import_upload(self):
+        """Test that an uploaded file is imported, or rejected with its errors."""
+        response = self.upload(f'email,title\n{self.user.email},Uploaded\n')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['imported'], 1)
+
+        response = self.upload('title\nNo owner\n')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'][0]['line'], 2)
+
+        response = self.upload('{"title": "Owned"}\n', name='tasks.ndjson', owner=self.user.email)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 2)
+
+    def test_import_upload_with_byte_order_mark(self):
+        """Test that a CSV saved with a UTF-8 BOM, as Excel does, keeps its first header."""
+        response = self.upload(f'email,title\n{self.user.email},From Excel\n'.encode('utf-8-sig'))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Task.objects.filter(user=self.user, title='From Excel').exists())
+
+    def test_import_rejects_non_utf8_upload(self):
+        """Test that a file in another encoding is a client error, not a crash."""
+        response = self.upload(f'email,title\n{self.user.email},Caf\xe9\n'.encode('latin-1'))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('UTF-8', response.data['error'])
+        self.assertFalse(Task.objects.exists())
+
+    def test_import_rejects_bad_requests(self):
+        """Test missing files, unknown formats and unknown owners."""
+        self.assertEqual(
+            self.client.post(reverse('tasks:task-import'), {}, format='multipart').status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+        self.assertEqual(self.upload('x', format='xml').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.upload('title\nx\n', owner='nobody@example.com').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_download(self):
+        """Test downloading tasks as an attachment."""
+        Task.objects.create(user=self.user, title='Downloaded')
+
+        response = self.client.get(reverse('tasks:task-export'), {'file_format': 'ndjson', 'owner': self.user.email})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('attachment; filename="tasks.ndjson"', response['Content-Disposition'])
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['title'] for row in rows], ['Downloaded'])
+        self.assertEqual(
+            self.client.get(reverse('tasks:task-export'), {'file_format': 'xml'}).status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
@@ -0,0 +1,268 @@
+"""Bulk task import and export in CSV or NDJSON, for customer migrations.
+
+Imports are validated in batches instead of row by row through
+``TaskSerializer``: each batch resolves its owners' emails with one query
+and checks choices, lengths and dates with set lookups and plain parsing,
+then the batch's valid rows are loaded with one ``COPY FROM STDIN`` (see
+``config.pgcopy``).
+An import is all or nothing unless ``skip_invalid`` is set: after the
+first invalid row nothing more is loaded, but the rest of the file is
+still validated so every error can be fixed in one go.
+
+Exports run ``COPY ... TO STDOUT`` on PostgreSQL so rows stream from the
+server straight into the output file, and fall back to iterating the
+queryset elsewhere.
+
+Columns, in file order: ``email`` (of the owner), ``title``,
+``description``, ``status``, ``priority``, ``due_date``, ``created_at``
+and ``updated_at``; exports add the task ``id`` first. Only ``title`` is
+required when an owner is given for the whole file.
+"""
+
+import csv
+import json
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from config.pgcopy import copy_expert, copy_from
+
+from .models import Task
+
+User = get_user_model()
+
+FORMATS = ('csv', 'ndjson')
+BATCH_SIZE = 5000
+# Enough to fix a file without building an unbounded response
+MAX_REPORTED_ERRORS = 100
+COLUMNS = ('user_id', 'title', 'description', 'status', 'priority', 'due_date', 'created_at', 'updated_at')
+EXPORT_FIELDS = (
+    'id', 'email', 'title', 'description', 'status', 'priority', 'due_date', 'created_at', 'updated_at',
+)
+STATUSES = frozenset(Task.Status.values)
+PRIORITIES = frozenset(Task.Priority.values)
+TITLE_MAX_LENGTH = Task._meta.get_field('title').max_length
+
+
+def format_for(filename, default='csv'):
+    """Guess the file format from a file name's extension."""
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if extension in ('ndjson', 'jsonl'):
+        return 'ndjson'
+    return 'csv' if extension == 'csv' else default
+
+
+def read_rows(stream, fmt):
+    """Yield (line number, row dict) from a text stream; the row is None if undecodable."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield number, row if isinstance(row, dict) else None
+
+
+class BatchValidator:
+    """Turn batches of parsed rows into ``COLUMNS`` tuples and per-row errors."""
+
+    def __init__(self, owner=None):
+        self.owner = owner
+        self.owners = {}
+        self.now = timezone.now()
+
+    def resolve_owners(self, batch):
+        emails = {str(row['email']).strip() for _, row in batch if row and row.get('email')} - self.owners.keys()
+        if emails:
+            found = dict(User.objects.filter(email__in=emails).values_list('email', 'pk'))
+            for email in emails:
+                self.owners[email] = found.get(email)
+
+    def __call__(self, batch):
+        self.resolve_owners(batch)
+        rows, errors = [], []
+        for line, row in batch:
+            if row is None:
+                errors.append({'line': line, 'errors': {'row': 'Not a JSON object'}})
+                continue
+            row_errors = {}
+            values = {key: str(value).strip() if value is not None else '' for key, value in row.items()}
+
+            email = values.get('email', '')
+            user_id = self.owners.get(email) if email else getattr(self.owner, 'pk', None)
+            if user_id is None:
+                row_errors['email'] = f'Unknown user {email}' if email else 'Owner email is required'
+
+            title = values.get('title', '')
+            if not title:
+                row_errors['title'] = 'This field is required'
+            elif len(title) > TITLE_MAX_LENGTH:
+                row_errors['title'] = f'Ensure this field has no more than {TITLE_MAX_LENGTH} characters'
+
+            task_status = values.get('status', '').upper() or Task.Status.TODO
+            if task_status not in STATUSES:
+                row_errors['status'] = f'"{task_status}" is not a valid choice'
+            priority = values.get('priority', '').upper() or Task.Priority.MEDIUM
+            if priority not in PRIORITIES:
+                row_errors['priority'] = f'"{priority}" is not a valid choice'
+
+            due_date = self.parse(values, 'due_date', parse_date, row_errors)
+            created_at = self.parse(values, 'created_at', parse_datetime, row_errors) or self.now
+            updated_at = self.parse(values, 'updated_at', parse_datetime, row_errors) or created_at
+
+            if row_errors:
+                errors.append({'line': line, 'errors': row_errors})
+                continue
+            rows.append((
+                user_id, title, values.get('description', ''), task_status, priority, due_date, created_at, updated_at,
+            ))
+        return rows, errors
+
+    @staticmethod
+    def parse(values, field, parser, errors):
+        value = values.get(field)
+        if not value:
+            return None
+        try:
+            parsed = parser(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            errors[field] = f'Invalid {"date" if parser is parse_date else "date and time"} "{value}"'
+        elif parser is parse_datetime and timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+
+def import_tasks(stream, fmt, owner=None, skip_invalid=False, dry_run=False, batch_size=BATCH_SIZE):
+    """Validate and load tasks from a CSV or NDJSON text stream.
+
+    Args:
+        stream: Text file to read
+        fmt: ``'csv'`` or ``'ndjson'``
+        owner: User owning rows without an ``email`` column
+        skip_invalid: Load the valid rows even if some are invalid
+        dry_run: Only validate
+
+    Returns:
+        Dict with the ``valid`` and ``invalid`` row counts, how many rows
+        were ``imported`` and the first ``MAX_REPORTED_ERRORS`` row ``errors``
+    """
+    validate = BatchValidator(owner)
+    rows = read_rows(stream, fmt)
+    result = {'valid': 0, 'invalid': 0, 'imported': 0, 'errors': []}
+
+    with transaction.atomic():
+        while batch := list(islice(rows, batch_size)):
+            valid, errors = validate(batch)
+            result['valid'] += len(valid)
+            result['invalid'] += len(errors)
+            result['errors'].extend(errors[:MAX_REPORTED_ERRORS - len(result['errors'])])
+            # After an invalid row, keep validating for the report only
+            if not dry_run and (skip_invalid or not result['invalid']):
+                result['imported'] += copy_from(Task, COLUMNS, valid)
+        if dry_run or (result['invalid'] and not skip_invalid):
+            transaction.set_rollback(True)
+            result['imported'] = 0
+    return result
+
+
+def export_queryset(user=None, task_status=None):
+    tasks = Task.objects.all()
+    if user is not None:
+        tasks = tasks.filter(user=user)
+    if task_status:
+        tasks = tasks.filter(status=task_status)
+    return tasks.order_by('pk').annotate(email=F('user__email')).values_list(*EXPORT_FIELDS)
+
+
+class JSONLines:
+    """File wrapper undoing COPY text escaping of single-column JSON lines.
+
+    JSON text never contains raw tabs or newlines, so the only escaping
+    COPY applies to it is doubling backslashes. Chunks are buffered to
+    whole lines so an escape is never split between two writes. Counts the
+    lines written in ``count``.
+    """
+
+    def __init__(self, out):
+        self.out = out
+        self.pending = ''
+        self.count = 0
+
+    def write(self, data):
+        if isinstance(data, bytes):
+            data = data.decode()
+        lines = (self.pending + data).split('\n')
+        self.pending = lines.pop()
+        for line in lines:
+            self.out.write(line.replace('\\\\', '\\') + '\n')
+        self.count += len(lines)
+
+
+class CSVRecords:
+    """File wrapper counting the CSV records COPY writes through it.
+
+    A newline ends a record unless it is inside a quoted field, which is
+    the case after an odd number of quotes; doubled quotes inside a field
+    leave that parity unchanged.
+    """
+
+    def __init__(self, out):
+        self.out = out
+        self.quoted = False
+        self.count = 0
+
+    def write(self, data):
+        if isinstance(data, bytes):
+            data = data.decode()
+        self.out.write(data)
+        *lines, rest = data.split('\n')
+        for line in lines:
+            self.quoted ^= line.count('"') % 2 == 1
+            if not self.quoted:
+                self.count += 1
+        self.quoted ^= rest.count('"') % 2 == 1
+
+
+def export_tasks(out, fmt, user=None, task_status=None):
+    """Write tasks to the text stream ``out`` and return how many were written."""
+    tasks = export_queryset(user, task_status)
+    if fmt == 'csv':
+        csv.writer(out).writerow(EXPORT_FIELDS)
+
+    if connection.vendor == 'postgresql':
+        sql, params = tasks.query.sql_with_params()
+        with connection.cursor() as cursor:
+            # The ORM selects annotations last; restore the file's column order
+            columns = ', '.join(connection.ops.quote_name(field) for field in EXPORT_FIELDS)
+            query = f'SELECT {columns} FROM ({cursor.mogrify(sql, params).decode()}) q'
+            if fmt == 'csv':
+                records = CSVRecords(out)
+                copy_expert(cursor, f'COPY ({query}) TO STDOUT WITH (FORMAT csv)', records)
+            else:
+                records = JSONLines(out)
+                copy_expert(cursor, f'COPY (SELECT row_to_json(r) FROM ({query}) r) TO STDOUT', records)
+            # Counted from the output: cursor.rowcount is not reliable after COPY TO
+            return records.count
+
+    count = 0
+    if fmt == 'csv':
+        writer = csv.writer(out)
+        for count, row in enumerate(tasks.iterator(), 1):
+            writer.writerow(row)
+    else:
+        for count, row in enumerate(tasks.iterator(), 1):
+            out.write(json.dumps(dict(zip(EXPORT_FIELDS, row)), cls=DjangoJSONEncoder) + '\n')
+    return count
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TaskViewSet
+from .views import TaskExportView, TaskImportView, TaskViewSet
 
 app_name = 'tasks'
 
@@ -8,5 +8,8 @@ router = DefaultRouter()
 router.register('', TaskViewSet, basename='task')
 
 urlpatterns = [
+    # Before the router, whose detail route would match these
+    path('import/', TaskImportView.as_view(), name='task-import'),
+    path('export/', TaskExportView.as_view(), name='task-export'),
     path('', include(router.urls)),
 ]
@@ -1,10 +1,21 @@
-from rest_framework import viewsets, filters
-from rest_framework.permissions import IsAuthenticated
+import io
+import tempfile
+
+from rest_framework import viewsets, filters, status
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.contrib.auth import get_user_model
+from django.http import FileResponse
 from django_filters.rest_framework import DjangoFilterBackend
 
+from . import transfer
 from .models import Task
 from .serializers import TaskSerializer
 
+User = get_user_model()
+
 
 class TaskViewSet(viewsets.ModelViewSet):
     """ViewSet for Task CRUD operations.
@@ -25,8 +36,96 @@ class TaskViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Return only tasks belonging to the current user."""
-        return Task.objects.filter(user=self.request.user).select_related('user')
+        return Task.objects.filter(user=self.request.user)
 
     def perform_create(self, serializer):
         """Automatically set the user when creating a task."""
         serializer.save(user=self.request.user)
+
+
+def get_owner(email):
+    """Return the user with ``email``, None for no email; raises User.DoesNotExist."""
+    return User.objects.get(email=email) if email else None
+
+
+class TaskImportView(APIView):
+    """Admin endpoint importing tasks from an uploaded CSV or NDJSON file.
+
+    Takes a multipart ``file`` plus optional ``format``, ``owner`` (email
+    owning rows without an ``email`` column), ``skip_invalid`` and
+    ``dry_run``. Uploads are capped by the proxy; load larger migrations
+    with the ``import_tasks`` management command.
+    """
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'A file is required'}, status=status.HTTP_400_BAD_REQUEST)
+        fmt = request.data.get('format') or transfer.format_for(upload.name)
+        if fmt not in transfer.FORMATS:
+            return Response(
+                {'error': f"Unknown format. Choose one of: {', '.join(transfer.FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            owner = get_owner(request.data.get('owner'))
+        except User.DoesNotExist:
+            return Response({'error': 'Unknown owner'}, status=status.HTTP_400_BAD_REQUEST)
+
+        skip_invalid = request.data.get('skip_invalid') in ('true', 'True', '1')
+        dry_run = request.data.get('dry_run') in ('true', 'True', '1')
+        try:
+            # utf-8-sig drops the byte order mark spreadsheet programs write
+            result = transfer.import_tasks(
+                io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline=''),
+                fmt,
+                owner=owner,
+                skip_invalid=skip_invalid,
+                dry_run=dry_run,
+            )
+        except UnicodeDecodeError:
+            return Response({'error': 'The file must be UTF-8 encoded'}, status=status.HTTP_400_BAD_REQUEST)
+        if result['invalid'] and not skip_invalid:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
+
+
+class TaskExportView(APIView):
+    """Admin endpoint downloading tasks as CSV or NDJSON.
+
+    Accepts optional ``file_format`` (csv or ndjson), ``owner`` (email) and
+    ``status`` query parameters. The rows are copied out of the database
+    into a temporary file first, so the connection is released before the
+    download starts.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        fmt = request.query_params.get('file_format', 'csv')
+        if fmt not in transfer.FORMATS:
+            return Response(
+                {'error': f"Unknown format. Choose one of: {', '.join(transfer.FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        task_status = request.query_params.get('status')
+        if task_status and task_status not in Task.Status.values:
+            return Response({'error': 'Unknown status'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            owner = get_owner(request.query_params.get('owner'))
+        except User.DoesNotExist:
+            return Response({'error': 'Unknown owner'}, status=status.HTTP_400_BAD_REQUEST)
+
+        download = tempfile.TemporaryFile()
+        out = io.TextIOWrapper(download, encoding='utf-8', newline='')
+        transfer.export_tasks(out, fmt, user=owner, task_status=task_status)
+        # Detach so the wrapper does not close the file under the response
+        out.detach()
+        download.seek(0)
+        return FileResponse(
+            download,
+            as_attachment=True,
+            filename=f'tasks.{fmt}',
+            content_type='text/csv' if fmt == 'csv' else 'application/x-ndjson',
+        )
@@ -0,0 +1,68 @@
+"""Tests for the benchmark harness."""
+
+import random
+
+from django.test import TestCase
+
+from benchmarks import dataset, harness, report
+from tasks import seeding
+from tasks.models import Task
+
+
+class BenchmarkDatasetTests(TestCase):
+    """Test suite for seeding the benchmark dataset."""
+
+    def test_seed_creates_skewed_dataset_once(self):
+        """Test that seeding creates the requested sizes and is reused."""
+        self.assertEqual(dataset.seed(20, 500), (20, 500))
+        self.assertEqual(dataset.seed(50, 5000), (20, 500))
+
+        counts = sorted(seeding.tasks_per_user(100, 10000, random.Random(1)), reverse=True)
+        self.assertEqual(sum(counts), 10000)
+        # A few heavy users own a large share of the tasks
+        self.assertGreater(sum(counts[:10]), 2500)
+
+    def test_seed_is_deterministic(self):
+        """Test that the same seed produces the same distribution."""
+        self.assertEqual(
+            seeding.tasks_per_user(50, 1000, random.Random(7)),
+            seeding.tasks_per_user(50, 1000, random.Random(7))
+        )
+
+
+class BenchmarkHarnessTests(TestCase):
+    """Test suite for running scenarios and comparing baselines."""
+
+    def test_run_reports_every_scenario(self):
+        """Test that a small run measures all scenarios without errors."""
+        dataset.seed(5, 50)
+
+        results = harness.run(requests=8, warmup=1)
+
+        self.assertEqual(set(results), {scenario.name for scenario in harness.SCENARIOS})
+        for result in results.values():
+            self.assertEqual(result['errors'], 0)
+            self.assertLessEqual(result['p50_ms'], result['p95_ms'])
+            self.assertLessEqual(result['p95_ms'], result['p99_ms'])
+        self.assertFalse(Task.objects.filter(title=harness.CREATED_TITLE).exists())
+
+    def test_percentiles(self):
+        """Test latency percentile interpolation."""
+        summary = report.summarize([i / 1000 for i in range(1, 101)], errors=0, wall_seconds=2)
+
+        self.assertEqual(summary['p50_ms'], 50.5)
+        self.assertEqual(summary['p99_ms'], 99.01)
+        self.assertEqual(summary['throughput_rps'], 50)
+
+    def test_compare_flags_regressions(self):
+        """Test that slower latency or lower throughput beyond the threshold fails."""
+        def results(p50, p95, rps):
+            return {'scenarios': {'task_list': {'p50_ms': p50, 'p95_ms': p95, 'throughput_rps': rps}}}
+
+        baseline = results(10, 20, 100)
+
+        self.assertEqual(report.compare(baseline, results(11, 23, 90), threshold=0.2), [])
+        self.assertEqual(
+            report.compare(baseline, results(10, 30, 70), threshold=0.2),
+            ['task_list: p95_ms 20 -> 30', 'task_list: throughput_rps 100 -> 70']
+        )
@@ -0,0 +1,141 @@
+"""Tests for the orjson-backed JSON renderer and parser."""
+
+import io
+import uuid
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework import parsers, renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.test import APITestCase
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from config import fastjson
+from tasks.models import Task
+
+User = get_user_model()
+
+TEXT = 'Tab\t "quotes" back\\slash\nü \u2028\u2029 \x00\x1f\x7f emoji \U0001F680 </script>'
+
+
+def payload():
+    return {
+        'utc': datetime(2024, 6, 1, 12, 30, 45, 123456, tzinfo=dt_timezone.utc),
+        'offset': datetime(2024, 6, 1, 12, 30, tzinfo=dt_timezone(timedelta(hours=3, minutes=30))),
+        'naive': datetime(2024, 6, 1, 12, 30, 45, 500),
+        'date': date(2024, 2, 29),
+        'time': time(9, 5, 1, 250000),
+        'duration': timedelta(hours=1, microseconds=5),
+        'decimal': Decimal('12.50'),
+        'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'lazy': gettext_lazy('This field is required.'),
+        'choice': Task.Status.DOING,
+        'text': TEXT,
+        'numbers': (0, -1, 2 ** 63 - 1, 1.5, 0.1, -0.0, True, False, None),
+        'set': {3},
+        'nested': ReturnList([ReturnDict({'a': [], 'b': {}}, serializer=None)], serializer=None),
+    }
+
+
+class RendererParityTests(SimpleTestCase):
+    """Test that the renderer writes the same bytes as DRF's."""
+
+    def assertSameOutput(self, data, media_type='application/json', context=None):
+        expected = renderers.JSONRenderer().render(data, media_type, context)
+        self.assertEqual(fastjson.JSONRenderer().render(data, media_type, context), expected)
+        return expected
+
+    def test_values(self):
+        """Test datetimes, dates, lazy strings, escapes and the other types DRF encodes."""
+        output = self.assertSameOutput(payload())
+
+        self.assertIn(b'"2024-06-01T12:30:45.123456Z"', output)
+        self.assertIn(b'\\u2028', output)
+
+    def test_fallbacks(self):
+        """Test values and options orjson cannot handle identically."""
+        self.assertSameOutput({'big': 2 ** 70, 1: 'int key', None: 'none key'})
+        self.assertSameOutput(payload(), 'application/json; indent=4')
+        self.assertSameOutput(payload(), context={'indent': 2})
+        self.assertEqual(fastjson.JSONRenderer().render(None), b'')
+
+        for unencodable in (object(), {(1, 2): 'tuple key'}):
+            with self.assertRaises(TypeError):
+                renderers.JSONRenderer().render(unencodable)
+            with self.assertRaises(TypeError):
+                fastjson.JSONRenderer().render(unencodable)
+
+    def test_without_orjson(self):
+        """Test that both classes work as DRF's without orjson."""
+        with mock.patch.object(fastjson, 'orjson', None):
+            self.assertSameOutput(payload())
+            self.assertEqual(fastjson.JSONParser().parse(io.BytesIO(b'{"a": [1]}')), {'a': [1]})
+
+
+class ParserParityTests(SimpleTestCase):
+    """Test that the parser returns the same values and errors as DRF's."""
+
+    def parse(self, parser, body, encoding='utf-8'):
+        return parser.parse(io.BytesIO(body), 'application/json', {'encoding': encoding})
+
+    def assertSameResult(self, body, encoding='utf-8'):
+        expected = self.parse(parsers.JSONParser(), body, encoding)
+        result = self.parse(fastjson.JSONParser(), body, encoding)
+        self.assertEqual(result, expected)
+        self.assertEqual(list(map(type, result)), list(map(type, expected)))
+
+    def test_values(self):
+        """Test objects, numbers, escapes and very large integers."""
+        body = fastjson.JSONRenderer().render({'text': TEXT, 'list': [1, -2.5, 1e-7, None, True]})
+        self.assertSameResult(body)
+        self.assertSameResult(b'[18446744073709551616, 123456789012345678901234567890, 1e400]')
+        self.assertSameResult(b'["\\ud800"]')
+        self.assertSameResult('{"title": "über"}'.encode('latin-1'), encoding='latin-1')
+
+    def test_errors(self):
+        """Test that invalid JSON raises DRF's ParseError with its message."""
+        for body in (b'{"a": 1,}', b'NaN', b'[Infinity]', b'\xef\xbb\xbf{}', b'\xff'):
+            with self.assertRaises(ParseError) as expected:
+                self.parse(parsers.JSONParser(), body)
+            with self.assertRaises(ParseError) as raised:
+                self.parse(fastjson.JSONParser(), body)
+            self.assertEqual(str(raised.exception), str(expected.exception), body)
+
+
+class APIResponseParityTests(APITestCase):
+    """Test that API responses are rendered with the orjson renderer unchanged."""
+
+    def setUp(self):
+        uid = uuid.uuid4().hex[:8]
+        self.admin = User.objects.create_user(
+            email=f'admin_{uid}@example.com', username=f'admin_{uid}', password='JsonPass123!', is_staff=True,
+        )
+        for i in range(3):
+            Task.objects.create(
+                user=self.admin, title=f'Task {i} \u2028', description=TEXT, due_date=timezone.localdate(),
+            )
+        self.client.force_authenticate(self.admin)
+
+    def test_responses_match_drf(self):
+        """Test the task list and admin overview against DRF's renderer."""
+        for url in (reverse('tasks:task-list'), reverse('accounts:admin-overview')):
+            response = self.client.get(url)
+
+            self.assertEqual(response.status_code, 200)
+            self.assertIsInstance(response.accepted_renderer, fastjson.JSONRenderer)
+            self.assertEqual(response.content, renderers.JSONRenderer().render(response.data))
+
+    def test_json_request_body(self):
+        """Test that JSON bodies are parsed by the orjson parser."""
+        response = self.client.post(
+            reverse('tasks:task-list'), {'title': 'Posted \U0001F680', 'priority': 'HIGH'}, format='json'
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Task.objects.get(pk=response.data['id']).title, 'Posted \U0001F680')
@@ -0,0 +1,80 @@
+"""Tests for the gunicorn configuration module."""
+
+import gc
+import logging
+import os
+import runpy
+from types import SimpleNamespace
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+CONF = os.path.join(settings.BASE_DIR, 'gunicorn.conf.py')
+
+
+class GunicornConfTests(SimpleTestCase):
+    """Test suite for worker sizing, modes and the stats hooks."""
+
+    def load(self, **env):
+        self.addCleanup(gc.enable)
+        with mock.patch.dict(os.environ, env):
+            return runpy.run_path(CONF)
+
+    def test_defaults(self):
+        """Test that the default is preloaded, recycled gthread workers on the WSGI app."""
+        conf = self.load()
+
+        self.assertEqual((conf['worker_class'], conf['wsgi_app']), ('gthread', 'config.wsgi:application'))
+        self.assertEqual(conf['threads'], 2)
+        self.assertTrue(conf['preload_app'])
+        self.assertFalse(gc.isenabled())
+        self.assertEqual((conf['max_requests'], conf['max_requests_jitter']), (1000, 100))
+        self.assertEqual(conf['workers'], conf['worker_count'](conf['cores'], conf['memory_mb'], 150))
+
+    def test_environment_overrides(self):
+        """Test the uvicorn mode and explicit sizing."""
+        conf = self.load(
+            GUNICORN_WORKER_MODE='uvicorn', GUNICORN_WORKERS='7', GUNICORN_PRELOAD='false',
+            GUNICORN_MAX_REQUESTS='500',
+        )
+
+        self.assertEqual(conf['worker_class'], 'uvicorn.workers.UvicornWorker')
+        self.assertEqual(conf['wsgi_app'], 'config.asgi:application')
+        self.assertEqual((conf['workers'], conf['threads']), (7, 1))
+        self.assertFalse(conf['preload_app'])
+        self.assertEqual(conf['max_requests_jitter'], 50)
+
+        with self.assertRaises(ValueError):
+            self.load(GUNICORN_WORKER_MODE='eventlet')
+
+    def test_worker_count(self):
+        """Test that workers follow the cores unless memory runs out first."""
+        worker_count = self.load()['worker_count']
+
+        self.assertEqual(worker_count(2, 2048, 150), 5)
+        self.assertEqual(worker_count(16, 1024, 150), 6)
+        self.assertEqual(worker_count(4, 100, 150), 1)
+
+    def test_request_stats(self):
+        """Test that workers report their requests once per interval and on exit."""
+        conf = self.load(GUNICORN_STATS_INTERVAL='60')
+        log = mock.Mock(spec=logging.Logger)
+        worker = SimpleNamespace(pid=42, log=log)
+        conf['post_fork'](None, worker)
+        self.assertTrue(gc.isenabled())
+
+        # pre_request, duration and window check per request, then the exit
+        with mock.patch('time.monotonic', side_effect=[
+            100.0, 100.05, 100.05, 100.1, 100.4, 100.4, 161.0, 161.001, 161.0, 161.0,
+        ]):
+            worker.stats.started = worker.stats.window_started = 100.0
+            for status in (200, 503, 201):
+                req = SimpleNamespace()
+                conf['pre_request'](worker, req)
+                conf['post_request'](worker, req, {}, SimpleNamespace(status_code=status))
+            conf['worker_exit'](SimpleNamespace(log=log), worker)
+
+        (message,), _ = log.info.call_args_list[0]
+        self.assertEqual(message, 'Worker 42: 3 requests in 61s (0.0/s), mean 117.0 ms, max 300.0 ms, 1 errors')
+        self.assertIn('exiting after 3 requests in 61s, 1 errors', log.info.call_args_list[1][0][0])
@@ -0,0 +1,99 @@
+"""Tests for the health check endpoints."""
+
+import time
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase, override_settings
+from rest_framework import status
+
+from config import health_views
+
+
+def slow(seconds, result=None):
+    def check():
+        time.sleep(seconds)
+        return result or {}
+    return check
+
+
+@override_settings(HEALTH_CHECK_TIMEOUT=2, HEALTH_CACHE_TTL=5)
+class HealthCheckTests(TestCase):
+    """Test suite for liveness, readiness and detailed health checks."""
+
+    def setUp(self):
+        health_views._cache.clear()
+        self.addCleanup(health_views._cache.clear)
+
+    def test_liveness_ignores_dependencies(self):
+        """Test that liveness stays up while Redis is down."""
+        with patch('config.health_views.get_redis', side_effect=ConnectionError('down')):
+            response = self.client.get('/api/health/live/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['status'], 'alive')
+
+    def test_readiness_healthy(self):
+        """Test that readiness checks the database and Redis."""
+        response = self.client.get('/api/health/ready/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.json()['checks']), {'database', 'redis'})
+
+    def test_readiness_degraded_when_redis_down(self):
+        """Test that an unreachable Redis is reported without taking the replica out."""
+        client = MagicMock()
+        client.ping.side_effect = ConnectionError('Connection refused')
+        with patch('config.health_views.get_redis', return_value=client):
+            response = self.client.get('/api/health/ready/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['status'], 'degraded')
+        self.assertEqual(response.json()['checks']['redis']['error'], 'Connection refused')
+        self.assertEqual(response.json()['checks']['database']['status'], 'healthy')
+
+    def test_readiness_fails_when_database_down(self):
+        """Test that an unreachable database makes the replica not ready."""
+        failing = MagicMock(side_effect=ConnectionError('could not connect'))
+        with patch.dict(health_views.CHECKS, database=failing):
+            response = self.client.get('/api/health/ready/')
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response.json()['status'], 'unhealthy')
+
+    @override_settings(HEALTH_CHECK_TIMEOUT=0.2)
+    def test_hung_check_times_out(self):
+        """Test that a hung dependency is reported instead of blocking the request."""
+        with patch.dict(health_views.CHECKS, redis=slow(1)):
+            started = time.monotonic()
+            response = self.client.get('/api/health/detailed/')
+            elapsed = time.monotonic() - started
+
+        self.assertLess(elapsed, 0.8)
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertIn('Timed out', response.json()['checks']['redis']['error'])
+
+    def test_checks_run_concurrently(self):
+        """Test that checks overlap instead of running one after another."""
+        with patch.dict(health_views.CHECKS, database=slow(0.3), redis=slow(0.3), disk=slow(0.3)):
+            _, duration_ms = health_views.run_checks(['database', 'redis', 'disk'])
+
+        self.assertLess(duration_ms, 800)
+
+    def test_results_are_cached(self):
+        """Test that probes within the TTL reuse the previous result."""
+        check = MagicMock(return_value={})
+        with patch.dict(health_views.CHECKS, redis=check):
+            for _ in range(3):
+                self.client.get('/api/health/redis/')
+
+        self.assertEqual(check.call_count, 1)
+
+    @override_settings(HEALTH_CACHE_TTL=0)
+    def test_cache_expires(self):
+        """Test that checks run again once the TTL has passed."""
+        check = MagicMock(return_value={})
+        with patch.dict(health_views.CHECKS, redis=check):
+            self.client.get('/api/health/redis/')
+            self.client.get('/api/health/redis/')
+
+        self.assertEqual(check.call_count, 2)
@@ -0,0 +1,70 @@
+"""Tests for the load-test summary and comparison."""
+
+import io
+import json
+import os
+import tempfile
+from contextlib import redirect_stdout
+
+from django.test import SimpleTestCase
+
+from loadtests import summary
+from loadtests.__main__ import main
+
+
+class Entry:
+    """The parts of a Locust ``StatsEntry`` the summary reads."""
+
+    def __init__(self, name, latencies, failures=0, rps=10.0):
+        self.name = name
+        self.latencies = sorted(latencies)
+        self.num_requests = len(latencies)
+        self.num_failures = failures
+        self.avg_response_time = sum(latencies) / len(latencies) if latencies else 0
+        self.total_rps = rps
+
+    def get_response_time_percentile(self, percent):
+        return self.latencies[int((len(self.latencies) - 1) * percent)]
+
+
+class LoadTestSummaryTests(SimpleTestCase):
+    """Test suite for building and comparing load-test summaries."""
+
+    def write(self, directory, name, p95, rps):
+        path = os.path.join(directory, name)
+        with open(path, 'w') as f:
+            json.dump({'scenarios': {'task_list': {
+                'requests': 100, 'errors': 0, 'p50_ms': 5, 'p95_ms': p95, 'p99_ms': p95, 'throughput_rps': rps,
+            }}}, f)
+        return path
+
+    def test_build_uses_benchmark_format(self):
+        """Test that stats become per-scenario metrics plus a total."""
+        entries = [Entry('task_list', list(range(1, 101)), failures=2), Entry('admin_notify', [])]
+
+        report = summary.build(entries, Entry('Aggregated', list(range(1, 101)), rps=50), {'users': 10})
+
+        self.assertEqual(set(report['scenarios']), {'task_list', 'total'})
+        self.assertEqual(report['meta']['users'], 10)
+        self.assertIn('timestamp', report['meta'])
+        task_list = report['scenarios']['task_list']
+        self.assertEqual(task_list['requests'], 100)
+        self.assertEqual(task_list['errors'], 2)
+        self.assertEqual(task_list['p50_ms'], 50)
+        self.assertEqual(task_list['p95_ms'], 95)
+        self.assertEqual(task_list['mean_ms'], 50.5)
+        self.assertEqual(report['scenarios']['total']['throughput_rps'], 50)
+
+    def test_compare_exit_code(self):
+        """Test that the CLI fails only when a release regressed."""
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = self.write(directory, 'baseline.json', p95=20, rps=100)
+            faster = self.write(directory, 'faster.json', p95=18, rps=110)
+            slower = self.write(directory, 'slower.json', p95=40, rps=100)
+
+            with redirect_stdout(io.StringIO()) as output:
+                self.assertEqual(main([baseline, faster]), 0)
+                self.assertEqual(main([baseline, slower]), 1)
+                self.assertEqual(main([baseline, slower, '--threshold', '1.5']), 0)
+
+        self.assertIn('task_list: p95_ms 20 -> 40', output.getvalue())
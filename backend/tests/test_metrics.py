@@ -0,0 +1,98 @@
+"""Tests for the Prometheus metrics middleware and endpoint."""
+
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from accounts.rendering import render_html
+from accounts.tasks import purge_claim_checks
+from config.redis_client import get_redis
+
+User = get_user_model()
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTests(TestCase):
+    """Test suite for request, cache and Celery metrics."""
+
+    def setUp(self):
+        uid = uuid.uuid4().hex[:8]
+        self.user = User.objects.create_user(
+            email=f'metrics_{uid}@example.com',
+            username=f'metrics_{uid}',
+            password='MetricsPass123!'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_request_recorded_by_route(self):
+        """Test that latency, status and SQL usage are labelled with the URL name."""
+        before = sample('http_responses_total', method='GET', route='tasks:task-list', status='200')
+        latency_before = sample('http_request_duration_seconds_count', method='GET', route='tasks:task-list')
+        queries_before = sample('http_request_db_queries_sum', route='tasks:task-list')
+
+        response = self.client.get('/api/tasks/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sample('http_responses_total', method='GET', route='tasks:task-list', status='200'), before + 1)
+        self.assertEqual(
+            sample('http_request_duration_seconds_count', method='GET', route='tasks:task-list'), latency_before + 1
+        )
+        self.assertGreater(sample('http_request_db_queries_sum', route='tasks:task-list'), queries_before)
+
+    def test_unknown_paths_share_one_label(self):
+        """Test that 404s do not create a label per path."""
+        before = sample('http_responses_total', method='GET', route='<unresolved>', status='404')
+
+        self.client.get(f'/no-such-page-{uuid.uuid4().hex}/')
+
+        self.assertEqual(sample('http_responses_total', method='GET', route='<unresolved>', status='404'), before + 1)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_can_be_disabled(self):
+        """Test that nothing is recorded when metrics are turned off."""
+        before = sample('http_responses_total', method='GET', route='tasks:task-list', status='200')
+
+        self.client.get('/api/tasks/')
+
+        self.assertEqual(sample('http_responses_total', method='GET', route='tasks:task-list', status='200'), before)
+
+    def test_cache_hits_and_misses(self):
+        """Test that the rendered email cache reports hits and misses."""
+        hits = sample('cache_requests_total', cache='email_html', result='hit')
+        misses = sample('cache_requests_total', cache='email_html', result='miss')
+        subject = f'Metrics {uuid.uuid4().hex}'
+
+        render_html(subject, 'Body')
+        render_html(subject, 'Body')
+
+        self.assertEqual(sample('cache_requests_total', cache='email_html', result='miss'), misses + 1)
+        self.assertEqual(sample('cache_requests_total', cache='email_html', result='hit'), hits + 1)
+
+    def test_celery_task_duration(self):
+        """Test that task run times are recorded from Celery signals."""
+        labels = {'task': purge_claim_checks.name, 'state': 'SUCCESS'}
+        before = sample('celery_task_duration_seconds_count', **labels)
+
+        purge_claim_checks.delay()
+
+        self.assertEqual(sample('celery_task_duration_seconds_count', **labels), before + 1)
+
+    def test_metrics_endpoint(self):
+        """Test that /metrics exposes the text format including queue depth."""
+        get_redis().rpush('celery', 'a', 'b')
+
+        response = self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', body)
+        self.assertIn('celery_queue_length{queue="celery"} 2.0', body)
@@ -83,7 +83,8 @@ class PerformanceTests(TestCase):
             for i in range(10)
         ])
         
-        tasks = list(Task.objects.filter(user=self.user))
+        with self.assertNumQueries(1):
+            tasks = list(Task.objects.filter(user=self.user))
         self.assertEqual(len(tasks), 10)
 
     def test_user_task_count_performance(self):
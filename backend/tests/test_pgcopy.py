@@ -0,0 +1,68 @@
+"""Tests for bulk loading with COPY."""
+
+from datetime import date, datetime, timezone
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+
+from config.pgcopy import RowStream, copy_from, encode
+from tasks.models import Task
+
+User = get_user_model()
+
+
+class CopyEncodingTests(SimpleTestCase):
+    """Test suite for COPY text format encoding."""
+
+    def test_encode_values(self):
+        """Test NULL, booleans, dates and escaped special characters."""
+        self.assertEqual(encode(None), '\\N')
+        self.assertEqual(encode(True), 't')
+        self.assertEqual(encode(False), 'f')
+        self.assertEqual(encode(3), '3')
+        self.assertEqual(encode(date(2024, 6, 1)), '2024-06-01')
+        self.assertEqual(
+            encode(datetime(2024, 6, 1, 12, 30, tzinfo=timezone.utc)), '2024-06-01T12:30:00+00:00'
+        )
+        self.assertEqual(encode('a\tb\nc\\d\re'), 'a\\tb\\nc\\\\d\\re')
+
+    def test_stream_reads_rows_lazily_in_chunks(self):
+        """Test that small reads return every row once, in order."""
+        consumed = []
+
+        def rows():
+            for i in range(100):
+                consumed.append(i)
+                yield (i, f'task {i}', None)
+
+        stream = RowStream(rows())
+        first = stream.read(10)
+        self.assertLess(len(consumed), 100)
+
+        data = first + b''.join(iter(lambda: stream.read(7), b''))
+        self.assertEqual(data.decode().splitlines()[42], '42\ttask 42\t\\N')
+        self.assertEqual(stream.count, 100)
+
+
+class CopyFromTests(TestCase):
+    """Test suite for loading rows into a table."""
+
+    def test_copy_from_loads_rows(self):
+        """Test that rows with special characters round-trip through the load."""
+        user = User.objects.create_user(email='copy@example.com', username='copy', password='CopyPass123!')
+        now = datetime(2024, 6, 1, tzinfo=timezone.utc)
+        rows = (
+            (user.pk, f'Task {i}', 'tab\there\nnewline \\ slash', 'TODO', 'HIGH', None, now, now)
+            for i in range(25)
+        )
+
+        loaded = copy_from(
+            Task, ('user_id', 'title', 'description', 'status', 'priority', 'due_date', 'created_at', 'updated_at'),
+            rows, batch_size=10,
+        )
+
+        self.assertEqual(loaded, 25)
+        self.assertEqual(Task.objects.filter(user=user).count(), 25)
+        task = Task.objects.get(title='Task 3')
+        self.assertEqual(task.description, 'tab\there\nnewline \\ slash')
+        self.assertIsNone(task.due_date)
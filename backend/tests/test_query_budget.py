@@ -0,0 +1,92 @@
+"""Tests for the per-request query budget middleware."""
+
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from config.query_budget import QueryBudgetMiddleware, query_shape
+
+User = get_user_model()
+
+
+def run_queries(count):
+    def view(request):
+        for pk in range(count):
+            User.objects.filter(pk=pk).exists()
+        return HttpResponse('ok')
+    return view
+
+
+@override_settings(
+    QUERY_BUDGET_ENABLED=True,
+    QUERY_BUDGET_MAX_QUERIES=3,
+    QUERY_BUDGET_MAX_DB_MS=10000,
+    QUERY_BUDGET_REPEAT_THRESHOLD=5,
+)
+class QueryBudgetTests(TestCase):
+    """Test suite for budget warnings, N+1 detection and statement timeouts."""
+
+    def setUp(self):
+        self.request = RequestFactory().get('/api/tasks/')
+
+    def test_within_budget_is_quiet(self):
+        """Test that a cheap request logs nothing."""
+        with self.assertNoLogs('config.query_budget', level='WARNING'):
+            QueryBudgetMiddleware(run_queries(2))(self.request)
+
+    def test_over_budget_logs_top_statements(self):
+        """Test that an expensive request logs its statements with call sites."""
+        with self.assertLogs('config.query_budget', level='WARNING') as logs:
+            QueryBudgetMiddleware(run_queries(4))(self.request)
+
+        report = logs.output[0]
+        self.assertIn('Query budget exceeded on GET /api/tasks/: 4 queries', report)
+        self.assertIn('x4 SELECT', report)
+        self.assertIn('tests/test_query_budget.py', report)
+
+    def test_repeated_shape_flagged_as_n_plus_one(self):
+        """Test that the same statement issued in a loop is flagged."""
+        with self.assertLogs('config.query_budget', level='WARNING') as logs:
+            QueryBudgetMiddleware(run_queries(5))(self.request)
+
+        self.assertTrue(any('Possible N+1 on GET /api/tasks/' in line for line in logs.output))
+
+    @override_settings(QUERY_BUDGET_ENABLED=False)
+    def test_disabled(self):
+        """Test that nothing is tracked when the budget is turned off."""
+        with self.assertNoLogs('config.query_budget', level='WARNING'):
+            QueryBudgetMiddleware(run_queries(10))(self.request)
+
+    def test_in_lists_share_a_shape(self):
+        """Test that IN lists of different lengths group together."""
+        self.assertEqual(
+            query_shape('SELECT * FROM t WHERE id IN (%s, %s)'),
+            query_shape('SELECT  *\nFROM t WHERE id IN (%s)')
+        )
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', 'statement_timeout is PostgreSQL-only')
+    def test_statement_timeout_per_view_class(self):
+        """Test that a view's statement_timeout applies during its request only."""
+        seen = []
+
+        class SlowView:
+            statement_timeout = 1234
+
+        def view(request):
+            with connection.cursor() as cursor:
+                cursor.execute('SHOW statement_timeout')
+                seen.append(cursor.fetchone()[0])
+            return HttpResponse('ok')
+        view.cls = SlowView
+
+        middleware = QueryBudgetMiddleware(lambda request: middleware.process_view(request, view, (), {}) or view(request))
+        middleware(self.request)
+
+        with connection.cursor() as cursor:
+            cursor.execute('SHOW statement_timeout')
+            after = cursor.fetchone()[0]
+        self.assertEqual(seen, ['1234ms'])
+        self.assertEqual(after, '0')
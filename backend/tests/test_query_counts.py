@@ -0,0 +1,244 @@
+"""Query-count regression tests for every API route.
+
+Each test pins the exact number of SQL statements a request issues and
+checks it at 1, 10 and 1000 tasks, so an N+1 or an extra query fails
+deterministically instead of showing up as a slow endpoint in production.
+Requests authenticate with a token, as real clients do, so the
+authentication lookup is part of every count.
+
+When a count changes on purpose, update the pinned number; when it grows
+with the data, fix the view.
+"""
+
+import math
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from accounts import deadletter
+from tasks.models import Task
+
+User = get_user_model()
+
+SIZES = (1, 10, 1000)
+STATUSES = ['TODO', 'DOING', 'DONE']
+PRIORITIES = ['LOW', 'MEDIUM', 'HIGH']
+
+
+class QueryCountTests(TestCase):
+    """Test suite pinning the SQL statements issued by each route."""
+
+    def setUp(self):
+        uid = uuid.uuid4().hex[:8]
+        self.user = User.objects.create_user(
+            email=f'queries_{uid}@example.com',
+            username=f'queries_{uid}',
+            password='QueryPass123!'
+        )
+        self.admin = User.objects.create_superuser(
+            email=f'admin_{uid}@example.com',
+            username=f'admin_{uid}',
+            password='AdminPass123!'
+        )
+        self.client = self.client_for(self.user)
+        self.admin_client = self.client_for(self.admin)
+        self.task = Task.objects.create(user=self.user, title='Pinned task')
+
+    def client_for(self, user):
+        client = APIClient()
+        token, _ = Token.objects.get_or_create(user=user)
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        return client
+
+    def grow(self, size):
+        """Give the user ``size`` tasks, and spread tasks over other users too."""
+        today = timezone.localdate()
+        have = Task.objects.filter(user=self.user).count()
+        Task.objects.bulk_create([
+            Task(
+                user=self.user,
+                title=f'Task {i}',
+                status=STATUSES[i % 3],
+                priority=PRIORITIES[i % 3],
+                due_date=today + timezone.timedelta(days=i % 30 - 10)
+            )
+            for i in range(have, size)
+        ])
+
+        others = math.ceil(size / 10)
+        existing = User.objects.filter(username__startswith='other_').count()
+        users = User.objects.bulk_create([
+            User(email=f'other_{i}@example.com', username=f'other_{i}', password='!')
+            for i in range(existing, others)
+        ])
+        Task.objects.bulk_create([Task(user=user, title='Other task') for user in users])
+
+    def assertQueries(self, expected, request, before=None):
+        """Assert ``request()`` issues ``expected`` statements at every data size.
+
+        ``before`` runs ahead of each measured request, outside the count,
+        e.g. to recreate what the previous request consumed. PostgreSQL
+        statement_timeout bookkeeping is not counted, so the numbers are the
+        same on every backend.
+        """
+        for size in SIZES:
+            self.grow(size)
+            if before:
+                before()
+            with CaptureQueriesContext(connection) as context:
+                response = request()
+            self.assertLess(response.status_code, 400, getattr(response, 'content', None))
+            queries = [
+                query['sql'] for query in context.captured_queries
+                if 'statement_timeout' not in query['sql']
+            ]
+            self.assertEqual(
+                len(queries), expected,
+                f"{len(queries)} queries with {size} tasks:\n" + "\n".join(queries)
+            )
+
+    # accounts/urls.py
+
+    def test_register(self):
+        """Test the query count of registering a user."""
+        count = iter(range(len(SIZES)))
+        self.assertQueries(4, lambda: APIClient().post('/api/accounts/register/', {
+            'email': f'new{next(count)}@example.com',
+            'username': f'new{uuid.uuid4().hex[:8]}',
+            'password': 'NewUserPass123!',
+            'password2': 'NewUserPass123!',
+        }, format='json'))
+
+    def test_login(self):
+        """Test the query count of logging in."""
+        self.assertQueries(2, lambda: APIClient().post('/api/accounts/login/', {
+            'email': self.user.email,
+            'password': 'QueryPass123!',
+        }, format='json'))
+
+    def test_logout(self):
+        """Test the query count of logging out."""
+        key = self.user.auth_token.key
+        self.assertQueries(
+            2,
+            lambda: self.client.post('/api/accounts/logout/'),
+            before=lambda: Token.objects.get_or_create(user=self.user, key=key)
+        )
+
+    def test_profile_get(self):
+        """Test the query count of reading the profile."""
+        self.assertQueries(1, lambda: self.client.get('/api/accounts/profile/'))
+
+    def test_profile_update(self):
+        """Test the query count of updating the profile."""
+        self.assertQueries(2, lambda: self.client.patch('/api/accounts/profile/', {'daily_digest': True}, format='json'))
+
+    def test_admin_overview(self):
+        """Test the query count of the admin overview."""
+        self.assertQueries(3, lambda: self.admin_client.get('/api/accounts/admin/overview/'))
+
+    def test_admin_notify_recipients(self):
+        """Test the query count of queueing a notification to explicit recipients."""
+        self.assertQueries(4, lambda: self.admin_client.post('/api/accounts/admin/notify/', {
+            'recipients': [self.user.email],
+            'subject': 'Hello',
+            'message': 'Body',
+        }, format='json'))
+
+    def test_admin_notify_audience(self):
+        """Test the query count of queueing a notification to an audience."""
+        self.assertQueries(4, lambda: self.admin_client.post('/api/accounts/admin/notify/', {
+            'audience': 'all_active',
+            'subject': 'Hello',
+            'message': 'Body',
+        }, format='json'))
+
+    def test_admin_send_rate(self):
+        """Test the query count of the send rate endpoint."""
+        self.assertQueries(1, lambda: self.admin_client.get('/api/accounts/admin/notify/rate/'))
+
+    def test_admin_notify_status(self):
+        """Test the query count of polling a notification job."""
+        response = self.admin_client.post('/api/accounts/admin/notify/', {
+            'audience': 'all_active',
+            'message': 'Body',
+        }, format='json')
+        job_id = response.data['job_id']
+
+        self.assertQueries(2, lambda: self.admin_client.get(f'/api/accounts/admin/notify/{job_id}/'))
+
+    def test_admin_outbox(self):
+        """Test the query count of the outbox stats."""
+        self.assertQueries(3, lambda: self.admin_client.get('/api/accounts/admin/outbox/'))
+
+    def test_admin_dead_letters(self):
+        """Test the query count of listing dead letters as they pile up."""
+        self.assertQueries(
+            4,
+            lambda: self.admin_client.get('/api/accounts/admin/dead-letters/'),
+            before=self.add_dead_letters
+        )
+
+    # One job per replay; large recipient lists would add one claim check INSERT
+    @override_settings(DEAD_LETTER_REPLAY_BATCH_SIZE=5000, CLAIM_CHECK_THRESHOLD=10 ** 9)
+    def test_admin_dead_letters_replay(self):
+        """Test the query count of replaying a growing number of dead letters."""
+        self.assertQueries(
+            6,
+            lambda: self.admin_client.post('/api/accounts/admin/dead-letters/replay/', {}, format='json'),
+            before=self.add_dead_letters
+        )
+
+    def add_dead_letters(self):
+        """Add one dead letter per task of the user, under a fresh job."""
+        count = Task.objects.filter(user=self.user).count()
+        deadletter.record(str(uuid.uuid4()), 'Subject', 'Body', [
+            (f'user{i}@example.com', 1, 'Connection reset') for i in range(count)
+        ])
+
+    # tasks/urls.py
+
+    def test_task_list(self):
+        """Test the query count of listing tasks."""
+        self.assertQueries(2, lambda: self.client.get('/api/tasks/'))
+
+    def test_task_list_filtered(self):
+        """Test the query count of filtering, searching and ordering tasks."""
+        self.assertQueries(2, lambda: self.client.get(
+            '/api/tasks/', {'status': 'TODO', 'priority': 'HIGH', 'search': 'Task', 'ordering': 'due_date'}
+        ))
+
+    def test_task_create(self):
+        """Test the query count of creating a task."""
+        self.assertQueries(2, lambda: self.client.post('/api/tasks/', {'title': 'New'}, format='json'))
+
+    def test_task_detail(self):
+        """Test the query count of reading a task."""
+        self.assertQueries(2, lambda: self.client.get(f'/api/tasks/{self.task.pk}/'))
+
+    def test_task_update(self):
+        """Test the query count of updating a task."""
+        self.assertQueries(3, lambda: self.client.patch(f'/api/tasks/{self.task.pk}/', {'status': 'DOING'}, format='json'))
+
+    def test_task_delete(self):
+        """Test the query count of deleting a task."""
+        tasks = iter(Task.objects.bulk_create([Task(user=self.user, title=f'Doomed {i}') for i in SIZES]))
+        self.assertQueries(4, lambda: self.client.delete(f'/api/tasks/{next(tasks).pk}/'))
+
+    def test_task_import(self):
+        """Test the query count of importing a file of tasks."""
+        rows = ''.join(f'{self.user.email},Imported {i}\n' for i in range(3))
+        self.assertQueries(5, lambda: self.admin_client.post('/api/tasks/import/', {
+            'file': SimpleUploadedFile('tasks.csv', f'email,title\n{rows}'.encode()),
+        }, format='multipart'))
+
+    def test_task_export(self):
+        """Test the query count of exporting every task."""
+        self.assertQueries(2, lambda: self.admin_client.get('/api/tasks/export/', {'file_format': 'csv'}))
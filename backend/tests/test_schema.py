@@ -0,0 +1,65 @@
+"""Tests for the cached OpenAPI schema views."""
+
+import json
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from config import schema
+
+
+class SchemaViewTests(TestCase):
+    """Test suite for serving the generated schema."""
+
+    def setUp(self):
+        schema.clear()
+        self.addCleanup(schema.clear)
+
+    def test_schema_documents_every_route(self):
+        """Test that the JSON schema lists the API and carries cache headers."""
+        response = self.client.get('/swagger.json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json; charset=utf-8')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=3600')
+        self.assertTrue(response['ETag'])
+        paths = json.loads(response.content)['paths']
+        self.assertIn('/tasks/', paths)
+        self.assertIn('/accounts/admin/overview/', paths)
+
+    def test_schema_generated_once(self):
+        """Test that later requests, in any format, reuse the generated schema."""
+        generate = mock.patch.object(
+            schema.BaseSchemaView.generator_class, 'get_schema',
+            autospec=True, side_effect=schema.BaseSchemaView.generator_class.get_schema,
+        )
+        with generate as get_schema:
+            first = self.client.get('/swagger.json')
+            second = self.client.get('/swagger.json')
+            ui_spec = self.client.get('/swagger/', {'format': 'openapi'})
+
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(first['ETag'], second['ETag'])
+        self.assertEqual(json.loads(ui_spec.content), json.loads(first.content))
+        # Once for JSON, once for the UI's spec format
+        self.assertEqual(get_schema.call_count, 2)
+
+    def test_etag_revalidation(self):
+        """Test that a matching If-None-Match gets an empty 304."""
+        etag = self.client.get('/swagger.yaml')['ETag']
+
+        response = self.client.get('/swagger.yaml', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(self.client.get('/swagger.yaml', HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+
+    @override_settings(OPENAPI_CACHE_MAX_AGE=60)
+    def test_ui_pages_render(self):
+        """Test that the documentation pages still render and are not cached."""
+        for url in ('/swagger/', '/redoc/', '/api/docs/'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            self.assertNotIn('ETag', response)
+        self.assertEqual(self.client.get('/swagger.json')['Cache-Control'], 'public, max-age=60')
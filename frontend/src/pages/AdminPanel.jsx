@@ -4,9 +4,18 @@ import { useAuth } from '../context/AuthContext';
 import { useNotification } from '../context/NotificationContext';
 import axios from '../api/axios';
 
+// Audiences resolved on the server; 'selected' sends to the checked users
+const AUDIENCES = [
+  { value: 'selected', label: 'Selected users' },
+  { value: 'all_active', label: 'All active users' },
+  { value: 'active_with_open_tasks', label: 'Active users with open tasks' },
+  { value: 'overdue_high_priority', label: 'Users with overdue HIGH-priority tasks' },
+];
+
 const AdminPanel = () => {
   const [users, setUsers] = useState([]);
   const [selectedUsers, setSelectedUsers] = useState([]);
+  const [audience, setAudience] = useState('selected');
   const [subject, setSubject] = useState('Notification from TaskBoard');
   const [message, setMessage] = useState('');
   const [loading, setLoading] = useState(true);
@@ -60,8 +69,10 @@ const AdminPanel = () => {
     }
   };
 
+  const useSelection = audience === 'selected';
+
   const handleSendEmail = async () => {
-    if (selectedUsers.length === 0) {
+    if (useSelection && selectedUsers.length === 0) {
       notify('Please select at least one user', 'error');
       return;
     }
@@ -74,12 +85,16 @@ const AdminPanel = () => {
     setSending(true);
 
     try {
-      const selectedEmails = users
-        .filter(u => selectedUsers.includes(u.id))
-        .map(u => u.email);
+      const target = useSelection
+        ? {
+            recipients: users
+              .filter(u => selectedUsers.includes(u.id))
+              .map(u => u.email),
+          }
+        : { audience };
 
       const response = await axios.post('/accounts/admin/notify/', {
-        recipients: selectedEmails,
+        ...target,
         subject: subject,
         message: message
       });
@@ -207,9 +222,25 @@ const AdminPanel = () => {
             <h2 className="text-xl font-bold mb-4">Send Email Notification</h2>
             
             <div className="mb-4">
-              <div className="text-sm text-gray-600 mb-2">
-                Selected: {selectedUsers.length} user(s)
-              </div>
+              <label className="block text-gray-700 text-sm font-bold mb-2">
+                Recipients
+              </label>
+              <select
+                value={audience}
+                onChange={(e) => setAudience(e.target.value)}
+                className="w-full px-3 py-2 border rounded-lg focus:outline-none focus:border-blue-500"
+              >
+                {AUDIENCES.map((option) => (
+                  <option key={option.value} value={option.value}>
+                    {option.label}
+                  </option>
+                ))}
+              </select>
+              {useSelection && (
+                <div className="text-sm text-gray-600 mt-2">
+                  Selected: {selectedUsers.length} user(s)
+                </div>
+              )}
             </div>
 
             <div className="mb-4">
@@ -234,16 +265,20 @@ const AdminPanel = () => {
                 onChange={(e) => setMessage(e.target.value)}
                 rows="10"
                 className="w-full px-3 py-2 border rounded-lg focus:outline-none focus:border-blue-500 font-mono text-sm"
-                placeholder="Enter your message here...\n\nYou can use Markdown:\n# Heading\n**bold** *italic*\n- List item"
+                placeholder="Enter your message here...\n\nYou can use Markdown:\n# Heading\n**bold** *italic*\n- List item\n\nHi {{ username }} - personalised per recipient"
               />
             </div>
 
             <button
               onClick={handleSendEmail}
-              disabled={sending || selectedUsers.length === 0}
+              disabled={sending || (useSelection && selectedUsers.length === 0)}
               className="w-full bg-green-500 text-white py-3 rounded-lg hover:bg-green-600 disabled:bg-gray-400 disabled:cursor-not-allowed"
             >
-              {sending ? 'Sending...' : `Send Email to ${selectedUsers.length} User(s)`}
+              {sending
+                ? 'Sending...'
+                : useSelection
+                  ? `Send Email to ${selectedUsers.length} User(s)`
+                  : 'Send Email to Audience'}
             </button>
           </div>
         </div>